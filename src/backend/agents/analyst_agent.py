@@ -1,104 +1,538 @@
 
-from typing import Dict, List, Any
+from typing import Awaitable, Callable, Dict, List, Any, Optional, Tuple
+import asyncio
 import logging
 import os
-from dotenv import load_dotenv
+import time
 from src.backend.utils.groq_handler import call_llm
+from src.backend.utils.date_range import DateWindow
+from src.backend.utils.deadline import Deadline, DeadlineExceeded
+from src.backend.utils.items import item_id
+from src.backend.storage.analysis_store import AnalysisStore
+from src.backend.utils.metrics import ANALYSIS_COVERAGE, FALLBACK_RESULTS, PACKED_ANALYSES, platform_label
+from src.backend.utils.parsing import format_items_for_prompt, parse_llm_json, split_packed_response
+from src.backend.utils.sentiment import dominant_sentiment
+from src.backend.utils.themes import extract_themes
+from src.backend.utils.tracing import platform_var, span
+from src.backend.utils.worker_pool import get_worker_pool
 
-# Load environment variables
-load_dotenv()
+class _PlatformPack:
+    """
+    Gathers the LLM analyses of several small platforms into one call.
+    
+    Every member platform either submits its content or withdraws (e.g. when it
+    has nothing new to analyze). Once all members have done one or the other,
+    one call is made for the submitted platforms and each gets its own result.
+    """
+    
+    def __init__(
+        self,
+        platforms: List[str],
+        run: Callable[[Dict[str, Tuple[str, List[str]]]], Awaitable[Dict[str, Any]]]
+    ):
+        self._waiting = set(platforms)
+        self._run = run
+        self._sections: Dict[str, Tuple[str, List[str]]] = {}
+        self._result = asyncio.get_running_loop().create_future()
+        # Held so the shared call is not garbage-collected while it runs
+        self._dispatch_task: Optional[asyncio.Task] = None
+    
+    async def analyze(self, platform: str, content: str, themes: List[str] = None) -> Dict[str, Any]:
+        """Submit a platform's formatted content and wait for its share of the packed analysis."""
+        self._sections[platform] = (content, themes)
+        self._leave(platform)
+        result = (await asyncio.shield(self._result))[platform]
+        if isinstance(result, Exception):
+            raise result
+        return result
+    
+    def withdraw(self, platform: str) -> None:
+        """Leave the pack without an analysis (no-op after submitting)."""
+        self._leave(platform)
+    
+    def _leave(self, platform: str) -> None:
+        if platform not in self._waiting:
+            return
+        self._waiting.discard(platform)
+        if not self._waiting:
+            if self._sections:
+                self._dispatch_task = asyncio.ensure_future(self._dispatch())
+            else:
+                self._result.set_result({})
+    
+    async def _dispatch(self) -> None:
+        try:
+            self._result.set_result(await self._run(dict(self._sections)))
+        except Exception as e:
+            self._result.set_exception(e)
 
 class AnalystAgent:
     """Agent responsible for analyzing scraped content and generating insights."""
     
-    def __init__(self):
+    # Maximum number of insights kept after merging new and retained insights
+    MAX_INSIGHTS = int(os.getenv("DELTA_MAX_INSIGHTS", "8"))
+    # Insights older than this are dropped, and stale state is re-analysed in full
+    INSIGHT_MAX_AGE_SECONDS = float(os.getenv("DELTA_INSIGHT_MAX_AGE_SECONDS", "21600"))
+    
+    # Under a deadline: below this many seconds the LLM is skipped for a platform...
+    DEADLINE_MIN_ANALYSIS_SECONDS = float(os.getenv("DEADLINE_MIN_ANALYSIS_SECONDS", "1"))
+    # ...and below this many a faster model, a shorter answer and fewer items are used
+    DEADLINE_FAST_ANALYSIS_SECONDS = float(os.getenv("DEADLINE_FAST_ANALYSIS_SECONDS", "8"))
+    # Groq's low-latency 8B model; the default analysis model is the slower llama3-8b-8192
+    DEADLINE_FAST_MODEL = os.getenv("DEADLINE_FAST_MODEL", "llama-3.1-8b-instant")
+    DEADLINE_FAST_MAX_TOKENS = 500
+    DEADLINE_FAST_MAX_ITEMS = 10
+    
+    # Give the LLM the locally extracted themes and only the start of each item's content
+    THEMES_IN_PROMPT = os.getenv("THEMES_IN_PROMPT", "0") == "1"
+    THEMES_PROMPT_CONTENT_CHARS = int(os.getenv("THEMES_PROMPT_CONTENT_CHARS", "280"))
+    
+    # Platforms with at most this many items and characters share one LLM call
+    PACKING = os.getenv("ANALYSIS_PACKING", "1") == "1"
+    PACK_MAX_ITEMS = int(os.getenv("ANALYSIS_PACK_MAX_ITEMS", "5"))
+    PACK_MAX_CHARS = int(os.getenv("ANALYSIS_PACK_MAX_CHARS", "2000"))
+    PACK_TOKENS_PER_PLATFORM = 600
+    
+    # Smaller jobs run on the event loop: below these sizes the hand-off costs more than it saves
+    OFFLOAD_MIN_ITEMS = int(os.getenv("WORKER_OFFLOAD_MIN_ITEMS", "50"))
+    OFFLOAD_MIN_RESPONSE_CHARS = int(os.getenv("WORKER_OFFLOAD_MIN_RESPONSE_CHARS", "4096"))
+    
+    def __init__(self, store: Optional[AnalysisStore] = None):
         self.logger = logging.getLogger(__name__)
+        
+        # Delta analysis is enabled unless explicitly switched off
+        if store is None and os.getenv("DELTA_ANALYSIS", "1") != "0":
+            store = AnalysisStore()
+        self.store = store
     
-    async def analyze_content(self, platform_data: Dict[str, List[Dict[str, Any]]], tone: str = "professional") -> Dict[str, Any]:
+    async def analyze_content(
+        self,
+        platform_data: Dict[str, List[Dict[str, Any]]],
+        tone: str = "professional",
+        keywords: List[str] = None,
+        deadline: Deadline = None,
+        window: Optional[DateWindow] = None
+    ) -> Dict[str, Any]:
         """
         Analyze scraped content and generate insights.
         
+        When an AnalysisStore is configured, only items that were not seen by the
+        previous run for the same platform, keywords, tone and date window are sent to the LLM,
+        and the new insights are merged with the retained ones.
+        
+        The overall sentiment of a platform is the dominant local item label (see
+        utils.sentiment) rather than an LLM judgement, whenever items are labelled.
+        Key themes are likewise extracted locally with TF-IDF (see utils.themes).
+        
+        Each platform is first classified by its items (see `plan_coverage`):
+        platforms holding only scraper fallback placeholders get a deterministic
+        summary without the LLM, and mixed sets send only their real items. The
+        classification is returned with each analysis under "coverage".
+        
         Args:
             platform_data: Dictionary mapping platform IDs to lists of content items
             tone: Desired tone for analysis ("professional", "viral", "casual", etc.)
+            keywords: Optional keywords the content was scraped for
+            deadline: Optional deadline; each platform gets an equal share of the
+                remaining time and degrades (fewer items, faster model, no LLM) to fit
+            window: Optional date window the content was scraped for
             
         Returns:
             Dictionary containing analysis results and insights
         """
         analysis_results = {}
+        coverage = self.plan_coverage(platform_data)
         
+        # Placeholders carry nothing worth an LLM call; only the rest share the deadline
+        llm_data = {}
         for platform, content_items in platform_data.items():
-            if not content_items:
-                self.logger.warning(f"No content to analyze for platform: {platform}")
-                analysis_results[platform] = {
-                    "insights": [],
-                    "sentiment": "neutral",
-                    "key_themes": [],
-                    "engagement_indicators": []
-                }
+            ANALYSIS_COVERAGE.inc(coverage=coverage[platform])
+            if coverage[platform] == "fallback":
+                analysis_results[platform] = self._summarize_placeholders(platform, content_items)
+            elif coverage[platform] == "partial":
+                llm_data[platform] = [item for item in content_items if not item.get("is_fallback")]
+            else:
+                llm_data[platform] = content_items
+        
+        # Small platforms are analyzed together in one LLM call (not under a deadline,
+        # where each platform gets its own time share and model)
+        packed = self._packable_platforms(llm_data) if deadline is None else []
+        if packed:
+            pack = _PlatformPack(packed, lambda sections: self._analyze_packed(sections, tone))
+            results = await asyncio.gather(*(
+                self._analyze_platform(platform, llm_data[platform], tone, keywords, pack=pack, window=window)
+                for platform in packed
+            ))
+            analysis_results.update(zip(packed, results))
+        
+        for index, (platform, content_items) in enumerate(llm_data.items()):
+            if platform in analysis_results:
                 continue
             
-            try:
-                combined_text = self._prepare_content_for_analysis(content_items)
-                analysis = await self._analyze_with_llm(platform, combined_text, tone)
-                
-                analysis_results[platform] = analysis
-            except Exception as e:
-                self.logger.error(f"Error analyzing content for {platform}: {str(e)}")
-                analysis_results[platform] = {
-                    "insights": [{
-                        "title": f"Error Analyzing {platform.title()} Content",
-                        "summary": f"An error occurred while analyzing content: {str(e)}",
-                        "sentiment": "neutral",
-                        "date": "today"
-                    }],
+            llm_options = {}
+            if deadline is not None and content_items:
+                llm_options = self._plan_for_deadline(platform, deadline.child(1.0 / (len(llm_data) - index)))
+                if llm_options is None:
+                    with span("themes", platform):
+                        themes = extract_themes(content_items, keywords)
+                    analysis_results[platform] = self._summarize_without_llm(platform, content_items, themes)
+                    continue
+            
+            analysis_results[platform] = await self._analyze_platform(
+                platform, content_items, tone, keywords, llm_options, deadline, window=window
+            )
+        
+        return {
+            platform: dict(analysis_results[platform], coverage=coverage[platform])
+            for platform in platform_data
+        }
+    
+    @staticmethod
+    def plan_coverage(platform_data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, str]:
+        """
+        Classify each platform's items before analysis.
+        
+        Args:
+            platform_data: Dictionary mapping platform IDs to lists of content items
+            
+        Returns:
+            Per platform: "real" (no fallback placeholders), "partial" (real items
+            and placeholders), "fallback" (placeholders only) or "empty"
+        """
+        coverage = {}
+        for platform, content_items in platform_data.items():
+            placeholders = sum(1 for item in content_items if item.get("is_fallback"))
+            if not content_items:
+                coverage[platform] = "empty"
+            elif placeholders == len(content_items):
+                coverage[platform] = "fallback"
+            else:
+                coverage[platform] = "partial" if placeholders else "real"
+        return coverage
+    
+    def _packable_platforms(self, platform_data: Dict[str, List[Dict[str, Any]]]) -> List[str]:
+        """Return the platforms small enough to share an LLM call, if at least two are."""
+        if not self.PACKING:
+            return []
+        small = [
+            platform for platform, items in platform_data.items()
+            if items and len(items) <= self.PACK_MAX_ITEMS
+            and sum(len(item.get("content", "")) + len(item.get("title", "")) for item in items) <= self.PACK_MAX_CHARS
+        ]
+        return small if len(small) >= 2 else []
+    
+    async def _analyze_platform(
+        self,
+        platform: str,
+        content_items: List[Dict[str, Any]],
+        tone: str,
+        keywords: Optional[List[str]],
+        llm_options: Dict[str, Any] = None,
+        deadline: Deadline = None,
+        pack: Optional[_PlatformPack] = None,
+        window: Optional[DateWindow] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze one platform's content.
+        
+        Args:
+            platform: Platform ID
+            content_items: Content items scraped for the platform
+            tone: Desired tone for analysis
+            keywords: Keywords the content was scraped for
+            llm_options: LLM call options planned for the deadline (plus "max_items")
+            deadline: Optional request deadline, noted when analysis times out
+            pack: Optional pack whose shared LLM call analyzes this platform
+            window: Optional date window the content was scraped for
+            
+        Returns:
+            Analysis dictionary for the platform
+        """
+        try:
+            return await self._analyze_platform_content(
+                platform, content_items, tone, keywords, dict(llm_options or {}), deadline, pack, window
+            )
+        finally:
+            if pack is not None:
+                pack.withdraw(platform)
+    
+    async def _analyze_platform_content(
+        self,
+        platform: str,
+        content_items: List[Dict[str, Any]],
+        tone: str,
+        keywords: Optional[List[str]],
+        llm_options: Dict[str, Any],
+        deadline: Optional[Deadline],
+        pack: Optional[_PlatformPack],
+        window: Optional[DateWindow]
+    ) -> Dict[str, Any]:
+        if not content_items:
+            self.logger.warning("No content to analyze for platform: %s", platform)
+            return {
+                "insights": [],
+                "sentiment": "neutral",
+                "key_themes": [],
+                "engagement_indicators": []
+            }
+        
+        with span("themes", platform):
+            themes = extract_themes(content_items, keywords)
+        
+        try:
+            with span("analyze", platform):
+                if self.store is not None:
+                    analysis = await self._analyze_incrementally(
+                        platform, content_items, tone, keywords, llm_options, themes, pack, window
+                    )
+                else:
+                    max_items = llm_options.pop("max_items", None)
+                    combined_text = await self._prepare_content_offloaded(content_items[:max_items])
+                    if pack is not None:
+                        analysis = await pack.analyze(platform, combined_text, themes)
+                    else:
+                        analysis = await self._analyze_with_llm(platform, combined_text, tone, llm_options, themes)
+            
+            if analysis.get("is_fallback"):
+                FALLBACK_RESULTS.inc(stage="analyze", platform=platform_label(platform))
+            analysis["sentiment"] = dominant_sentiment(content_items, analysis.get("sentiment", "neutral"))
+            if themes:
+                analysis["key_themes"] = themes
+            return analysis
+        except DeadlineExceeded:
+            self.logger.warning("Deadline reached while analyzing %s, returning a summary without the LLM", platform)
+            if deadline is not None:
+                deadline.note(platform, "analysis_timeout")
+            return self._summarize_without_llm(platform, content_items, themes)
+        except Exception as e:
+            self.logger.error("Error analyzing content for %s: %s", platform, e)
+            return {
+                "insights": [{
+                    "title": f"Error Analyzing {platform.title()} Content",
+                    "summary": f"An error occurred while analyzing content: {str(e)}",
                     "sentiment": "neutral",
-                    "key_themes": [],
-                    "engagement_indicators": []
-                }
+                    "date": "today"
+                }],
+                "sentiment": "neutral",
+                "key_themes": [],
+                "engagement_indicators": []
+            }
+    
+    def _plan_for_deadline(self, platform: str, deadline: Deadline) -> Optional[Dict[str, Any]]:
+        """
+        Choose how to call the LLM for a platform within its share of the deadline.
         
-        return analysis_results
+        Args:
+            platform: Platform ID
+            deadline: The platform's share of the request deadline
+            
+        Returns:
+            Keyword options for the LLM call (plus "max_items"), or None to skip the LLM
+        """
+        remaining = deadline.remaining()
+        if remaining < self.DEADLINE_MIN_ANALYSIS_SECONDS:
+            self.logger.warning("Only %.2fs left for %s, skipping LLM analysis", remaining, platform)
+            deadline.note(platform, "analysis_skipped")
+            return None
+        
+        # A retry on the larger fallback model would not fit in the budget
+        options = {"timeout": remaining, "allow_fallback": False}
+        if remaining < self.DEADLINE_FAST_ANALYSIS_SECONDS:
+            deadline.note(platform, "analysis_fast")
+            options.update(
+                model=self.DEADLINE_FAST_MODEL, max_tokens=self.DEADLINE_FAST_MAX_TOKENS, max_items=self.DEADLINE_FAST_MAX_ITEMS
+            )
+        return options
+    
+    def _summarize_without_llm(
+        self,
+        platform: str,
+        content_items: List[Dict[str, Any]],
+        themes: List[str] = None
+    ) -> Dict[str, Any]:
+        """Build a cheap deterministic analysis from the items themselves and their local themes."""
+        titles = [item["title"] for item in content_items if item.get("title")][:3]
+        summary = f"{len(content_items)} {platform.title()} items were collected"
+        summary += f", including: {'; '.join(titles)}." if titles else "."
+        return {
+            "insights": [{
+                "title": f"{platform.title()} Content Overview",
+                "summary": summary,
+                "sentiment": "neutral",
+                "date": "today"
+            }],
+            "sentiment": dominant_sentiment(content_items),
+            "key_themes": themes or [],
+            "engagement_indicators": [],
+            "is_fallback": True
+        }
+    
+    def _summarize_placeholders(self, platform: str, content_items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Describe a platform whose scrape only produced fallback placeholders, without the LLM."""
+        analysis = self._summarize_without_llm(platform, content_items)
+        keywords = sorted({item["keyword"] for item in content_items if item.get("keyword")})
+        summary = f"No live {platform.title()} content could be collected"
+        summary += f" for: {', '.join(keywords)}." if keywords else "."
+        analysis["insights"][0].update(title=f"No {platform.title()} Content Analyzed", summary=summary)
+        return analysis
+    
+    async def _analyze_incrementally(
+        self,
+        platform: str,
+        content_items: List[Dict[str, Any]],
+        tone: str,
+        keywords: Optional[List[str]],
+        llm_options: Dict[str, Any] = None,
+        themes: List[str] = None,
+        pack: Optional[_PlatformPack] = None,
+        window: Optional[DateWindow] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze only the items that are new since the last run and merge with retained insights.
+        
+        Args:
+            platform: Platform ID
+            content_items: All content items scraped for the platform in this run
+            tone: Desired tone for analysis
+            keywords: Keywords the content was scraped for
+            llm_options: Optional LLM call options; "max_items" caps the items analyzed
+            themes: Locally extracted themes for the platform
+            pack: Optional pack whose shared LLM call analyzes the new items
+            window: Optional date window the content was scraped for; state is kept per window
+            
+        Returns:
+            Dictionary containing the merged analysis results
+        """
+        llm_options = dict(llm_options or {})
+        max_items = llm_options.pop("max_items", None)
+        
+        scope = AnalysisStore.scope_key(keywords, tone, window)
+        now = time.time()
+        
+        prior = await asyncio.to_thread(self.store.load, platform, scope)
+        if prior is not None and now - prior["updated_at"] > self.INSIGHT_MAX_AGE_SECONDS:
+            prior = None
+        
+        item_ids = [item_id(item) for item in content_items]
+        seen_ids = prior["item_ids"] if prior else []
+        seen = set(seen_ids)
+        new_pairs = [(item, iid) for item, iid in zip(content_items, item_ids) if iid not in seen]
+        
+        retained = self._retained_insights(prior["analysis"], now) if prior else []
+        
+        if prior is not None and not new_pairs and retained:
+            self.logger.info("No new %s items since last run, reusing %s insights", platform, len(retained))
+            analysis = dict(prior["analysis"], insights=retained)
+        else:
+            if prior is not None and not new_pairs:
+                # Everything retained has expired, so refresh from the full item set
+                new_pairs, retained = list(zip(content_items, item_ids)), []
+            
+            # Items left out (to meet a deadline) stay unseen and are analyzed next run
+            new_pairs = new_pairs[:max_items]
+            new_items = [item for item, _ in new_pairs]
+            
+            self.logger.info("Analyzing %s of %s %s items", len(new_items), len(content_items), platform)
+            combined_text = await self._prepare_content_offloaded(new_items)
+            if pack is not None:
+                delta = await pack.analyze(platform, combined_text, themes)
+            else:
+                delta = await self._analyze_with_llm(platform, combined_text, tone, llm_options, themes)
+            
+            # Do not persist placeholder analyses, so the next run retries the LLM
+            if delta.get("is_fallback"):
+                return delta
+            
+            for insight in delta["insights"]:
+                insight["analyzed_at"] = now
+            analysis = self._merge_analyses(delta, prior["analysis"] if retained else None, retained)
+        
+        new_ids = [iid for _, iid in new_pairs if iid not in seen]
+        await asyncio.to_thread(self.store.save, platform, scope, seen_ids + new_ids, analysis)
+        
+        return self._strip_timestamps(analysis)
+    
+    def _retained_insights(self, analysis: Dict[str, Any], now: float) -> List[Dict[str, Any]]:
+        """Return the stored insights that have not expired yet."""
+        return [
+            insight for insight in analysis.get("insights", [])
+            if now - insight.get("analyzed_at", 0) <= self.INSIGHT_MAX_AGE_SECONDS
+        ]
+    
+    def _merge_analyses(
+        self,
+        delta: Dict[str, Any],
+        prior: Optional[Dict[str, Any]],
+        retained: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Merge a delta analysis with the retained part of the previous analysis.
+        
+        New insights come first; retained insights with the same title are dropped.
+        The overall sentiment follows the newest analysis.
+        """
+        if prior is None:
+            return delta
+        
+        new_titles = {insight.get("title") for insight in delta["insights"]}
+        insights = delta["insights"] + [i for i in retained if i.get("title") not in new_titles]
+        
+        def merge_unique(key: str) -> List[Any]:
+            merged = []
+            for value in delta.get(key, []) + prior.get(key, []):
+                if value not in merged:
+                    merged.append(value)
+            return merged[:10]
+        
+        return dict(
+            delta,
+            insights=insights[:self.MAX_INSIGHTS],
+            key_themes=merge_unique("key_themes"),
+            engagement_indicators=merge_unique("engagement_indicators")
+        )
+    
+    @staticmethod
+    def _strip_timestamps(analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a copy of the analysis without the internal per-insight timestamps."""
+        insights = [
+            {k: v for k, v in insight.items() if k != "analyzed_at"}
+            for insight in analysis.get("insights", [])
+        ]
+        return dict(analysis, insights=insights)
     
     def _prepare_content_for_analysis(self, content_items: List[Dict[str, Any]]) -> str:
         """
         Prepare content items for analysis by combining them into a structured text format.
         
+        When themes are fed into the prompt, each item's content is cut to
+        THEMES_PROMPT_CONTENT_CHARS, since the themes already summarise it.
+        
         Args:
             content_items: List of content items from a specific platform
             
         Returns:
             Formatted string containing all content for analysis
         """
-        formatted_text = "CONTENT FOR ANALYSIS:\n\n"
-        
-        for i, item in enumerate(content_items, 1):
-            formatted_text += f"ITEM {i}:\n"
-            
-            # Add title if available
-            if "title" in item:
-                formatted_text += f"Title: {item['title']}\n"
-                
-            # Add author if available
-            if "author" in item:
-                formatted_text += f"Author: {item['author']}\n"
-                
-            # Add content
-            content = item.get("content", "")
-            formatted_text += f"Content: {content}\n"
-            
-            # Add other metadata
-            if "url" in item:
-                formatted_text += f"URL: {item['url']}\n"
-            if "score" in item:
-                formatted_text += f"Score/Engagement: {item['score']}\n"
-            if "date" in item:
-                formatted_text += f"Date: {item['date']}\n"
-                
-            formatted_text += "\n---\n\n"
-        
-        return formatted_text
-    
-    async def _analyze_with_llm(self, platform: str, content: str, tone: str) -> Dict[str, Any]:
+        return format_items_for_prompt(content_items, self._prompt_content_chars())
+    
+    def _prompt_content_chars(self) -> Optional[int]:
+        """Per-item content cut-off for the prompt, or None for full content."""
+        return self.THEMES_PROMPT_CONTENT_CHARS if self.THEMES_IN_PROMPT else None
+    
+    async def _prepare_content_offloaded(self, content_items: List[Dict[str, Any]]) -> str:
+        """Like `_prepare_content_for_analysis`, but large item sets are formatted in the worker pool."""
+        if len(content_items) < self.OFFLOAD_MIN_ITEMS:
+            return self._prepare_content_for_analysis(content_items)
+        return await get_worker_pool().run("prompt", format_items_for_prompt, content_items, self._prompt_content_chars())
+    
+    async def _analyze_with_llm(
+        self,
+        platform: str,
+        content: str,
+        tone: str,
+        llm_options: Dict[str, Any] = None,
+        themes: List[str] = None
+    ) -> Dict[str, Any]:
         """
         Use LLM to analyze content and generate insights.
         
@@ -106,6 +540,8 @@ class AnalystAgent:
             platform: Platform ID
             content: Formatted content text
             tone: Desired tone for analysis
+            llm_options: Optional extra keyword arguments for call_llm (model, timeout, ...)
+            themes: Locally extracted themes, included in the prompt if THEMES_IN_PROMPT is set
             
         Returns:
             Dictionary containing analysis results and insights
@@ -116,19 +552,20 @@ class AnalystAgent:
             self.logger.error("GROQ_API_KEY not found in environment variables.")
             raise ValueError("GROQ_API_KEY is required for content analysis")
         
-        prompt = self._create_analysis_prompt(platform, content, tone)
+        prompt_themes = themes if self.THEMES_IN_PROMPT else None
+        prompt = self._create_analysis_prompt(platform, content, tone, prompt_themes)
         
         try:
-            self.logger.info(f"Calling LLM to analyze content for {platform}")
-            response = await call_llm(prompt, temperature=0.3)
+            self.logger.info("Calling LLM to analyze content for %s", platform)
+            response = await call_llm(prompt, temperature=0.3, **(llm_options or {}))
             
             # Parse the response
-            return self._parse_llm_response(response, platform)
+            return await self._parse_llm_response_offloaded(response, platform)
         except Exception as e:
-            self.logger.error(f"Error calling LLM for {platform} analysis: {str(e)}")
+            self.logger.error("Error calling LLM for %s analysis: %s", platform, e)
             raise
     
-    def _create_analysis_prompt(self, platform: str, content: str, tone: str) -> str:
+    def _create_analysis_prompt(self, platform: str, content: str, tone: str, themes: List[str] = None) -> str:
         """
         Create a prompt for the LLM to analyze content.
         
@@ -136,16 +573,24 @@ class AnalystAgent:
             platform: Platform ID
             content: Formatted content text
             tone: Desired tone for analysis
+            themes: Optional precomputed themes; the LLM is then not asked for its own
             
         Returns:
             Formatted prompt string
         """
         platform_display = platform.title()
         
+        if themes:
+            themes_text = f"Key themes already detected in this content: {', '.join(themes)}.\n"
+            themes_field = ""
+        else:
+            themes_text = ""
+            themes_field = '\n  "key_themes": ["theme1", "theme2", "theme3"],'
+        
         prompt = f"""
 You are an expert social media analyst specializing in {platform_display} content.
 Analyze the following {platform_display} content and generate insights in a {tone} tone.
-
+{themes_text}
 {content}
 
 Analyze this content and provide:
@@ -159,9 +604,7 @@ Analyze this content and provide:
       "date": "today"
     }},
     // 3-5 insights total
-  ],
-  "sentiment": "overall sentiment (positive/neutral/negative)",
-  "key_themes": ["theme1", "theme2", "theme3"],
+  ],{themes_field}
   "engagement_indicators": ["indicator1", "indicator2"]
 }}
 
@@ -171,6 +614,92 @@ IMPORTANT: Return ONLY the JSON object with no additional text.
         
         return prompt
     
+    async def _analyze_packed(self, sections: Dict[str, Tuple[str, List[str]]], tone: str) -> Dict[str, Any]:
+        """
+        Analyze several platforms with one LLM call asking for a JSON object keyed by platform.
+        
+        Platforms missing from the answer, or all of them when the call or the
+        parse fails, are analyzed with their own LLM call instead.
+        
+        Args:
+            sections: Platform ID -> (formatted content, local themes)
+            tone: Desired tone for analysis
+            
+        Returns:
+            Platform ID -> analysis dictionary, or the exception its own call raised
+        """
+        results: Dict[str, Any] = {}
+        if len(sections) > 1:
+            prompt = self._create_packed_prompt(sections, tone)
+            # LLM spans and token counts of the shared call are labelled "packed"
+            token = platform_var.set("packed")
+            try:
+                self.logger.info("Calling LLM to analyze %s together", ", ".join(sections))
+                response = await call_llm(
+                    prompt, temperature=0.3, max_tokens=self.PACK_TOKENS_PER_PLATFORM * len(sections)
+                )
+                results = split_packed_response(response, list(sections))
+            except Exception as e:
+                self.logger.warning("Packed analysis of %s failed, analyzing separately: %s", ", ".join(sections), e)
+            finally:
+                platform_var.reset(token)
+        
+        separate = [platform for platform in sections if platform not in results]
+        PACKED_ANALYSES.inc(len(results), outcome="packed")
+        PACKED_ANALYSES.inc(len(separate), outcome="separate")
+        outcomes = await asyncio.gather(
+            *(self._analyze_with_llm(platform, sections[platform][0], tone, None, sections[platform][1]) for platform in separate),
+            return_exceptions=True
+        )
+        results.update(zip(separate, outcomes))
+        return results
+    
+    def _create_packed_prompt(self, sections: Dict[str, Tuple[str, List[str]]], tone: str) -> str:
+        """
+        Create one prompt asking for a separate analysis of each platform's content.
+        
+        Args:
+            sections: Platform ID -> (formatted content, local themes)
+            tone: Desired tone for analysis
+            
+        Returns:
+            Formatted prompt string
+        """
+        blocks = []
+        for platform, (content, themes) in sections.items():
+            themes_text = ""
+            if themes and self.THEMES_IN_PROMPT:
+                themes_text = f"Key themes already detected in this content: {', '.join(themes)}.\n"
+            blocks.append(f"=== PLATFORM: {platform} ({platform.title()}) ===\n{themes_text}{content}")
+        platform_keys = ", ".join(f'"{platform}"' for platform in sections)
+        content_blocks = "\n\n".join(blocks)
+        
+        return f"""
+You are an expert social media analyst.
+Analyze the content of each platform below separately and generate insights in a {tone} tone.
+
+{content_blocks}
+
+Return one JSON object with exactly these keys: {platform_keys}.
+The value for each platform must have the following structure, based only on that platform's content:
+{{
+  "insights": [
+    {{
+      "title": "Insightful title about a specific finding",
+      "summary": "2-3 sentence explanation in a {tone} tone",
+      "sentiment": "positive/neutral/negative",
+      "date": "today"
+    }},
+    // 1-3 insights per platform
+  ],
+  "key_themes": ["theme1", "theme2"],
+  "engagement_indicators": ["indicator1", "indicator2"]
+}}
+
+Make sure the insights are specific, data-driven, and actionable. The tone should be {tone}.
+IMPORTANT: Return ONLY the JSON object with no additional text.
+"""
+    
     def _parse_llm_response(self, response: str, platform: str) -> Dict[str, Any]:
         """
         Parse the LLM response into structured data.
@@ -182,43 +711,40 @@ IMPORTANT: Return ONLY the JSON object with no additional text.
         Returns:
             Dictionary containing parsed analysis results
         """
-        # Clean up response to extract just the JSON portion
         try:
-            # Try to extract JSON from the response by finding the first { and last }
-            json_start = response.find('{')
-            json_end = response.rfind('}') + 1
-            
-            if json_start >= 0 and json_end > json_start:
-                json_str = response[json_start:json_end]
-                import json
-                analysis_data = json.loads(json_str)
-                
-                # Validate and ensure required fields
-                if "insights" not in analysis_data:
-                    analysis_data["insights"] = []
-                if "sentiment" not in analysis_data:
-                    analysis_data["sentiment"] = "neutral"
-                if "key_themes" not in analysis_data:
-                    analysis_data["key_themes"] = []
-                if "engagement_indicators" not in analysis_data:
-                    analysis_data["engagement_indicators"] = []
-                
-                return analysis_data
-            else:
-                raise ValueError("Could not extract JSON from LLM response")
+            return parse_llm_json(response)
         except Exception as e:
-            self.logger.error(f"Error parsing LLM response: {str(e)}")
-            self.logger.debug(f"Raw response: {response}")
-            
-            # Return a fallback structure
-            return {
-                "insights": [{
-                    "title": f"{platform.title()} Content Analysis",
-                    "summary": "The content was analyzed but the results could not be properly structured.",
-                    "sentiment": "neutral",
-                    "date": "today"
-                }],
+            return self._unparsed_response_fallback(response, platform, e)
+    
+    async def _parse_llm_response_offloaded(self, response: str, platform: str) -> Dict[str, Any]:
+        """
+        Like `_parse_llm_response`, but long responses are parsed in the worker pool.
+        
+        Parses are batched with those of other platforms finishing at the same
+        time, so one round trip to the workers serves several responses.
+        """
+        if len(response) < self.OFFLOAD_MIN_RESPONSE_CHARS:
+            return self._parse_llm_response(response, platform)
+        try:
+            return await get_worker_pool().run_batched("llm_json", parse_llm_json, response)
+        except Exception as e:
+            return self._unparsed_response_fallback(response, platform, e)
+    
+    def _unparsed_response_fallback(self, response: str, platform: str, error: Exception) -> Dict[str, Any]:
+        """Log a response that could not be parsed and return a placeholder analysis."""
+        self.logger.error("Error parsing LLM response: %s", error)
+        self.logger.debug("Raw response: %s", response)
+        
+        # Return a fallback structure
+        return {
+            "insights": [{
+                "title": f"{platform.title()} Content Analysis",
+                "summary": "The content was analyzed but the results could not be properly structured.",
                 "sentiment": "neutral",
-                "key_themes": [],
-                "engagement_indicators": []
-            }
+                "date": "today"
+            }],
+            "sentiment": "neutral",
+            "key_themes": [],
+            "engagement_indicators": [],
+            "is_fallback": True
+        }
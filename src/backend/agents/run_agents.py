@@ -2,34 +2,74 @@
 from typing import List, Dict, Any
 import logging
 import os
-from dotenv import load_dotenv
 from .scraper_agent import ScraperAgent
 from .analyst_agent import AnalystAgent
 from .writer_agent import WriterAgent
 from src.backend.schemas.response import InsightResponse
+from src.backend.utils import groq_handler
+from src.backend.utils.tracing import span
+from src.backend.utils.deadline import Deadline
+from src.backend.utils.date_range import parse_date_range
+from src.backend.utils.sentiment import score_items
+from src.backend.storage.shared_cache import close_shared_cache
+from src.backend.utils.worker_pool import close_worker_pool, get_worker_pool
+import asyncio
 import json
 
-# Load environment variables
-load_dotenv()
-
 logger = logging.getLogger(__name__)
 
 class InsightPipeline:
     """Orchestrates the flow of data through multiple agents to generate insights."""
     
-    def __init__(self):
-        self.scraper = ScraperAgent()
-        self.analyst = AnalystAgent()
-        self.writer = WriterAgent()
+    # Share of a request deadline that scraping may use; the rest is kept for analysis
+    SCRAPE_BUDGET_FRACTION = float(os.getenv("DEADLINE_SCRAPE_FRACTION", "0.5"))
+    
+    def __init__(
+        self,
+        scraper: ScraperAgent = None,
+        analyst: AnalystAgent = None,
+        writer: WriterAgent = None
+    ):
+        self.scraper = scraper or ScraperAgent()
+        self.analyst = analyst or AnalystAgent()
+        self.writer = writer or WriterAgent()
         self.logger = logging.getLogger(__name__)
     
+    async def startup(self) -> None:
+        """
+        Warm the resources used on the request path.
+        
+        Imports LangChain, creates the pooled chat clients for the analysis
+        model, its fallback and the faster model used under a deadline, and
+        starts the parsing workers, so the first request does not pay for them.
+        """
+        await asyncio.to_thread(groq_handler.warm_up, [
+            (groq_handler.DEFAULT_MODEL, 0.3, 1000),
+            (groq_handler.FALLBACK_MODEL, 0.3, 1000),
+            (self.analyst.DEADLINE_FAST_MODEL, 0.3, self.analyst.DEADLINE_FAST_MAX_TOKENS)
+        ])
+        await asyncio.to_thread(get_worker_pool().warm_up)
+    
+    async def aclose(self) -> None:
+        """Release pooled HTTP connections, LLM clients, database handles, the shared cache and parsing workers."""
+        self.scraper.close()
+        if self.analyst.store is not None:
+            self.analyst.store.close()
+        if self.writer.rollups is not None:
+            self.writer.rollups.close()
+        groq_handler.close_chat_models()
+        close_worker_pool()
+        close_shared_cache()
+    
     async def run(
         self, 
         platforms: List[str], 
         preset: str = "standard", 
         tone: str = "professional",
         date_range: str = None,
-        keywords: List[str] = None
+        keywords: List[str] = None,
+        deadline: Deadline = None,
+        resolution: str = "day"
     ) -> InsightResponse:
         """
         Run the complete insight generation pipeline.
@@ -40,6 +80,9 @@ class InsightPipeline:
             tone: Desired tone for the insights
             date_range: Optional date range for filtering content
             keywords: Optional list of keywords to filter content
+            deadline: Optional latency budget; stages degrade to meet it and the
+                response lists what was degraded
+            resolution: Chart bucket size ("hour", "day" or "week")
             
         Returns:
             InsightResponse object with generated insights
@@ -53,29 +96,58 @@ class InsightPipeline:
             raise ValueError("GROQ_API_KEY is required for insight generation")
         
         try:
-            # Step 1: Scrape content from platforms
-            self.logger.info(f"Scraping content from platforms: {platforms}")
-            scraped_content = await self.scraper.scrape_platforms(platforms, keywords, date_range)
-            
-            # Step 2: Analyze content
-            self.logger.info("Analyzing scraped content")
-            analysis_results = await self.analyst.analyze_content(scraped_content, tone)
-            
-            # Step 3: Create formatted content
-            self.logger.info(f"Creating content with tone: {tone} and preset: {preset}")
-            formatted_results = await self.writer.create_content(analysis_results, tone, preset)
-            
-            # Step 4: Convert to InsightResponse format
-            return self._format_as_insight_response(formatted_results)
+            with span("pipeline", platform=""):
+                # Parse the range once; scrapers only filter when a range was requested
+                window = parse_date_range(date_range)
+                
+                # Step 1: Scrape content from platforms
+                self.logger.info("Scraping content from platforms: %s", platforms)
+                scrape_deadline = deadline.child(self.SCRAPE_BUDGET_FRACTION) if deadline else None
+                scraped_content = await self.scraper.scrape_platforms(
+                    platforms, keywords, window if date_range else None, scrape_deadline
+                )
+                
+                # Label every item locally so charts and the summary do not depend on the LLM
+                with span("sentiment"):
+                    for items in scraped_content.values():
+                        score_items(items)
+                
+                # Step 2: Analyze content
+                self.logger.info("Analyzing scraped content")
+                analysis_results = await self.analyst.analyze_content(
+                    scraped_content, tone, keywords, deadline, window if date_range else None
+                )
+                
+                # Step 3: Create formatted content
+                self.logger.info("Creating content with tone: %s and preset: %s", tone, preset)
+                with span("write"):
+                    formatted_results = await self.writer.create_content(
+                        analysis_results, tone, preset, scraped_content, window, resolution,
+                        # Chart rollups are selected by the keywords the scrape actually used
+                        keywords or self.scraper.DEFAULT_KEYWORDS
+                    )
+                
+                # Step 4: Convert to InsightResponse format
+                with span("format"):
+                    response = self._format_as_insight_response(formatted_results)
+                response.coverage = {
+                    platform: analysis.get("coverage", "real") for platform, analysis in analysis_results.items()
+                }
+                if deadline is not None:
+                    response.degraded = deadline.notes
+                return response
         
         except Exception as e:
-            self.logger.error(f"Error in insight pipeline: {str(e)}")
+            self.logger.error("Error in insight pipeline: %s", e)
             raise
     
     def _format_as_insight_response(self, results: Dict[str, Any]) -> InsightResponse:
         """
         Format the results as an InsightResponse object.
         
+        The response is assembled as plain data and validated in a single
+        model_validate call, instead of constructing every nested model separately.
+        
         Args:
             results: The raw results from the insight pipeline
             
@@ -83,50 +155,34 @@ class InsightPipeline:
             InsightResponse object
         """
         try:
-            # Convert the results to the InsightResponse format
-            from src.backend.schemas.response import InsightResponse, SummaryData, PlatformData, ChartData, InsightItem
-            
-            # Format summary
-            summary_data = SummaryData(
-                totalPosts=results["summary"]["totalPosts"],
-                dominantSentiment=results["summary"]["dominantSentiment"],
-                topPlatform=results["summary"]["topPlatform"]
-            )
-            
-            # Format platforms data
             platforms_data = {}
             for platform, data in results["platforms"].items():
-                # Convert insights
-                insights = []
-                for insight_data in data["insights"]:
-                    insight = InsightItem(
-                        title=insight_data.get("title", "Untitled Insight"),
-                        summary=insight_data.get("summary", ""),
-                        date=insight_data.get("date", "today"),
-                        sentiment=insight_data.get("sentiment", "neutral").capitalize()
-                    )
-                    insights.append(insight)
-                
-                # Convert chart data
-                charts = ChartData(
-                    sentimentTrend=data["charts"]["sentimentTrend"],
-                    engagement=data["charts"]["engagement"]
-                )
-                
-                # Create platform data
-                platform_data = PlatformData(
-                    insights=insights,
-                    charts=charts
-                )
-                
-                platforms_data[platform] = platform_data
+                platforms_data[platform] = {
+                    "insights": [
+                        {
+                            "title": str(insight_data.get("title", "Untitled Insight")),
+                            "summary": str(insight_data.get("summary", "")),
+                            "date": str(insight_data.get("date", "today")),
+                            "sentiment": str(insight_data.get("sentiment", "neutral")).capitalize()
+                        }
+                        for insight_data in data["insights"]
+                    ],
+                    "charts": {
+                        "sentimentTrend": data["charts"]["sentimentTrend"],
+                        "engagement": data["charts"]["engagement"]
+                    }
+                }
             
-            # Create and return the InsightResponse
-            return InsightResponse(
-                summary=summary_data,
-                platforms=platforms_data
-            )
+            summary = results["summary"]
+            return InsightResponse.model_validate({
+                "summary": {
+                    "totalPosts": summary["totalPosts"],
+                    "dominantSentiment": summary["dominantSentiment"],
+                    "topPlatform": summary["topPlatform"]
+                },
+                "platforms": platforms_data
+            })
             
         except Exception as e:
-            self.logger.error(f"Error formatting results as InsightResponse: {str(e)}")
+            self.logger.error("Error formatting results as InsightResponse: %s", e)
             raise
@@ -1,60 +1,340 @@
 
 import requests
-from bs4 import BeautifulSoup
+import asyncio
 import re
+import time
+from datetime import datetime, timezone
 import os
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional
 import logging
+from src.backend.utils.single_flight import SingleFlight
+from src.backend.utils.http_client import JSON_TYPES, create_http_session, fetch_capped
+from src.backend.storage.content_store import ContentStore
+from src.backend.storage.shared_cache import get_shared_cache
+from src.backend.utils.metrics import (
+    CONTENT_STORE_LOOKUPS,
+    DATE_FILTERED_ITEMS,
+    FALLBACK_RESULTS,
+    SCRAPED_ITEMS,
+    platform_label
+)
+from src.backend.utils.tracing import span
+from src.backend.utils.deadline import Deadline, DeadlineExceeded
+from src.backend.utils.date_range import DateWindow
+from src.backend.utils.parsing import ArticleExtractor, is_article_link, parse_article_links, parse_nitter_page
+from src.backend.utils.worker_pool import get_worker_pool
 
 class ScraperAgent:
     """Agent responsible for scraping content from various platforms."""
     
-    def __init__(self):
+    # Process-wide registry shared by all instances, so concurrent requests for the
+    # same (platform, keyword, date window) await one fetch instead of issuing their own
+    _single_flight = SingleFlight(ttl=float(os.getenv("SCRAPE_FRESHNESS_SECONDS", "30")))
+    
+    # Keywords scraped when a request names none
+    DEFAULT_KEYWORDS = ["technology", "ai", "data"]
+    
+    # Reddit search time filters, narrowest first, with how far back each one reaches
+    REDDIT_TIME_FILTERS = (
+        ("hour", 3600),
+        ("day", 86400),
+        ("week", 7 * 86400),
+        ("month", 31 * 86400),
+        ("year", 366 * 86400)
+    )
+    
+    def __init__(self, session: requests.Session = None, store: Optional[ContentStore] = None):
         self.logger = logging.getLogger(__name__)
+        self.session = session or create_http_session()
+        # Connect/read timeout for every HTTP fetch, so a hung source cannot hold a worker thread
+        self.request_timeout = float(os.getenv("SCRAPER_TIMEOUT_SECONDS", "10"))
+        
+        # Repeat lookups are answered from the local index unless explicitly switched off
+        if store is None and os.getenv("CONTENT_STORE", "1") != "0":
+            store = ContentStore()
+        self.store = store
+    
+    def close(self) -> None:
+        """Close the pooled HTTP connections and the content index."""
+        self.session.close()
+        if self.store is not None:
+            self.store.close()
+    
+    @classmethod
+    def fetch_stats(cls) -> Dict[str, int]:
+        """Return counters for shared fetches, including duplicate fetches avoided."""
+        return cls._single_flight.stats()
+    
+    async def _shared_fetch(
+        self,
+        platform: str,
+        key: str,
+        window: Optional[DateWindow],
+        fetch: Callable[[str, Optional[DateWindow]], List[Dict[str, Any]]],
+        deadline: Deadline = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Run a blocking fetch in a worker thread, shared with concurrent identical fetches.
+        
+        Identical fetches are shared within this process and, through the shared
+        cache, with the other worker processes on the host.
+        
+        Args:
+            platform: Platform ID the fetch belongs to
+            key: Keyword or source the fetch is for
+            window: Date window of the fetch, or None for no date filtering
+            fetch: Blocking function called as fetch(key, window)
+            deadline: Optional deadline after which this caller stops waiting
+            
+        Returns:
+            A private copy of the fetched content items
+            
+        Raises:
+            DeadlineExceeded: If the deadline passes before the fetch completes
+        """
+        if deadline is not None and deadline.expired:
+            raise DeadlineExceeded(f"No time left to fetch {platform} {key}")
+        
+        # Empty results (the fetch helpers return [] when a source fails) are not
+        # kept, so the next caller retries instead of reusing an outage
+        shared = self._single_flight.do(
+            (platform, key, window),
+            lambda: self._cached_fetch(platform, key, window, fetch),
+            cacheable=bool
+        )
+        if deadline is None:
+            items = await shared
+        else:
+            # Only this caller gives up; the shared fetch keeps running for the others
+            try:
+                items = await asyncio.wait_for(shared, deadline.remaining())
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded(f"Deadline exceeded while fetching {platform} {key}")
+        
+        # Items are shared between callers, so hand out copies that are safe to mutate
+        return [dict(item) for item in items]
+    
+    async def _cached_fetch(
+        self,
+        platform: str,
+        key: str,
+        window: Optional[DateWindow],
+        fetch: Callable[[str, Optional[DateWindow]], List[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """Fetch in a worker thread unless another worker process fetched the same thing within the freshness TTL."""
+        cache = get_shared_cache()
+        if cache is None or self._single_flight.ttl <= 0:
+            return await asyncio.to_thread(fetch, key, window)
+        
+        # Empty results (e.g. an unreachable source) are not cached, so the next caller retries
+        return await cache.get_or_compute(
+            "scrape",
+            (platform, key, [window.start_ts, window.end_ts] if window is not None else None),
+            lambda: asyncio.to_thread(fetch, key, window),
+            self._single_flight.ttl,
+            cacheable=bool
+        )
+    
+    async def _fetch_all(
+        self,
+        platform: str,
+        keys: List[str],
+        window: Optional[DateWindow],
+        fetch: Callable[[str, Optional[DateWindow]], List[Dict[str, Any]]],
+        deadline: Deadline = None,
+        keyword_keys: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch every key in turn, keeping what was fetched if the deadline passes.
+        
+        Args:
+            keyword_keys: Whether the keys are search keywords (otherwise sources)
+        
+        Raises:
+            DeadlineExceeded: With the items fetched so far attached as `partial`
+        """
+        items = []
+        for key in keys:
+            try:
+                items.extend(await self._indexed_fetch(platform, key, window, fetch, deadline, keyword_keys))
+            except DeadlineExceeded as e:
+                raise DeadlineExceeded(str(e), partial=items)
+        return items
+    
+    async def _indexed_fetch(
+        self,
+        platform: str,
+        key: str,
+        window: Optional[DateWindow],
+        fetch: Callable[[str, Optional[DateWindow]], List[Dict[str, Any]]],
+        deadline: Deadline = None,
+        keyword_key: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Answer a fetch from the content index when it is fresh, otherwise fetch and index.
+        
+        Keyword lookups use the full-text index, so items fetched earlier for other
+        keywords are found too. When a live fetch returns nothing (e.g. the source
+        is unreachable), older indexed items are served instead.
+        
+        Args:
+            platform: Platform ID
+            key: Keyword or source to fetch
+            window: Date window of the fetch, or None
+            fetch: Blocking function called as fetch(key, window)
+            deadline: Optional deadline after which this caller stops waiting
+            keyword_key: Whether `key` is a search keyword (otherwise a source)
+            
+        Returns:
+            Content items for the key
+        """
+        if self.store is None:
+            return await self._shared_fetch(platform, key, window, fetch, deadline)
+        
+        lookup = {"keyword": key} if keyword_key else {"fetch_key": key}
+        if await asyncio.to_thread(self.store.is_fresh, platform, key, window):
+            CONTENT_STORE_LOOKUPS.inc(platform=platform, outcome="hit")
+            return await asyncio.to_thread(self.store.lookup, platform, window, **lookup)
+        
+        items = await self._shared_fetch(platform, key, window, fetch, deadline)
+        if items:
+            CONTENT_STORE_LOOKUPS.inc(platform=platform, outcome="miss")
+            await asyncio.to_thread(
+                self.store.save, platform, key, window, items, key if keyword_key else None
+            )
+            return items
+        
+        indexed = await asyncio.to_thread(self.store.lookup, platform, window, **lookup)
+        if indexed:
+            self.logger.info("Nothing fetched for %s %s, serving %s indexed items", platform, key, len(indexed))
+        CONTENT_STORE_LOOKUPS.inc(platform=platform, outcome="stale" if indexed else "miss")
+        return indexed
     
-    async def scrape_platforms(self, platforms: List[str], keywords: List[str] = None, date_range: str = None) -> Dict[str, List[Dict[str, Any]]]:
+    async def scrape_platforms(
+        self,
+        platforms: List[str],
+        keywords: List[str] = None,
+        window: DateWindow = None,
+        deadline: Deadline = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
         """
-        Scrape content from multiple platforms.
+        Scrape content from multiple platforms concurrently.
         
         Args:
             platforms: List of platform IDs to scrape
             keywords: Optional list of keywords to filter content
-            date_range: Optional date range for filtering content
+            window: Optional date window; it is pushed down into source queries where
+                the source supports it, and dated items outside it are dropped right
+                after extraction
+            deadline: Optional deadline; platforms that cannot finish in time keep
+                partial items or are skipped, and are noted on the deadline
             
         Returns:
             Dictionary mapping platform IDs to lists of content items
         """
         results = {}
-        keywords = keywords or ["technology", "ai", "data"]
+        keywords = keywords or self.DEFAULT_KEYWORDS
         
-        for platform in platforms:
-            self.logger.info(f"Scraping platform: {platform}")
-            try:
+        scraped = await asyncio.gather(*(
+            self._scrape_platform(platform, keywords, window, deadline)
+            for platform in platforms
+        ))
+        
+        for platform, items in zip(platforms, scraped):
+            if items is None:
+                # Skipped to meet the deadline
+                continue
+            results[platform] = items
+            self._record_item_metrics(platform, items)
+                
+        return results
+    
+    async def _scrape_platform(
+        self,
+        platform: str,
+        keywords: List[str],
+        window: DateWindow = None,
+        deadline: Deadline = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Scrape a single platform.
+        
+        Returns:
+            The content items, or None if the platform was skipped to meet the deadline
+        """
+        self.logger.info("Scraping platform: %s", platform)
+        try:
+            with span("scrape", platform):
                 if platform in ["twitter", "x"]:
-                    results[platform] = await self._scrape_twitter(keywords, date_range)
+                    return await self._scrape_twitter(keywords, window, deadline)
                 elif platform == "reddit":
-                    results[platform] = await self._scrape_reddit(keywords, date_range)
+                    return await self._scrape_reddit(keywords, window, deadline)
                 elif platform == "linkedin":
-                    results[platform] = await self._scrape_linkedin(keywords, date_range)
+                    return await self._scrape_linkedin(keywords)
                 elif platform == "instagram":
-                    results[platform] = await self._scrape_instagram(keywords, date_range)
+                    return await self._scrape_instagram(keywords)
                 elif platform == "youtube":
-                    results[platform] = await self._scrape_youtube(keywords, date_range)
+                    return await self._scrape_youtube(keywords)
                 elif platform == "web":
-                    results[platform] = await self._scrape_web_articles(keywords, date_range)
+                    return await self._scrape_web_articles(keywords, window, deadline)
                 else:
-                    self.logger.warning(f"Unsupported platform: {platform}")
-                    results[platform] = []
-            except Exception as e:
-                self.logger.error(f"Error scraping {platform}: {str(e)}")
-                results[platform] = []
-                
-        return results
+                    self.logger.warning("Unsupported platform: %s", platform)
+                    return []
+        except DeadlineExceeded as e:
+            if e.partial:
+                self.logger.warning("Deadline reached while scraping %s, keeping %s items", platform, len(e.partial))
+                deadline.note(platform, "scrape_partial")
+                return e.partial
+            self.logger.warning("Deadline reached before any %s content was scraped, skipping platform", platform)
+            deadline.note(platform, "scrape_skipped")
+            return None
+        except Exception as e:
+            self.logger.error("Error scraping %s: %s", platform, e)
+            return []
+    
+    def _record_item_metrics(self, platform: str, items: List[Dict[str, Any]]) -> None:
+        """Count scraped items and whether the platform fell back to placeholder content."""
+        platform = platform_label(platform)
+        fallback_count = sum(1 for item in items if item.get("is_fallback"))
+        SCRAPED_ITEMS.inc(len(items) - fallback_count, platform=platform, fallback="false")
+        SCRAPED_ITEMS.inc(fallback_count, platform=platform, fallback="true")
+        if items and fallback_count == len(items):
+            FALLBACK_RESULTS.inc(stage="scrape", platform=platform)
     
-    async def _scrape_twitter(self, keywords: List[str], date_range: str = None) -> List[Dict[str, Any]]:
+    def _filter_to_window(
+        self,
+        platform: str,
+        items: List[Dict[str, Any]],
+        window: Optional[DateWindow],
+        stage: str = "extract"
+    ) -> List[Dict[str, Any]]:
+        """
+        Drop dated items that fall outside the window, counting them per stage.
+        
+        Items without a timestamp are kept, since their date is unknown.
+        """
+        if window is None:
+            return items
+        
+        kept = [item for item in items if item.get("timestamp") is None or window.contains(item["timestamp"])]
+        dropped = len(items) - len(kept)
+        if dropped:
+            DATE_FILTERED_ITEMS.inc(dropped, platform=platform, stage=stage)
+            self.logger.info("Dropped %s %s items outside %s to %s", dropped, platform, window.start.date(), window.end.date())
+        return kept
+    
+    def _reddit_time_filter(self, window: DateWindow) -> str:
+        """Return the narrowest Reddit search time filter that reaches back to the window start."""
+        age = time.time() - window.start_ts
+        for name, seconds in self.REDDIT_TIME_FILTERS:
+            if age <= seconds:
+                return name
+        return "all"
+    
+    async def _scrape_twitter(self, keywords: List[str], window: DateWindow = None, deadline: Deadline = None) -> List[Dict[str, Any]]:
         """Scrape Twitter/X content."""
-        self.logger.info(f"Scraping Twitter for keywords: {keywords}")
+        self.logger.info("Scraping Twitter for keywords: %s", keywords)
         
         # Since Twitter API requires authentication and may be restricted,
         # we'll use a basic web scraping approach or placeholder data
@@ -62,38 +342,7 @@ class ScraperAgent:
         # This is a simplified approach - in production, you would use Twitter API
         # or a specialized scraping tool with proper authentication
         
-        sample_content = []
-        for keyword in keywords:
-            # For demo purposes - in production replace with real API calls
-            search_url = f"https://nitter.net/search?f=tweets&q={keyword}"
-            try:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-                response = requests.get(search_url, headers=headers)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    tweet_elements = soup.select('.timeline-item')[:5]  # Limit to 5 tweets
-                    
-                    for tweet in tweet_elements:
-                        content_element = tweet.select_one('.tweet-content')
-                        username_element = tweet.select_one('.username')
-                        date_element = tweet.select_one('.tweet-date')
-                        
-                        if content_element and username_element:
-                            content = content_element.get_text().strip()
-                            username = username_element.get_text().strip()
-                            date = date_element.get_text().strip() if date_element else "Unknown date"
-                            
-                            sample_content.append({
-                                "platform": "twitter",
-                                "author": username,
-                                "content": content,
-                                "date": date,
-                                "keyword": keyword
-                            })
-            except Exception as e:
-                self.logger.error(f"Error scraping Twitter for keyword {keyword}: {str(e)}")
+        sample_content = await self._fetch_all("twitter", keywords, window, self._fetch_twitter_keyword, deadline)
         
         # If no content was scraped, return some basic information
         if not sample_content:
@@ -111,37 +360,30 @@ class ScraperAgent:
         
         return sample_content
     
-    async def _scrape_reddit(self, keywords: List[str], date_range: str = None) -> List[Dict[str, Any]]:
+    def _fetch_twitter_keyword(self, keyword: str, window: DateWindow = None) -> List[Dict[str, Any]]:
+        """Fetch tweets for a single keyword (blocking, runs in a worker thread)."""
+        sample_content = []
+        
+        # For demo purposes - in production replace with real API calls
+        search_url = f"https://nitter.net/search?f=tweets&q={keyword}"
+        if window is not None:
+            # Nitter's until is exclusive, like the window end
+            search_url += f"&since={window.start:%Y-%m-%d}&until={window.end:%Y-%m-%d}"
+        try:
+            page = fetch_capped(self.session, search_url, "twitter", self.request_timeout)
+            if page is not None and page.status_code == 200:
+                # Parsing is CPU-bound; run it in the worker pool, off the GIL
+                sample_content = get_worker_pool().run_blocking("html", parse_nitter_page, page.text, keyword)
+        except Exception as e:
+            self.logger.error("Error scraping Twitter for keyword %s: %s", keyword, e)
+        
+        return self._filter_to_window("twitter", sample_content, window)
+    
+    async def _scrape_reddit(self, keywords: List[str], window: DateWindow = None, deadline: Deadline = None) -> List[Dict[str, Any]]:
         """Scrape Reddit content."""
-        self.logger.info(f"Scraping Reddit for keywords: {keywords}")
+        self.logger.info("Scraping Reddit for keywords: %s", keywords)
         
-        sample_content = []
-        for keyword in keywords:
-            # Use Reddit JSON API (which doesn't require authentication for basic searches)
-            search_url = f"https://www.reddit.com/search.json?q={keyword}&sort=relevance&limit=5"
-            try:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-                response = requests.get(search_url, headers=headers)
-                if response.status_code == 200:
-                    data = response.json()
-                    posts = data.get('data', {}).get('children', [])
-                    
-                    for post in posts:
-                        post_data = post.get('data', {})
-                        sample_content.append({
-                            "platform": "reddit",
-                            "subreddit": post_data.get('subreddit', 'unknown'),
-                            "title": post_data.get('title', ''),
-                            "content": post_data.get('selftext', '')[:500],  # Limit content length
-                            "author": post_data.get('author', 'unknown'),
-                            "url": f"https://www.reddit.com{post_data.get('permalink', '')}",
-                            "score": post_data.get('score', 0),
-                            "keyword": keyword
-                        })
-            except Exception as e:
-                self.logger.error(f"Error scraping Reddit for keyword {keyword}: {str(e)}")
+        sample_content = await self._fetch_all("reddit", keywords, window, self._fetch_reddit_keyword, deadline)
         
         # Fallback content if nothing was scraped
         if not sample_content:
@@ -160,12 +402,47 @@ class ScraperAgent:
         
         return sample_content
     
-    async def _scrape_web_articles(self, keywords: List[str], date_range: str = None) -> List[Dict[str, Any]]:
-        """Scrape general web articles related to keywords."""
-        self.logger.info(f"Scraping web articles for keywords: {keywords}")
-        
+    def _fetch_reddit_keyword(self, keyword: str, window: DateWindow = None) -> List[Dict[str, Any]]:
+        """Fetch Reddit posts for a single keyword (blocking, runs in a worker thread)."""
         sample_content = []
         
+        # Use Reddit JSON API (which doesn't require authentication for basic searches)
+        search_url = f"https://www.reddit.com/search.json?q={keyword}&sort=relevance&limit=5"
+        if window is not None:
+            # Reddit only offers relative time filters, so exact bounds are applied after extraction
+            search_url += f"&t={self._reddit_time_filter(window)}"
+        try:
+            page = fetch_capped(self.session, search_url, "reddit", self.request_timeout, allowed_types=JSON_TYPES)
+            if page is not None and page.status_code == 200:
+                if page.truncated:
+                    raise ValueError(f"response exceeded {page.size} bytes")
+                data = json.loads(page.text)
+                posts = data.get('data', {}).get('children', [])
+                
+                for post in posts:
+                    post_data = post.get('data', {})
+                    created = post_data.get('created_utc')
+                    sample_content.append({
+                        "platform": "reddit",
+                        "subreddit": post_data.get('subreddit', 'unknown'),
+                        "title": post_data.get('title', ''),
+                        "content": post_data.get('selftext', '')[:500],  # Limit content length
+                        "author": post_data.get('author', 'unknown'),
+                        "url": f"https://www.reddit.com{post_data.get('permalink', '')}",
+                        "score": post_data.get('score', 0),
+                        "date": datetime.fromtimestamp(created, timezone.utc).strftime("%Y-%m-%d") if created else "recent",
+                        "timestamp": created,
+                        "keyword": keyword
+                    })
+        except Exception as e:
+            self.logger.error("Error scraping Reddit for keyword %s: %s", keyword, e)
+        
+        return self._filter_to_window("reddit", sample_content, window)
+    
+    async def _scrape_web_articles(self, keywords: List[str], window: DateWindow = None, deadline: Deadline = None) -> List[Dict[str, Any]]:
+        """Scrape general web articles related to keywords."""
+        self.logger.info("Scraping web articles for keywords: %s", keywords)
+        
         # We'll use a simple approach to scrape some news sites
         # For demo purposes - in production you might want to use a service like NewsAPI
         news_sources = [
@@ -174,55 +451,17 @@ class ScraperAgent:
             "https://www.wired.com/"
         ]
         
-        for source in news_sources:
-            try:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-                response = requests.get(source, headers=headers)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Extract article links - this will vary by site structure
-                    articles = soup.find_all('a', href=True)
-                    article_links = [a['href'] for a in articles if self._is_article_link(a['href'], source)]
-                    
-                    # Limit to 3 articles per source
-                    for link in article_links[:3]:
-                        # Normalize URL if it's relative
-                        if not link.startswith('http'):
-                            if link.startswith('/'):
-                                link = source.rstrip('/') + link
-                            else:
-                                link = source.rstrip('/') + '/' + link
-                        
-                        try:
-                            article_response = requests.get(link, headers=headers)
-                            if article_response.status_code == 200:
-                                article_soup = BeautifulSoup(article_response.text, 'html.parser')
-                                
-                                # Extract title - common patterns
-                                title = article_soup.find('h1')
-                                title_text = title.get_text().strip() if title else "Untitled Article"
-                                
-                                # Extract content - this is simplified and will vary by site
-                                paragraphs = article_soup.find_all('p')
-                                content = " ".join([p.get_text().strip() for p in paragraphs[:5]])
-                                
-                                # Only include if the content matches any of our keywords
-                                if any(keyword.lower() in (title_text + " " + content).lower() for keyword in keywords):
-                                    sample_content.append({
-                                        "platform": "web",
-                                        "source": source,
-                                        "title": title_text,
-                                        "content": content[:1000],  # Limit content length
-                                        "url": link,
-                                        "matched_keywords": [k for k in keywords if k.lower() in (title_text + " " + content).lower()]
-                                    })
-                        except Exception as e:
-                            self.logger.error(f"Error processing article {link}: {str(e)}")
-            except Exception as e:
-                self.logger.error(f"Error scraping source {source}: {str(e)}")
+        # Articles are fetched per source regardless of keywords, so one fetch
+        # is shared by every concurrent request and filtered per request below
+        try:
+            articles = await self._fetch_all(
+                "web", news_sources, window, self._fetch_web_source, deadline, keyword_keys=False
+            )
+        except DeadlineExceeded as e:
+            e.partial = self._match_articles(e.partial, keywords)
+            raise
+        
+        sample_content = self._match_articles(articles, keywords)
         
         # Fallback content if nothing was scraped
         if not sample_content:
@@ -239,28 +478,93 @@ class ScraperAgent:
         
         return sample_content
     
+    def _match_articles(self, articles: List[Dict[str, Any]], keywords: List[str]) -> List[Dict[str, Any]]:
+        """Keep the articles that mention any keyword, recording which ones matched."""
+        matched = []
+        for article in articles:
+            text = (article["title"] + " " + article["content"]).lower()
+            matched_keywords = [k for k in keywords if k.lower() in text]
+            
+            # Only include if the content matches any of our keywords
+            if matched_keywords:
+                article["content"] = article["content"][:1000]  # Limit content length
+                article["matched_keywords"] = matched_keywords
+                matched.append(article)
+        return matched
+    
+    def _fetch_web_source(self, source: str, window: DateWindow = None) -> List[Dict[str, Any]]:
+        """Fetch the latest articles from one news source (blocking, runs in a worker thread)."""
+        articles = []
+        
+        try:
+            page = fetch_capped(self.session, source, "web", self.request_timeout)
+            if page is not None and page.status_code == 200:
+                # Extract article links - this will vary by site structure
+                article_links = get_worker_pool().run_blocking("html", parse_article_links, page.text)
+                
+                # Skip links whose URL date is outside the window before fetching them
+                if window is not None:
+                    in_window = [link for link in article_links if self._url_date_in_window(link, window)]
+                    if len(in_window) < len(article_links):
+                        DATE_FILTERED_ITEMS.inc(len(article_links) - len(in_window), platform="web", stage="url")
+                    article_links = in_window
+                
+                # Limit to 3 articles per source
+                for link in article_links[:3]:
+                    # Normalize URL if it's relative
+                    if not link.startswith('http'):
+                        if link.startswith('/'):
+                            link = source.rstrip('/') + link
+                        else:
+                            link = source.rstrip('/') + '/' + link
+                    
+                    try:
+                        # Only the title and first paragraphs are used, so parse while
+                        # downloading and stop once the extractor has them
+                        extractor = ArticleExtractor()
+                        article_page = fetch_capped(
+                            self.session, link, "web", self.request_timeout, consumer=extractor.feed_chunk
+                        )
+                        if article_page is not None and article_page.status_code == 200:
+                            parsed = extractor.result()
+                            timestamp = parsed["timestamp"]
+                            
+                            articles.append({
+                                "platform": "web",
+                                "source": source,
+                                "title": parsed["title"],
+                                "content": parsed["content"],
+                                "url": link,
+                                "date": datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d") if timestamp else "recent",
+                                "timestamp": timestamp
+                            })
+                    except Exception as e:
+                        self.logger.error("Error processing article %s: %s", link, e)
+        except Exception as e:
+            self.logger.error("Error scraping source %s: %s", source, e)
+        
+        return self._filter_to_window("web", articles, window)
+    
+    def _url_date_in_window(self, url: str, window: DateWindow) -> bool:
+        """Whether the /YYYY/MM/DD/ date in an article URL overlaps the window (undated URLs pass)."""
+        match = re.search(r'/(\d{4})/(\d{2})/(\d{2})/', url)
+        if not match:
+            return True
+        try:
+            day = datetime(*map(int, match.groups()), tzinfo=timezone.utc).timestamp()
+        except ValueError:
+            return True
+        return day < window.end_ts and day + 86400 > window.start_ts
+    
     def _is_article_link(self, href: str, source: str) -> bool:
         """
         Determine if a link is likely an article based on URL patterns.
         This will vary by news site structure.
         """
-        if not href or href.startswith('#') or href.startswith('javascript:'):
-            return False
-            
-        # Common article URL patterns
-        if re.search(r'/\d{4}/\d{2}/\d{2}/', href):  # Date pattern
-            return True
-        if re.search(r'/article/', href):
-            return True
-        if re.search(r'/news/', href):
-            return True
-        if re.search(r'/posts/', href):
-            return True
-            
-        return False
+        return is_article_link(href)
     
     # Implement other platform scrapers with similar patterns
-    async def _scrape_linkedin(self, keywords: List[str], date_range: str = None) -> List[Dict[str, Any]]:
+    async def _scrape_linkedin(self, keywords: List[str]) -> List[Dict[str, Any]]:
         """
         LinkedIn scraping is complex due to authentication requirements.
         This is a simplified approach - in production, you would use LinkedIn API 
@@ -279,7 +583,7 @@ class ScraperAgent:
             })
         return sample_content
     
-    async def _scrape_instagram(self, keywords: List[str], date_range: str = None) -> List[Dict[str, Any]]:
+    async def _scrape_instagram(self, keywords: List[str]) -> List[Dict[str, Any]]:
         """
         Instagram scraping is challenging due to API restrictions.
         This is a simplified approach.
@@ -298,7 +602,7 @@ class ScraperAgent:
             })
         return sample_content
     
-    async def _scrape_youtube(self, keywords: List[str], date_range: str = None) -> List[Dict[str, Any]]:
+    async def _scrape_youtube(self, keywords: List[str]) -> List[Dict[str, Any]]:
         """
         YouTube scraping would ideally use their API.
         This is a simplified approach for demo purposes.
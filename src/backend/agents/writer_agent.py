@@ -1,22 +1,42 @@
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+import asyncio
 import logging
 import os
-from dotenv import load_dotenv
+from src.backend.storage.rollup_store import RollupStore
 from src.backend.utils.groq_handler import call_llm
+from src.backend.utils.date_range import DateWindow, parse_date_range
+from src.backend.utils.sentiment import sentiment_counts
+from src.backend.utils.timeseries import (
+    engagement_series,
+    item_engagement,
+    item_timestamps,
+    sentiment_series,
+    weighted_sentiment_series
+)
 import json
+import numpy as np
 from datetime import datetime
 
-# Load environment variables
-load_dotenv()
-
 class WriterAgent:
     """Agent responsible for crafting engaging content based on insights."""
     
-    def __init__(self):
+    def __init__(self, rollups: Optional[RollupStore] = None):
         self.logger = logging.getLogger(__name__)
+        if rollups is None and os.getenv("ROLLUP_STORE", "1") != "0":
+            rollups = RollupStore()
+        self.rollups = rollups
     
-    async def create_content(self, analysis_results: Dict[str, Any], tone: str = "professional", preset: str = "standard") -> Dict[str, Any]:
+    async def create_content(
+        self,
+        analysis_results: Dict[str, Any],
+        tone: str = "professional",
+        preset: str = "standard",
+        platform_items: Dict[str, List[Dict[str, Any]]] = None,
+        window: Optional[DateWindow] = None,
+        resolution: str = "day",
+        keywords: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """
         Create engaging content based on analysis results.
         
@@ -24,149 +44,209 @@ class WriterAgent:
             analysis_results: Results from the AnalystAgent
             tone: Desired tone for content ("professional", "viral", "casual")
             preset: Content preset style ("standard", "insight_composer", etc.)
+            platform_items: Scraped content items per platform, used for the chart series
+            window: Time window the charts should cover (defaults to the last 7 days)
+            resolution: Chart bucket size ("hour", "day" or "week")
+            keywords: Keywords the items were scraped for, used to select chart rollups
             
         Returns:
             Dictionary containing formatted content per platform
         """
         formatted_results = {}
+        platform_items = platform_items or {}
+        window = window or parse_date_range(None)
         
         for platform, analysis in analysis_results.items():
             try:
-                self.logger.info(f"Creating content for platform: {platform} with tone: {tone}")
+                self.logger.info("Creating content for platform: %s with tone: %s", platform, tone)
+                
+                items = platform_items.get(platform, [])
+                overall_sentiment = analysis.get("sentiment", "neutral")
+                charts = await self._charts_from_rollups(
+                    platform, items, overall_sentiment, keywords, window, resolution
+                )
+                if charts is None:
+                    charts = self._generate_charts(items, overall_sentiment, window, resolution)
                 
                 # Skip if there are no insights
                 if not analysis.get("insights", []):
-                    self.logger.warning(f"No insights to create content for platform: {platform}")
-                    formatted_results[platform] = self._create_empty_platform_result()
+                    self.logger.warning("No insights to create content for platform: %s", platform)
+                    formatted_results[platform] = {"insights": [], "charts": charts}
                     continue
                 
-                # Format insights for readability
-                insights = analysis.get("insights", [])
-                sentiment_trend_data = self._generate_sentiment_trend(analysis.get("sentiment", "neutral"))
-                engagement_data = self._generate_engagement_data()
-                
                 # Create platform-specific content
                 platform_result = {
-                    "insights": insights,
-                    "charts": {
-                        "sentimentTrend": sentiment_trend_data,
-                        "engagement": engagement_data
-                    }
+                    "insights": analysis.get("insights", []),
+                    "charts": charts
                 }
                 
                 formatted_results[platform] = platform_result
                 
             except Exception as e:
-                self.logger.error(f"Error creating content for {platform}: {str(e)}")
-                formatted_results[platform] = self._create_empty_platform_result()
+                self.logger.error("Error creating content for %s: %s", platform, e)
+                formatted_results[platform] = self._create_empty_platform_result(window, resolution)
         
         # Calculate summary across all platforms
-        summary = self._calculate_summary(formatted_results)
+        summary = self._calculate_summary(formatted_results, platform_items)
         
         return {
             "summary": summary,
             "platforms": formatted_results
         }
     
-    def _create_empty_platform_result(self) -> Dict[str, Any]:
+    def _create_empty_platform_result(self, window: DateWindow, resolution: str = "day") -> Dict[str, Any]:
         """Create an empty result structure for a platform with no insights."""
         return {
             "insights": [],
-            "charts": {
-                "sentimentTrend": self._generate_sentiment_trend("neutral"),
-                "engagement": self._generate_engagement_data()
-            }
+            "charts": self._generate_charts([], "neutral", window, resolution)
         }
     
-    def _generate_sentiment_trend(self, overall_sentiment: str) -> List[Dict[str, Any]]:
+    async def _charts_from_rollups(
+        self,
+        platform: str,
+        items: List[Dict[str, Any]],
+        overall_sentiment: str,
+        keywords: Optional[List[str]],
+        window: DateWindow,
+        resolution: str = "day"
+    ) -> Optional[Dict[str, List[Dict[str, Any]]]]:
         """
-        Generate sentiment trend data based on the overall sentiment.
-        In a production app, this would be derived from actual data trends.
+        Record the scraped items in the rollup store and build the charts from its buckets.
+        
+        The rollups hold every item seen so far, so the charts cover the whole window
+        rather than just the latest scrape, without re-bucketing raw items per request.
         
         Args:
-            overall_sentiment: Overall sentiment (positive/neutral/negative)
+            platform: Platform ID
+            items: Scraped content items for the platform
+            overall_sentiment: Sentiment used for items without their own sentiment label
+            keywords: Keywords the items were scraped for
+            window: Time window the charts cover
+            resolution: Chart bucket size
             
         Returns:
-            List of sentiment data points for the chart
+            Chart dictionary, or None if the charts should be built from the items instead
         """
-        import random
-        from datetime import datetime, timedelta
-        
-        today = datetime.now()
-        sentiment_data = []
-        
-        # Adjust sentiment weights based on overall sentiment
-        sentiment_weights = {
-            "positive": {"positive": 50, "neutral": 30, "negative": 20},
-            "neutral": {"positive": 33, "neutral": 34, "negative": 33},
-            "negative": {"positive": 20, "neutral": 30, "negative": 50}
-        }.get(overall_sentiment, {"positive": 33, "neutral": 34, "negative": 33})
-        
-        # Generate 7 days of data
-        for i in range(7):
-            date = today - timedelta(days=i)
-            date_str = date.strftime("%Y-%m-%d")
-            
-            # Adjust values to roughly maintain the overall sentiment ratio with some variance
-            positive_base = sentiment_weights["positive"]
-            neutral_base = sentiment_weights["neutral"]
-            negative_base = sentiment_weights["negative"]
-            
-            # Add randomness while keeping the trend consistent with overall sentiment
-            positive = max(min(positive_base + random.randint(-15, 15), 70), 30)
-            neutral = max(min(neutral_base + random.randint(-10, 10), 40), 20)
-            negative = max(min(negative_base + random.randint(-10, 10), 50), 5)
-            
-            sentiment_data.append({
-                "date": date_str,
-                "positive": positive,
-                "neutral": neutral,
-                "negative": negative
-            })
-        
-        return sentiment_data
+        # Rollups are daily at their finest, so hourly charts always use the raw items
+        if self.rollups is None or resolution == "hour":
+            return None
+        
+        try:
+            await asyncio.to_thread(self.rollups.record, platform, items, overall_sentiment)
+            rows = await asyncio.to_thread(
+                self.rollups.query, platform, keywords, window.start_ts, window.end_ts
+            )
+        except Exception as e:
+            self.logger.error("Error reading chart rollups for %s: %s", platform, e)
+            return None
+        
+        if not rows:
+            return None
+        
+        timestamps = np.array([row["bucket_start"] for row in rows], dtype=np.float64)
+        counts = np.array([[row["positive"], row["neutral"], row["negative"]] for row in rows], dtype=np.float64)
+        engagement = np.array([row["engagement"] for row in rows], dtype=np.float64)
+        
+        return {
+            "sentimentTrend": weighted_sentiment_series(timestamps, counts, window, resolution),
+            "engagement": engagement_series(timestamps, engagement, window, resolution)
+        }
     
-    def _generate_engagement_data(self) -> List[Dict[str, Any]]:
+    def _generate_charts(
+        self,
+        items: List[Dict[str, Any]],
+        overall_sentiment: str,
+        window: DateWindow,
+        resolution: str = "day"
+    ) -> Dict[str, List[Dict[str, Any]]]:
         """
-        Generate engagement data for charts.
-        In a production app, this would be derived from actual engagement metrics.
+        Build the sentiment and engagement series for a platform from its scraped items.
+        
+        Fallback placeholder items are not real content and are left out, as in
+        the rollup store.
         
+        Args:
+            items: Scraped content items for the platform
+            overall_sentiment: Sentiment used for items without their own sentiment label
+            window: Time window the charts cover
+            resolution: Chart bucket size
+            
         Returns:
-            List of engagement data points for the chart
+            Dictionary with "sentimentTrend" and "engagement" series
         """
-        import random
-        from datetime import datetime, timedelta
-        
-        today = datetime.now()
-        engagement_data = []
+        items = [item for item in items if not item.get("is_fallback")]
+        timestamps = item_timestamps(items)
+        return {
+            "sentimentTrend": self._generate_sentiment_trend(items, timestamps, overall_sentiment, window, resolution),
+            "engagement": self._generate_engagement_data(items, timestamps, window, resolution)
+        }
+    
+    def _generate_sentiment_trend(
+        self,
+        items: List[Dict[str, Any]],
+        timestamps: np.ndarray,
+        overall_sentiment: str,
+        window: DateWindow,
+        resolution: str = "day"
+    ) -> List[Dict[str, Any]]:
+        """
+        Count items per sentiment class for each bucket of the window, newest first.
         
-        # Generate 7 days of data
-        for i in range(7):
-            date = today - timedelta(days=i)
-            date_str = date.strftime("%Y-%m-%d")
-            
-            # Random engagement value between 100 and 500
-            value = random.randint(100, 500)
+        Args:
+            items: Scraped content items
+            timestamps: Item timestamps (epoch seconds)
+            overall_sentiment: Sentiment assumed for items without their own label
+            window: Time window to cover
+            resolution: Chart bucket size
             
-            engagement_data.append({
-                "date": date_str,
-                "value": value
-            })
+        Returns:
+            List of sentiment data points for the chart
+        """
+        sentiments = [item.get("sentiment") or overall_sentiment for item in items]
+        return sentiment_series(timestamps, sentiments, window, resolution)
+    
+    def _generate_engagement_data(
+        self,
+        items: List[Dict[str, Any]],
+        timestamps: np.ndarray,
+        window: DateWindow,
+        resolution: str = "day"
+    ) -> List[Dict[str, Any]]:
+        """
+        Sum engagement (e.g. Reddit score, or one per item) for each bucket of the window, newest first.
         
-        return engagement_data
+        Args:
+            items: Scraped content items
+            timestamps: Item timestamps (epoch seconds)
+            window: Time window to cover
+            resolution: Chart bucket size
+            
+        Returns:
+            List of engagement data points for the chart
+        """
+        return engagement_series(timestamps, item_engagement(items), window, resolution)
     
-    def _calculate_summary(self, platform_results: Dict[str, Any]) -> Dict[str, Any]:
+    def _calculate_summary(
+        self,
+        platform_results: Dict[str, Any],
+        platform_items: Dict[str, List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
         """
         Calculate summary statistics from all platform data.
         
+        The dominant sentiment is taken from the locally labelled items when there
+        are any, and from the insight labels otherwise.
+        
         Args:
             platform_results: Results for all platforms
+            platform_items: Scraped content items per platform
             
         Returns:
             Summary dictionary
         """
         total_posts = 0
-        sentiment_counts = {"Positive": 0, "Neutral": 0, "Negative": 0}
+        insight_sentiments = {"Positive": 0, "Neutral": 0, "Negative": 0}
+        item_sentiments = {"Positive": 0, "Neutral": 0, "Negative": 0}
         platform_insight_counts = {}
         
         # Process each platform
@@ -178,10 +258,15 @@ class WriterAgent:
             # Count sentiments
             for insight in platform_insights:
                 sentiment = insight.get("sentiment", "neutral").capitalize()
-                sentiment_counts[sentiment] += 1
+                if sentiment in insight_sentiments:
+                    insight_sentiments[sentiment] += 1
+            
+            for sentiment, count in sentiment_counts((platform_items or {}).get(platform, [])).items():
+                item_sentiments[sentiment.capitalize()] += count
         
         # Find dominant sentiment
-        dominant_sentiment = max(sentiment_counts, key=sentiment_counts.get) if sentiment_counts else "Neutral"
+        counts = item_sentiments if sum(item_sentiments.values()) else insight_sentiments
+        dominant_sentiment = max(counts, key=counts.get)
         
         # Find top platform
         top_platform = max(platform_insight_counts, key=platform_insight_counts.get) if platform_insight_counts else ""
@@ -0,0 +1,244 @@
+
+"""
+Micro-benchmarks for the CPU-bound helpers that run for every platform on every request.
+
+Each helper is timed on generated inputs at several sizes: prompt building,
+LLM response parsing, article link filtering, summary statistics and response
+formatting. Results can be saved as a baseline and later checked against it;
+the check exits with status 1 when any case is slower than the baseline by
+more than the tolerance, so it can gate a change in CI or before a commit.
+
+Baselines are machine-specific, so they are kept under .insight_data/ by
+default rather than in the repository.
+
+Run from the repository root:
+    python -m src.backend.benchmarks.hot_paths --save-baseline
+    python -m src.backend.benchmarks.hot_paths --check --tolerance 0.2
+"""
+
+import argparse
+import json
+import os
+import platform as platform_info
+import random
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+from src.backend.benchmarks.load_test import git_commit
+from src.backend.benchmarks.response_serialization import build_results
+from src.backend.benchmarks.stand_ins import StubSession, llm_response, sample_items
+from src.backend.utils.sentiment import score_items
+
+DEFAULT_BASELINE = os.path.join(".insight_data", "benchmarks", "hot_paths_baseline.json")
+
+PLATFORMS = ["reddit", "x", "web", "linkedin"]
+
+# Benchmark name -> input sizes
+SIZES = {
+    "prepare_content": [10, 100, 1000],
+    "parse_llm_response": [5, 50, 500],
+    "is_article_link": [100, 1000, 10000],
+    "calculate_summary": [10, 100, 1000],
+    "format_response": [10, 100, 300]
+}
+
+def _agents():
+    """Build the agents without their local stores or network sessions."""
+    # The stores are switched off before the agents are imported and created
+    os.environ.update({"DELTA_ANALYSIS": "0", "ROLLUP_STORE": "0", "CONTENT_STORE": "0"})
+    
+    from src.backend.agents.analyst_agent import AnalystAgent
+    from src.backend.agents.run_agents import InsightPipeline
+    from src.backend.agents.scraper_agent import ScraperAgent
+    from src.backend.agents.writer_agent import WriterAgent
+    
+    analyst = AnalystAgent()
+    scraper = ScraperAgent(session=StubSession(latency=0))
+    writer = WriterAgent()
+    pipeline = InsightPipeline(scraper=scraper, analyst=analyst, writer=writer)
+    return analyst, scraper, writer, pipeline
+
+def sample_links(count: int, seed: int = 0) -> List[Tuple[str, str]]:
+    """Generate (href, source) pairs like the anchors found on news index pages."""
+    rng = random.Random(seed)
+    shapes = [
+        "/{y}/{m:02d}/{d:02d}/story-{i}/",
+        "https://example.com/article/{i}-ai-model-release",
+        "/news/technology-{i}",
+        "/posts/{i}",
+        "/tag/ai",
+        "/about",
+        "https://example.com/author/staff-{i}",
+        "#comments",
+        "javascript:void(0)",
+        ""
+    ]
+    return [
+        (
+            rng.choice(shapes).format(y=2025, m=rng.randint(1, 12), d=rng.randint(1, 28), i=i),
+            "https://example.com"
+        )
+        for i in range(count)
+    ]
+
+def build_cases() -> Dict[str, Callable[[], Any]]:
+    """
+    Build one callable per benchmark case, keyed as "name[size]".
+    
+    Inputs are generated once up front, so only the helper itself is timed.
+    """
+    analyst, scraper, writer, pipeline = _agents()
+    cases: Dict[str, Callable[[], Any]] = {}
+    
+    for size in SIZES["prepare_content"]:
+        items = sample_items(size, seed=size)
+        cases[f"prepare_content[{size}]"] = lambda items=items: analyst._prepare_content_for_analysis(items)
+    
+    for size in SIZES["parse_llm_response"]:
+        # Models often wrap the JSON in prose and a code fence
+        response = f"Here is the analysis you asked for:\n```json\n{llm_response(insights=size)}\n```\nLet me know if you need more."
+        cases[f"parse_llm_response[{size}]"] = lambda response=response: analyst._parse_llm_response(response, "reddit")
+    
+    for size in SIZES["is_article_link"]:
+        links = sample_links(size, seed=size)
+        cases[f"is_article_link[{size}]"] = lambda links=links: [scraper._is_article_link(href, source) for href, source in links]
+    
+    for size in SIZES["calculate_summary"]:
+        platform_items = {p: sample_items(size, platform=p, seed=size) for p in PLATFORMS}
+        for items in platform_items.values():
+            score_items(items)
+        platform_results = {
+            p: {"insights": json.loads(llm_response(insights=max(1, size // 10)))["insights"]}
+            for p in PLATFORMS
+        }
+        cases[f"calculate_summary[{size}]"] = (
+            lambda results=platform_results, items=platform_items: writer._calculate_summary(results, items)
+        )
+    
+    for size in SIZES["format_response"]:
+        results = build_results(len(PLATFORMS), size)
+        cases[f"format_response[{size}]"] = lambda results=results: pipeline._format_as_insight_response(results)
+    
+    return cases
+
+def measure(fn: Callable[[], Any], repeat: int) -> float:
+    """
+    Return the best microseconds per call over `repeat` rounds.
+    
+    Each round runs enough calls to take at least 0.2 s (timeit's autorange), and
+    the minimum is reported since slower rounds only add scheduling noise.
+    """
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+def run(repeat: int = 5, only: str = None, cases: Dict[str, Callable[[], Any]] = None) -> Dict[str, float]:
+    """
+    Time every case.
+    
+    Args:
+        repeat: Rounds per case
+        only: Optional substring; only matching cases are run
+        cases: Cases to run (defaults to build_cases())
+    
+    Returns:
+        Microseconds per call, keyed by case
+    """
+    cases = cases if cases is not None else build_cases()
+    return {
+        name: round(measure(fn, repeat), 3)
+        for name, fn in cases.items()
+        if not only or only in name
+    }
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[Dict[str, Any]]:
+    """
+    Compare results with a baseline.
+    
+    Args:
+        results: Current microseconds per call
+        baseline: Baseline microseconds per call
+        tolerance: Allowed slowdown as a fraction (0.2 allows 20% slower)
+    
+    Returns:
+        One row per case with the ratio to the baseline and whether it regressed
+    """
+    rows = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        ratio = current / previous if previous else None
+        rows.append({
+            "case": name,
+            "baseline_us": previous,
+            "current_us": current,
+            "ratio": round(ratio, 3) if ratio is not None else None,
+            "regressed": ratio is not None and ratio > 1 + tolerance
+        })
+    return rows
+
+def _environment() -> Dict[str, str]:
+    """Describe where the numbers were measured."""
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform_info.python_version(),
+        "machine": f"{platform_info.system()} {platform_info.machine()}"
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Rounds per case (the best round is kept)")
+    parser.add_argument("--only", default=None, help="Only run cases whose name contains this text")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if any case regressed")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before a case counts as regressed")
+    parser.add_argument("--output", default=None, help="Optional JSON file for these results")
+    args = parser.parse_args()
+    
+    cases = build_cases()
+    results = run(args.repeat, args.only, cases)
+    
+    baseline: Dict[str, float] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f).get("results", {})
+    elif args.check:
+        parser.error(f"No baseline at {args.baseline}; run with --save-baseline first")
+    
+    rows = compare(results, baseline, args.tolerance)
+    suspects = {row["case"]: cases[row["case"]] for row in rows if row["regressed"]}
+    if suspects:
+        # Time apparent regressions once more and keep the better run, to filter out one-off noise
+        retried = run(args.repeat, cases=suspects)
+        results.update({name: min(results[name], retried[name]) for name in retried})
+        rows = compare(results, baseline, args.tolerance)
+    
+    for row in rows:
+        line = f"{row['case']:<28} {row['current_us']:>12.2f} us"
+        if row["ratio"] is not None:
+            line += f"  {row['ratio']:>6.2f}x baseline"
+            if row["regressed"]:
+                line += "  REGRESSED"
+        print(line)
+    
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({**_environment(), "results": results, "comparison": rows}, f, indent=2)
+    
+    if args.save_baseline:
+        # Cases not run this time keep their previous baseline
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({**_environment(), "results": {**baseline, **results}}, f, indent=2)
+        print(f"Saved baseline {args.baseline}")
+    
+    regressed = [row["case"] for row in rows if row["regressed"]]
+    if args.check and regressed:
+        print(f"{len(regressed)} case(s) regressed beyond {args.tolerance:.0%}: {', '.join(regressed)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
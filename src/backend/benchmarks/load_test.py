@@ -0,0 +1,282 @@
+
+"""
+Offline end-to-end load test for POST /run-flow.
+
+Drives the FastAPI app in-process through httpx's ASGI transport at a fixed
+concurrency. The scraped sites and the Groq LLM are replaced by stand-ins with
+configurable latency, and all local stores live in a temporary directory. The
+report covers throughput, latency percentiles, event-loop lag and the
+per-stage time recorded by the metrics registry, and is saved as JSON.
+
+Needs the development requirements (pip install -r src/backend/requirements-dev.txt).
+Run from the repository root:
+    python -m src.backend.benchmarks.load_test --requests 200 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+import httpx
+import numpy as np
+from src.backend.benchmarks.stand_ins import StubSession, stub_llm
+from src.backend.utils.metrics import STAGE_DURATION, WORKER_JOBS, WORKER_OFFLOADED_SECONDS
+from src.backend.utils.worker_pool import WorkerPool
+
+DEFAULT_OUTPUT_DIR = os.path.join(".insight_data", "benchmarks")
+
+def percentiles(values: List[float], scale: float = 1000.0) -> Dict[str, float]:
+    """Summarise samples (seconds) as milliseconds."""
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0, "max": 0.0}
+    samples = np.asarray(values) * scale
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "p50": round(float(p50), 3),
+        "p95": round(float(p95), 3),
+        "p99": round(float(p99), 3),
+        "mean": round(float(samples.mean()), 3),
+        "max": round(float(samples.max()), 3)
+    }
+
+def git_commit() -> str:
+    """Return the current commit hash, or an empty string outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+async def _monitor_loop_lag(interval: float, lags: List[float], stop: asyncio.Event) -> None:
+    """Record how late the event loop wakes up from fixed-interval sleeps."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+
+def _stage_breakdown(before: Dict, after: Dict) -> Dict[str, Any]:
+    """Diff STAGE_DURATION totals into per-stage and per-stage/platform time."""
+    stages: Dict[str, Dict[str, float]] = {}
+    by_platform: Dict[str, Dict[str, float]] = {}
+    for key, (total, count) in after.items():
+        previous_total, previous_count = before.get(key, (0.0, 0))
+        calls = count - previous_count
+        if calls <= 0:
+            continue
+        seconds = total - previous_total
+        stage, platform = key
+        for bucket, name in ((stages, stage), (by_platform, f"{stage}/{platform}" if platform else stage)):
+            entry = bucket.setdefault(name, {"calls": 0, "total_s": 0.0})
+            entry["calls"] += calls
+            entry["total_s"] += seconds
+    
+    for bucket in (stages, by_platform):
+        for entry in bucket.values():
+            entry["mean_ms"] = round(entry["total_s"] / entry["calls"] * 1000, 3)
+            entry["total_s"] = round(entry["total_s"], 4)
+    return {"stages": stages, "stages_by_platform": by_platform}
+
+def _worker_breakdown(before: Dict[str, Dict], after: Dict[str, Dict]) -> Dict[str, Dict[str, Any]]:
+    """Diff worker pool counters into jobs and offloaded CPU seconds per job kind."""
+    kinds: Dict[str, Dict[str, Any]] = {}
+    for (kind, executor, outcome), total in after["jobs"].items():
+        jobs = total - before["jobs"].get((kind, executor, outcome), 0.0)
+        if jobs > 0:
+            entry = kinds.setdefault(kind, {"jobs": 0, "errors": 0, "offloaded_s": 0.0})
+            entry["jobs"] += int(jobs)
+            if outcome != "ok":
+                entry["errors"] += int(jobs)
+    for (kind, executor), total in after["offloaded"].items():
+        seconds = total - before["offloaded"].get((kind, executor), 0.0)
+        if seconds > 0 and kind in kinds:
+            kinds[kind]["offloaded_s"] += seconds
+    for entry in kinds.values():
+        entry["offloaded_s"] = round(entry["offloaded_s"], 4)
+    return kinds
+
+def _worker_totals() -> Dict[str, Dict]:
+    return {"jobs": WORKER_JOBS.totals(), "offloaded": WORKER_OFFLOADED_SECONDS.totals()}
+
+def build_app(data_dir: str, fetch_latency: float):
+    """Return the FastAPI app wired to a pipeline with stand-in HTTP and temporary stores."""
+    # Stores pick up the database path when they are created
+    os.environ["INSIGHT_DB_PATH"] = os.path.join(data_dir, "insights.db")
+    os.environ.setdefault("GROQ_API_KEY", "load-test")
+    # Measure the pipeline rather than whole-response cache hits, unless asked to
+    os.environ.setdefault("RESPONSE_CACHE_SECONDS", "0")
+    
+    from src.backend.agents.analyst_agent import AnalystAgent
+    from src.backend.agents.run_agents import InsightPipeline
+    from src.backend.agents.scraper_agent import ScraperAgent
+    from src.backend.agents.writer_agent import WriterAgent
+    from src.backend.main import app
+    
+    session = StubSession(latency=fetch_latency)
+    app.state.pipeline = InsightPipeline(
+        scraper=ScraperAgent(session=session),
+        analyst=AnalystAgent(),
+        writer=WriterAgent()
+    )
+    return app, session
+
+async def run_load(
+    requests: int,
+    concurrency: int,
+    platforms: List[str],
+    keyword_pool: int,
+    fetch_latency: float,
+    llm_latency: float,
+    date_range: str = None,
+    deadline_ms: int = None
+) -> Dict[str, Any]:
+    """
+    Send `requests` POST /run-flow requests with `concurrency` in flight and measure them.
+    
+    Args:
+        requests: Total number of requests
+        concurrency: Requests in flight at any time
+        platforms: Platforms requested by every call
+        keyword_pool: Number of distinct keywords cycled through (smaller means more cache hits)
+        fetch_latency: Seconds each stand-in HTTP fetch takes
+        llm_latency: Seconds each stand-in LLM call takes
+        date_range: dateRange sent with every request (defaults to the last 7 days)
+        deadline_ms: Optional deadlineMs sent with every request
+    
+    Returns:
+        Result dictionary (see the module docstring)
+    """
+    if not date_range:
+        today = datetime.now(timezone.utc).date()
+        date_range = f"{today - timedelta(days=6)} to {today}"
+    
+    with tempfile.TemporaryDirectory() as data_dir, stub_llm(llm_latency) as prompts:
+        app, session = build_app(data_dir, fetch_latency)
+        pipeline = app.state.pipeline
+        
+        latencies: List[float] = []
+        statuses: Counter = Counter()
+        lags: List[float] = []
+        counter = iter(range(requests))
+        
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=None) as client:
+            async def worker() -> None:
+                for index in counter:
+                    body = {
+                        "platforms": platforms,
+                        "preset": "standard",
+                        "tone": "professional",
+                        "dateRange": date_range,
+                        "keywords": [f"topic{index % keyword_pool}"]
+                    }
+                    if deadline_ms:
+                        body["deadlineMs"] = deadline_ms
+                    started = time.perf_counter()
+                    try:
+                        response = await client.post("/run-flow", json=body)
+                        statuses[str(response.status_code)] += 1
+                    except Exception as e:
+                        statuses[type(e).__name__] += 1
+                    latencies.append(time.perf_counter() - started)
+            
+            stop = asyncio.Event()
+            monitor = asyncio.create_task(_monitor_loop_lag(0.01, lags, stop))
+            stages_before = STAGE_DURATION.totals()
+            workers_before = _worker_totals()
+            started = time.perf_counter()
+            
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            
+            duration = time.perf_counter() - started
+            stages_after = STAGE_DURATION.totals()
+            workers_after = _worker_totals()
+            stop.set()
+            await monitor
+        
+        await pipeline.aclose()
+    
+    return {
+        "benchmark": "load_test",
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "requests": requests,
+            "concurrency": concurrency,
+            "platforms": platforms,
+            "keyword_pool": keyword_pool,
+            "fetch_latency_ms": fetch_latency * 1000,
+            "llm_latency_ms": llm_latency * 1000,
+            "date_range": date_range,
+            "deadline_ms": deadline_ms,
+            "worker_pool": WorkerPool.MODE
+        },
+        "duration_s": round(duration, 4),
+        "throughput_rps": round(requests / duration, 3) if duration else 0.0,
+        "statuses": dict(statuses),
+        "latency_ms": percentiles(latencies),
+        "loop_lag_ms": percentiles(lags),
+        "http_fetches": session.requests,
+        "llm_calls": len(prompts),
+        **_stage_breakdown(stages_before, stages_after),
+        "worker_pool": _worker_breakdown(workers_before, workers_after)
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100, help="Total requests to send")
+    parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight at once")
+    parser.add_argument("--platforms", default="reddit,x,web,linkedin", help="Comma-separated platforms per request")
+    parser.add_argument("--keyword-pool", type=int, default=10, help="Distinct keywords cycled through")
+    parser.add_argument("--fetch-latency-ms", type=float, default=50, help="Latency of each stand-in HTTP fetch")
+    parser.add_argument("--llm-latency-ms", type=float, default=300, help="Latency of each stand-in LLM call")
+    parser.add_argument("--date-range", default=None, help="dateRange for every request (default: last 7 days)")
+    parser.add_argument("--deadline-ms", type=int, default=None, help="Optional deadlineMs for every request")
+    parser.add_argument("--output", default=None, help="JSON output path (default: .insight_data/benchmarks/)")
+    parser.add_argument("--verbose", action="store_true", help="Keep the application's INFO logs")
+    args = parser.parse_args()
+    
+    if not args.verbose:
+        logging.disable(logging.INFO)
+    
+    result = asyncio.run(run_load(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        platforms=[p.strip() for p in args.platforms.split(",") if p.strip()],
+        keyword_pool=max(1, args.keyword_pool),
+        fetch_latency=args.fetch_latency_ms / 1000,
+        llm_latency=args.llm_latency_ms / 1000,
+        date_range=args.date_range,
+        deadline_ms=args.deadline_ms
+    ))
+    
+    output = args.output or os.path.join(
+        DEFAULT_OUTPUT_DIR, f"load_test-{result['commit'] or 'local'}-{int(time.time())}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    
+    latency = result["latency_ms"]
+    print(
+        f"{args.requests} requests at concurrency {args.concurrency}: "
+        f"{result['throughput_rps']:.1f} req/s, "
+        f"p50 {latency['p50']:.1f} ms, p95 {latency['p95']:.1f} ms, p99 {latency['p99']:.1f} ms, "
+        f"loop lag p99 {result['loop_lag_ms']['p99']:.1f} ms, statuses {result['statuses']}"
+    )
+    for stage, entry in sorted(result["stages"].items()):
+        print(f"  {stage:<10} {entry['calls']:>6} calls  {entry['mean_ms']:>9.2f} ms mean  {entry['total_s']:>8.2f} s total")
+    for kind, entry in sorted(result["worker_pool"].items()):
+        print(f"  worker {kind:<8} {entry['jobs']:>6} jobs  {entry['offloaded_s']:>8.2f} s off the event loop")
+    print(f"Saved {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+
+"""
+Benchmark for the cost of the /run-flow profiling mode.
+
+With profiling disabled, a request only pays for the route's flag check and
+one context variable read per pipeline span. This benchmark times exactly that
+work and sets it against the latency of a whole request, then measures
+end-to-end latency with profiling disabled and enabled by alternating the two
+modes over the same in-process app (stand-ins for the scraped sites and the
+LLM, as in load_test).
+
+Needs the development requirements (pip install -r src/backend/requirements-dev.txt).
+Run from the repository root:
+    python -m src.backend.benchmarks.profiling_overhead --requests 60
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+import timeit
+from typing import Any, Dict, List
+import httpx
+from src.backend.benchmarks.load_test import build_app, percentiles
+from src.backend.benchmarks.stand_ins import stub_llm
+from src.backend.utils.profiler import active_profile
+
+ADMIN_TOKEN = "profiling-overhead-benchmark"
+
+def disabled_path_seconds(spans: int, number: int = 200000) -> float:
+    """
+    Time the work profiling adds to an unprofiled request.
+    
+    Args:
+        spans: Spans finished per request
+        number: Iterations per measurement
+    
+    Returns:
+        Seconds per request
+    """
+    profile, x_profile = False, None
+    flag_check = timeit.Timer(lambda: profile or (x_profile or "").lower() in ("1", "true", "yes"))
+    span_check = timeit.Timer(lambda: active_profile.get() is not None)
+    per_check = min(flag_check.repeat(5, number)) / number
+    per_span = min(span_check.repeat(5, number)) / number
+    return per_check + spans * per_span
+
+async def run(requests: int, fetch_latency: float, llm_latency: float) -> Dict[str, Any]:
+    """
+    Alternate unprofiled and profiled requests and compare their latency.
+    
+    Returns:
+        Dictionary with latency percentiles per mode, spans per request and the
+        disabled-path cost per request
+    """
+    os.environ["PROFILE_ADMIN_TOKEN"] = ADMIN_TOKEN
+    today = time.strftime("%Y-%m-%d", time.gmtime())
+    body = {
+        "platforms": ["reddit", "x", "web", "linkedin"],
+        "preset": "standard",
+        "tone": "professional",
+        "dateRange": f"{today} to {today}",
+        "keywords": ["ai"]
+    }
+    latencies: Dict[str, List[float]] = {"disabled": [], "enabled": []}
+    spans = 0
+    
+    with tempfile.TemporaryDirectory() as data_dir, stub_llm(llm_latency):
+        app, _ = build_app(data_dir, fetch_latency)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            # Warm up imports, connections and stores
+            await client.post("/run-flow", json=body)
+            
+            for index in range(requests * 2):
+                mode = "enabled" if index % 2 else "disabled"
+                headers = {"X-Profile": "1", "X-Admin-Token": ADMIN_TOKEN} if mode == "enabled" else {}
+                started = time.perf_counter()
+                response = await client.post("/run-flow", json=body, headers=headers)
+                latencies[mode].append(time.perf_counter() - started)
+                response.raise_for_status()
+                
+                if mode == "enabled" and not spans:
+                    profile_id = response.headers["X-Profile-Id"]
+                    profile = (await client.get(f"/profiles/{profile_id}", headers={"X-Admin-Token": ADMIN_TOKEN})).json()
+                    spans = sum(stage["calls"] for stage in profile["stages"])
+        
+        await app.state.pipeline.aclose()
+        app.state.profile_store.close()
+        del app.state.profile_store
+    
+    disabled = percentiles(latencies["disabled"])
+    enabled = percentiles(latencies["enabled"])
+    disabled_cost = disabled_path_seconds(spans)
+    return {
+        "requests_per_mode": requests,
+        "spans_per_request": spans,
+        "disabled_latency_ms": disabled,
+        "enabled_latency_ms": enabled,
+        "enabled_overhead_percent": round(100 * (enabled["p50"] / disabled["p50"] - 1), 2) if disabled["p50"] else 0.0,
+        "disabled_path_us": round(disabled_cost * 1e6, 4),
+        "disabled_path_percent": round(100 * disabled_cost * 1000 / disabled["p50"], 5) if disabled["p50"] else 0.0
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=60, help="Requests per mode")
+    parser.add_argument("--fetch-latency-ms", type=float, default=5, help="Latency of each stand-in HTTP fetch")
+    parser.add_argument("--llm-latency-ms", type=float, default=20, help="Latency of each stand-in LLM call")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    
+    result = asyncio.run(run(args.requests, args.fetch_latency_ms / 1000, args.llm_latency_ms / 1000))
+    print(
+        f"Profiling disabled: p50 {result['disabled_latency_ms']['p50']:.2f} ms; "
+        f"the disabled checks cost at most {result['disabled_path_us']:.3f} us per request "
+        f"({result['spans_per_request']} spans), {result['disabled_path_percent']:.5f}% of p50"
+    )
+    print(
+        f"Profiling enabled:  p50 {result['enabled_latency_ms']['p50']:.2f} ms "
+        f"({result['enabled_overhead_percent']:+.1f}% vs disabled)"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+
+"""
+Micro-benchmark for building and serialising InsightResponse payloads.
+
+Compares the previous path (constructing every nested model by hand, then
+FastAPI re-validating against the response_model and encoding with the standard
+json module) with the current one (one model_validate call and orjson).
+
+Run from the repository root:
+    python -m src.backend.benchmarks.response_serialization --platforms 8 --insights 300
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict
+from pydantic import TypeAdapter
+from src.backend.agents.run_agents import InsightPipeline
+from src.backend.schemas.response import ChartData, InsightItem, InsightResponse, PlatformData, SummaryData
+from src.backend.utils.json_response import FastJSONResponse
+
+def build_results(platforms: int, insights: int, buckets: int = 30) -> Dict[str, Any]:
+    """Build writer output shaped like a real run, with `insights` insights per platform."""
+    sentiments = ["positive", "neutral", "negative"]
+    return {
+        "summary": {"totalPosts": platforms * insights, "dominantSentiment": "Positive", "topPlatform": "Reddit"},
+        "platforms": {
+            f"platform{p}": {
+                "insights": [
+                    {
+                        "title": f"Insight {i} about a specific finding on platform {p}",
+                        "summary": "A two to three sentence explanation of the finding. " * 3,
+                        "sentiment": sentiments[i % 3],
+                        "date": "today"
+                    }
+                    for i in range(insights)
+                ],
+                "charts": {
+                    "sentimentTrend": [
+                        {"date": f"2025-04-{b % 28 + 1:02d}", "positive": b, "neutral": b + 1, "negative": b + 2}
+                        for b in range(buckets)
+                    ],
+                    "engagement": [{"date": f"2025-04-{b % 28 + 1:02d}", "value": b * 10} for b in range(buckets)]
+                }
+            }
+            for p in range(platforms)
+        }
+    }
+
+def legacy_format(results: Dict[str, Any]) -> InsightResponse:
+    """The previous formatter: every nested model constructed and validated on its own."""
+    platforms_data = {}
+    for platform, data in results["platforms"].items():
+        insights = [
+            InsightItem(
+                title=insight.get("title", "Untitled Insight"),
+                summary=insight.get("summary", ""),
+                date=insight.get("date", "today"),
+                sentiment=insight.get("sentiment", "neutral").capitalize()
+            )
+            for insight in data["insights"]
+        ]
+        charts = ChartData(
+            sentimentTrend=data["charts"]["sentimentTrend"],
+            engagement=data["charts"]["engagement"]
+        )
+        platforms_data[platform] = PlatformData(insights=insights, charts=charts)
+    return InsightResponse(summary=SummaryData(**results["summary"]), platforms=platforms_data)
+
+_RESPONSE_ADAPTER = TypeAdapter(InsightResponse)
+
+def legacy_serialize(response: InsightResponse) -> bytes:
+    """What FastAPI does for a returned model: dump, re-validate, dump as JSON, encode with json."""
+    validated = _RESPONSE_ADAPTER.validate_python(response.model_dump())
+    content = _RESPONSE_ADAPTER.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def measure(fn: Callable[[], Any], repeat: int) -> float:
+    """Return the mean CPU seconds per call."""
+    fn()
+    started = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - started) / repeat
+
+def run(platforms: int, insights: int, repeat: int) -> Dict[str, Any]:
+    """
+    Measure both paths for one payload size.
+    
+    Returns:
+        Dictionary with the payload size and CPU milliseconds per response for each path
+    """
+    results = build_results(platforms, insights)
+    # Stand-ins keep the pipeline from opening scrapers or databases
+    pipeline = InsightPipeline(scraper=object(), analyst=object(), writer=object())
+    
+    legacy = measure(lambda: legacy_serialize(legacy_format(results)), repeat)
+    fast = measure(lambda: FastJSONResponse(pipeline._format_as_insight_response(results)).body, repeat)
+    
+    return {
+        "platforms": platforms,
+        "insights_per_platform": insights,
+        "payload_bytes": len(FastJSONResponse(pipeline._format_as_insight_response(results)).body),
+        "legacy_ms": legacy * 1000,
+        "fast_ms": fast * 1000,
+        "speedup": legacy / fast if fast else float("inf")
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--platforms", type=int, default=8, help="Platforms per response")
+    parser.add_argument("--insights", type=int, default=300, help="Insights per platform")
+    parser.add_argument("--repeat", type=int, default=50, help="Responses built per measurement")
+    args = parser.parse_args()
+    
+    result = run(args.platforms, args.insights, args.repeat)
+    print(
+        f"{result['platforms']} platforms x {result['insights_per_platform']} insights "
+        f"({result['payload_bytes'] / 1024:.0f} KiB): "
+        f"legacy {result['legacy_ms']:.2f} ms, fast {result['fast_ms']:.2f} ms "
+        f"({result['speedup']:.1f}x)"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+
+"""
+Offline stand-ins for the scraped sites and the Groq LLM, shared by the benchmarks.
+"""
+
+import asyncio
+import contextlib
+import json
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List
+from urllib.parse import parse_qs, urlparse
+
+_WORDS = (
+    "model release open source gpu benchmark startup funding regulation privacy agents "
+    "chatbot data center energy inference training developers pricing launch community "
+    "great amazing love impressive worried concern risk slow broken fails"
+).split()
+
+def sample_text(rng: random.Random, words: int) -> str:
+    """Return pseudo-random social-media-like text."""
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+class StubResponse:
+    """Minimal stand-in for requests.Response."""
+    
+    def __init__(self, text: str, status_code: int = 200, content_type: str = "text/html; charset=utf-8"):
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.status_code = status_code
+        self.headers = {"Content-Type": content_type}
+    
+    def json(self) -> Any:
+        return json.loads(self.text)
+    
+    def iter_content(self, chunk_size: int = 1) -> Iterator[bytes]:
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+    
+    def close(self) -> None:
+        pass
+    
+    def __enter__(self) -> "StubResponse":
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+class StubSession:
+    """
+    Stand-in for the scraper's requests.Session serving generated Reddit, Nitter and news pages.
+    
+    Every request blocks for `latency` seconds to mimic network time, like a real
+    fetch in a worker thread.
+    """
+    
+    def __init__(self, latency: float = 0.05, seed: int = 0):
+        self.latency = latency
+        self.requests = 0
+        self._rng = random.Random(seed)
+    
+    def get(self, url: str, timeout: float = None, stream: bool = False) -> StubResponse:
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        
+        parsed = urlparse(url)
+        query = parse_qs(parsed.query)
+        keyword = query.get("q", ["ai"])[0]
+        now = time.time()
+        
+        if "reddit.com" in parsed.netloc:
+            posts = [
+                {"data": {
+                    "subreddit": "technology",
+                    "title": f"{keyword} {sample_text(self._rng, 8)}",
+                    "selftext": sample_text(self._rng, 60),
+                    "author": f"user{i}",
+                    "permalink": f"/r/technology/comments/{keyword}{i}",
+                    "score": self._rng.randint(1, 500),
+                    "created_utc": now - self._rng.randint(0, 5 * 86400)
+                }}
+                for i in range(5)
+            ]
+            return StubResponse(json.dumps({"data": {"children": posts}}), content_type="application/json; charset=utf-8")
+        
+        if "nitter" in parsed.netloc:
+            tweets = "".join(
+                f'<div class="timeline-item"><a class="username">@user{i}</a>'
+                f'<span class="tweet-date"><a title="{datetime.fromtimestamp(now - i * 3600, timezone.utc):%b %d, %Y · %I:%M %p} UTC">{i}h</a></span>'
+                f'<div class="tweet-content">{keyword} {sample_text(self._rng, 25)}</div></div>'
+                for i in range(5)
+            )
+            return StubResponse(f"<html><body>{tweets}</body></html>")
+        
+        if parsed.path in ("", "/"):
+            today = datetime.now(timezone.utc)
+            links = "".join(f'<a href="/{today:%Y/%m/%d}/story-{i}/">Story {i}</a>' for i in range(5))
+            return StubResponse(f"<html><body>{links}</body></html>")
+        
+        paragraphs = "".join(f"<p>ai {sample_text(self._rng, 40)}</p>" for _ in range(6))
+        return StubResponse(
+            f'<html><head><meta property="article:published_time" content="{datetime.now(timezone.utc).isoformat()}">'
+            f"</head><body><h1>{sample_text(self._rng, 6)}</h1>{paragraphs}</body></html>"
+        )
+    
+    def close(self) -> None:
+        pass
+
+def llm_response(insights: int = 4) -> str:
+    """Return an analysis JSON answer shaped like the Groq model's."""
+    return json.dumps({
+        "insights": [
+            {
+                "title": f"Insight {i} about the discussion",
+                "summary": "Users are comparing the new release with earlier versions and discussing pricing.",
+                "sentiment": ("positive", "neutral", "negative")[i % 3],
+                "date": "today"
+            }
+            for i in range(insights)
+        ],
+        "key_themes": ["pricing", "release"],
+        "engagement_indicators": ["comments", "shares"]
+    })
+
+@contextlib.contextmanager
+def stub_llm(latency: float = 0.3) -> Iterator[List[str]]:
+    """
+    Replace the analyst's LLM call with a stand-in that waits `latency` seconds.
+    
+    Yields:
+        List that collects the prompts sent to the stand-in
+    """
+    from src.backend.agents import analyst_agent
+    
+    prompts: List[str] = []
+    original = analyst_agent.call_llm
+    
+    async def fake_call_llm(prompt: str, *args: Any, **kwargs: Any) -> str:
+        prompts.append(prompt)
+        await asyncio.sleep(latency)
+        return llm_response()
+    
+    analyst_agent.call_llm = fake_call_llm
+    try:
+        yield prompts
+    finally:
+        analyst_agent.call_llm = original
+
+def sample_items(count: int, platform: str = "reddit", seed: int = 0) -> List[Dict[str, Any]]:
+    """Generate scraped content items like the ScraperAgent produces."""
+    rng = random.Random(seed)
+    now = time.time()
+    return [
+        {
+            "platform": platform,
+            "subreddit": "technology",
+            "title": sample_text(rng, 8),
+            "content": sample_text(rng, 80),
+            "author": f"user{i}",
+            "url": f"https://www.reddit.com/r/technology/comments/{i}",
+            "score": rng.randint(0, 500),
+            "date": "2025-04-01",
+            "timestamp": now - rng.randint(0, 7 * 86400),
+            "keyword": "ai"
+        }
+        for i in range(count)
+    ]
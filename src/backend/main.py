@@ -1,13 +1,80 @@
 
-from fastapi import FastAPI
+import time
+
+# Measure cold start from the very first import of the application module
+_IMPORT_STARTED = time.perf_counter()
+
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+
+# Load environment variables once, before any module reads its configuration
+load_dotenv()
+
+import logging
+import os
+from src.backend.utils.logger import configure_logging
+
+# Log through a queue so formatting and writes happen off the event loop
+configure_logging()
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from src.backend.routes import insight_routes
+from src.backend.routes import insight_routes, metrics_routes, profile_routes
+from src.backend.agents.run_agents import InsightPipeline
+from src.backend.utils.prewarm import PrewarmScheduler
+from src.backend.utils.tracing import new_request_id, request_id_var
+
+logger = logging.getLogger(__name__)
+
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Build one shared insight pipeline at startup, warm it, and close it on shutdown.
+    
+    Unless PREWARM=0, a background scheduler also keeps the most requested
+    /run-flow combinations warm (see utils/prewarm.py).
+    """
+    started = time.perf_counter()
+    pipeline = InsightPipeline()
+    await pipeline.startup()
+    
+    app.state.pipeline = pipeline
+    app.state.startup_timings = {
+        "import_seconds": _IMPORT_SECONDS,
+        "warmup_seconds": time.perf_counter() - started,
+        "first_request_seconds": None
+    }
+    logger.info(
+        "Startup complete: imports %.3fs, warm-up %.3fs",
+        _IMPORT_SECONDS, app.state.startup_timings["warmup_seconds"]
+    )
+    
+    scheduler = None
+    if os.getenv("PREWARM", "1") != "0":
+        scheduler = PrewarmScheduler(
+            lambda request: insight_routes.refresh_response(pipeline, request, scheduler.entry_ttl)
+        )
+        scheduler.start()
+        app.state.prewarm = scheduler
+    
+    try:
+        yield
+    finally:
+        if scheduler is not None:
+            await scheduler.stop()
+        await pipeline.aclose()
+        profile_store = getattr(app.state, "profile_store", None)
+        if profile_store is not None:
+            profile_store.close()
 
 # Create FastAPI app
 app = FastAPI(
     title="Insight Dashboard API",
     description="API for the AI-powered insight dashboard",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -19,8 +86,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def assign_request_id(request: Request, call_next):
+    """Tag the request with an id (taken from X-Request-ID if given) for logs and trace spans."""
+    request_id = request.headers.get("X-Request-ID") or new_request_id()
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+@app.middleware("http")
+async def record_first_request_latency(request: Request, call_next):
+    """Record how long the first request after startup takes."""
+    started = time.perf_counter()
+    response = await call_next(request)
+    
+    timings = getattr(request.app.state, "startup_timings", None)
+    if timings is not None and timings["first_request_seconds"] is None:
+        timings["first_request_seconds"] = time.perf_counter() - started
+        logger.info("First request served in %.3fs", timings["first_request_seconds"])
+    
+    return response
+
 # Include routers
 app.include_router(insight_routes.router)
+app.include_router(metrics_routes.router)
+app.include_router(profile_routes.router)
 
 # Root endpoint
 @app.get("/")
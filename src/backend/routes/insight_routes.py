@@ -1,31 +1,131 @@
 
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request
 from src.backend.schemas.request import RunFlowRequest
 from src.backend.schemas.response import InsightResponse
 from src.backend.utils.logger import log_request
 import os
-from dotenv import load_dotenv
 from pydantic import BaseModel
 from src.backend.agents.run_agents import InsightPipeline
+from src.backend.utils.groq_handler import get_chat_model, DEFAULT_MODEL
+from src.backend.utils.deadline import Deadline
+from src.backend.utils.json_response import FastJSONResponse, conditional_response
+from src.backend.utils.projection import columnar_charts, parse_fields, project
+from src.backend.utils.profiler import RequestProfile, profiling_authorized
+from src.backend.utils.tracing import request_id_var
+from src.backend.routes.profile_routes import get_profile_store
+from src.backend.storage.shared_cache import get_shared_cache
+from typing import AsyncIterator, Literal, Optional
 import logging
 
-# Load environment variables
-load_dotenv()
-
 # Set up logging
 logger = logging.getLogger(__name__)
 
 # Create router
 router = APIRouter(tags=["insights"])
 
-# Initialize the insight pipeline
-async def get_insight_pipeline():
-    return InsightPipeline()
+# How long a complete /run-flow response is reused for identical parameters, by every worker on the host
+RESPONSE_CACHE_SECONDS = float(os.getenv("RESPONSE_CACHE_SECONDS", "60"))
+
+# Share the insight pipeline built at application startup
+async def get_insight_pipeline(http_request: Request) -> InsightPipeline:
+    pipeline = getattr(http_request.app.state, "pipeline", None)
+    if pipeline is None:
+        # Router mounted without the application lifespan: build it once on demand
+        pipeline = InsightPipeline()
+        http_request.app.state.pipeline = pipeline
+    return pipeline
+
+def _run_pipeline(pipeline: InsightPipeline, request: RunFlowRequest):
+    """Start the pipeline for a /run-flow request (returns the coroutine)."""
+    return pipeline.run(
+        platforms=request.platforms,
+        preset=request.preset,
+        tone=request.tone,
+        date_range=request.dateRange,
+        keywords=request.keywords,
+        deadline=Deadline.from_ms(request.deadlineMs),
+        resolution=request.resolution
+    )
+
+def _response_cache_key(request: RunFlowRequest) -> dict:
+    return request.model_dump(exclude={"deadlineMs"})
+
+async def _store_response(request: RunFlowRequest, response: InsightResponse, ttl: float) -> None:
+    """Keep a response that was not degraded in the response cache for `ttl` seconds."""
+    cache = get_shared_cache()
+    if cache is not None and ttl > 0 and not response.degraded:
+        await asyncio.to_thread(
+            cache.set, "response", _response_cache_key(request), response.model_dump(mode="json"), ttl
+        )
+
+async def _run_within_deadline(pipeline: InsightPipeline, request: RunFlowRequest) -> InsightResponse:
+    """
+    Answer a request with a deadline from a finished cached response, or run it.
+    
+    Such a request never joins a computation in flight: that computation may
+    run without the deadline (and take longer than allowed), or under another
+    one (and come back degraded).
+    """
+    cache = get_shared_cache()
+    cached = await asyncio.to_thread(cache.get, "response", _response_cache_key(request))
+    if cached is not None:
+        return InsightResponse.model_validate(cached)
+    response = await _run_pipeline(pipeline, request)
+    await _store_response(request, response, RESPONSE_CACHE_SECONDS)
+    return response
 
-@router.post("/run-flow", response_model=InsightResponse)
+async def refresh_response(pipeline: InsightPipeline, request: RunFlowRequest, ttl: float) -> InsightResponse:
+    """
+    Recompute the response for a request and store it in the response cache.
+    
+    Used by the prewarm scheduler: the pipeline always runs, which refreshes
+    the content index, analysis state and LLM cache behind the response.
+    
+    Args:
+        pipeline: The insight pipeline
+        request: Request to recompute
+        ttl: Seconds to cache the response for (at least RESPONSE_CACHE_SECONDS),
+            so it lasts until the scheduler's next refresh
+    """
+    response = await _run_pipeline(pipeline, request)
+    if RESPONSE_CACHE_SECONDS > 0:
+        await _store_response(request, response, max(ttl, RESPONSE_CACHE_SECONDS))
+    return response
+
+async def track_for_prewarm(request: RunFlowRequest, http_request: Request) -> AsyncIterator[None]:
+    """Record the request with the prewarm scheduler and count it as interactive while it runs."""
+    scheduler = getattr(http_request.app.state, "prewarm", None)
+    if scheduler is None:
+        yield
+        return
+    with scheduler.interactive(request):
+        yield
+
+@router.post(
+    "/run-flow",
+    response_model=InsightResponse,
+    response_class=FastJSONResponse,
+    responses={304: {"description": "The client's If-None-Match already matches the response ETag"}}
+)
 async def run_flow(
     request: RunFlowRequest,
-    pipeline: InsightPipeline = Depends(get_insight_pipeline)
+    http_request: Request,
+    pipeline: InsightPipeline = Depends(get_insight_pipeline),
+    _prewarm: None = Depends(track_for_prewarm),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated dotted paths to return, e.g. summary,platforms.reddit.charts ('*' matches any key)"
+    ),
+    chart_encoding: Literal["rows", "columnar"] = Query(
+        "rows",
+        alias="chartEncoding",
+        description="'columnar' returns each chart series as parallel arrays instead of a list of points"
+    ),
+    if_none_match: Optional[str] = Header(None),
+    profile: bool = Query(False, description="Profile this request (requires X-Admin-Token)"),
+    x_profile: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None)
 ):
     """
     Run the insight generation pipeline with the specified parameters.
@@ -35,12 +135,31 @@ async def run_flow(
     2. Analyze the content with AI
     3. Generate formatted insights
     
+    The response carries an ETag computed from its body; a request whose
+    If-None-Match matches it gets an empty 304 Not Modified instead.
+    
+    Responses that were not degraded to meet a deadline are kept in the shared
+    cache for RESPONSE_CACHE_SECONDS, and identical requests (ignoring
+    deadlineMs) from any worker are answered from it. Concurrent identical
+    requests share one pipeline run, except those with a deadline, which run
+    their own when no finished response is cached.
+    
+    With ?profile=true or an X-Profile: 1 header, and an X-Admin-Token matching
+    PROFILE_ADMIN_TOKEN, the pipeline run is profiled; the profile is stored and
+    its id returned in the X-Profile-Id header (fetch it from /profiles/{id}).
+    
     Args:
         request: The parameters for the insight generation
         pipeline: The insight pipeline dependency
+        fields: Optional field projection
+        chart_encoding: Chart series encoding ("rows" or "columnar")
+        if_none_match: ETag(s) the client already holds
+        profile: Whether to profile this request
+        x_profile: Header alternative to `profile`
+        x_admin_token: Admin token required for profiling
         
     Returns:
-        InsightResponse object with generated insights
+        InsightResponse with generated insights, already validated and rendered with orjson
         
     Raises:
         HTTPException: If an error occurs during processing
@@ -56,27 +175,62 @@ async def run_flow(
             detail="GROQ_API_KEY is not configured. Please set this environment variable."
         )
     
+    profiler = None
+    if profile or (x_profile or "").lower() in ("1", "true", "yes"):
+        if not profiling_authorized(x_admin_token):
+            raise HTTPException(status_code=403, detail="Profiling requires a valid X-Admin-Token")
+        profiler = RequestProfile(request_id_var.get())
+    
     try:
-        # Extract keywords from the request (if any)
-        keywords = request.keywords if hasattr(request, 'keywords') else None
+        # Reject malformed projections before doing any work
+        projection = parse_fields(fields, InsightResponse.model_fields) if fields else None
         
         # Run the insight pipeline
-        response = await pipeline.run(
-            platforms=request.platforms,
-            preset=request.preset,
-            tone=request.tone,
-            date_range=request.dateRange,
-            keywords=keywords
-        )
+        def run():
+            return _run_pipeline(pipeline, request)
+        
+        cache = get_shared_cache()
+        if profiler is not None:
+            # A profile should show the pipeline's work, so it is never answered from the cache
+            async with profiler.running():
+                response = await run()
+            await asyncio.to_thread(get_profile_store(http_request).save, profiler.result())
+        elif cache is None or RESPONSE_CACHE_SECONDS <= 0:
+            response = await run()
+        elif request.deadlineMs is not None:
+            response = await _run_within_deadline(pipeline, request)
+        else:
+            response = await cache.get_or_compute(
+                "response",
+                _response_cache_key(request),
+                run,
+                RESPONSE_CACHE_SECONDS,
+                encode=lambda value: value.model_dump(mode="json"),
+                decode=InsightResponse.model_validate,
+                cacheable=lambda value: not value.degraded
+            )
         
-        return response
+        # The pipeline has validated the response; returning a Response skips re-validation
+        if projection is None and chart_encoding == "rows":
+            content = response
+        else:
+            content = response.model_dump()
+            if chart_encoding == "columnar":
+                content = columnar_charts(content)
+            if projection is not None:
+                content = project(content, projection)
+        
+        http_response = conditional_response(FastJSONResponse(content), if_none_match)
+        if profiler is not None:
+            http_response.headers["X-Profile-Id"] = profiler.profile_id
+        return http_response
     except ValueError as e:
         # Handle validation errors
-        logger.error(f"Validation error: {str(e)}")
+        logger.error("Validation error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         # Log the error and return an appropriate response
-        logger.error(f"Error processing request: {str(e)}")
+        logger.error("Error processing request: %s", e)
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
 # Response model for the test_groq endpoint
@@ -102,13 +256,8 @@ async def test_groq():
         
         # Import modules only if API key exists
         try:
-            from langchain_groq import ChatGroq
-            
             # Initialize the model (this will validate the API key)
-            chat_model = ChatGroq(
-                api_key=groq_api_key,
-                model_name="llama3-8b-8192"  # Use a default model for testing
-            )
+            chat_model = get_chat_model(DEFAULT_MODEL)
             
             # Get available models (simple test)
             available_models = ["llama3-8b-8192", "llama3-70b-8192", "mixtral-8x7b-32768"]
@@ -0,0 +1,54 @@
+
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+from src.backend.agents.scraper_agent import ScraperAgent
+from src.backend.storage.shared_cache import get_shared_cache
+from src.backend.utils.metrics import REGISTRY
+
+# Create router
+router = APIRouter(tags=["metrics"])
+
+def _scraper_fetch_samples():
+    """Expose shared-fetch counters (including duplicate fetches avoided) as gauges."""
+    stats = ScraperAgent.fetch_stats()
+    yield (
+        "insight_scraper_fetches",
+        "Shared scraper fetch counters by kind.",
+        {(("kind", kind),): value for kind, value in stats.items()}
+    )
+
+def _shared_cache_samples():
+    """Expose this worker's shared cache hit rate per namespace and the cache size."""
+    cache = get_shared_cache()
+    if cache is None:
+        return
+    yield (
+        "insight_cache_hit_ratio",
+        "Share of this worker's shared cache lookups answered without computing, by namespace.",
+        {(("namespace", namespace),): stats["hit_rate"] for namespace, stats in cache.stats().items()}
+    )
+    yield (
+        "insight_cache_size_bytes",
+        "Bytes of values in the shared cache, as of this worker's last write.",
+        {(): cache.size_bytes()}
+    )
+
+REGISTRY.register_collector(_scraper_fetch_samples)
+REGISTRY.register_collector(_shared_cache_samples)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics(request: Request):
+    """Expose stage latency, fallback, fetch and token metrics in Prometheus text format."""
+    body = REGISTRY.render()
+    
+    # Startup timings live on the application, so they are rendered per app
+    timings = getattr(request.app.state, "startup_timings", None) or {}
+    lines = [
+        "# HELP insight_startup_seconds Cold-start timings of this worker.",
+        "# TYPE insight_startup_seconds gauge"
+    ]
+    for phase, seconds in timings.items():
+        if seconds is not None:
+            lines.append(f'insight_startup_seconds{{phase="{phase.replace("_seconds", "")}"}} {seconds}')
+    
+    return PlainTextResponse(body + "\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
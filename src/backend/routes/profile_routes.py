@@ -0,0 +1,34 @@
+
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from src.backend.storage.profile_store import ProfileStore
+from src.backend.utils.profiler import profiling_authorized
+
+# Create router
+router = APIRouter(tags=["profiling"])
+
+def get_profile_store(http_request: Request) -> ProfileStore:
+    """Return the application's profile store, opening it on first use."""
+    store = getattr(http_request.app.state, "profile_store", None)
+    if store is None:
+        store = ProfileStore()
+        http_request.app.state.profile_store = store
+    return store
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Reject callers without the profiling admin token."""
+    if not profiling_authorized(x_admin_token):
+        raise HTTPException(status_code=403, detail="Profiling requires a valid X-Admin-Token")
+
+@router.get("/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles(store: ProfileStore = Depends(get_profile_store)):
+    """List the stored request profiles, newest first."""
+    return {"profiles": store.recent()}
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_profile(profile_id: str, store: ProfileStore = Depends(get_profile_store)):
+    """Return one stored request profile (see utils.profiler.RequestProfile.result)."""
+    profile = store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Unknown profile '{profile_id}'")
+    return profile
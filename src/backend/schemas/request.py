@@ -1,6 +1,6 @@
 
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 class RunFlowRequest(BaseModel):
     platforms: List[str] = Field(..., description="List of platforms to analyze")
@@ -8,7 +8,9 @@ class RunFlowRequest(BaseModel):
     tone: str = Field(..., description="Tone for generated content")
     dateRange: str = Field(..., description="Date range for analysis")
     keywords: Optional[List[str]] = Field(None, description="Optional list of keywords to focus the analysis")
-
+    resolution: Literal["hour", "day", "week"] = Field("day", description="Bucket size of the chart series")
+    deadlineMs: Optional[int] = Field(None, gt=0, description="Optional latency budget in milliseconds; slow stages are degraded to answer within it")
+    
     class Config:
         json_schema_extra = {
             "example": {
@@ -16,6 +18,7 @@ class RunFlowRequest(BaseModel):
                 "preset": "Insight Composer",
                 "tone": "Viral",
                 "dateRange": "2025-04-01 to 2025-04-11",
-                "keywords": ["AI", "machine learning", "technology"]
+                "keywords": ["AI", "machine learning", "technology"],
+                "deadlineMs": 15000
             }
         }
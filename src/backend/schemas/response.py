@@ -24,3 +24,8 @@ class SummaryData(BaseModel):
 class InsightResponse(BaseModel):
     summary: SummaryData
     platforms: Dict[str, PlatformData]
+    # Platform (or stage) -> reasons it was degraded to meet the request deadline
+    degraded: Dict[str, List[str]] = Field(default_factory=dict)
+    # Platform -> content its insights came from: "real", "partial" (placeholders left out),
+    # "fallback" (scraper placeholders only, not sent to the LLM) or "empty"
+    coverage: Dict[str, str] = Field(default_factory=dict)
@@ -0,0 +1,2 @@
+
+# Storage package
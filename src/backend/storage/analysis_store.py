@@ -0,0 +1,99 @@
+
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from src.backend.storage.database import connect
+from src.backend.utils.date_range import DateWindow
+
+class AnalysisStore:
+    """Persists seen item ids and analysis output per platform, keyword set and date window between runs."""
+    
+    # Upper bound on remembered item ids per (platform, scope)
+    MAX_SEEN_IDS = 2000
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self._conn = connect(db_path)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS analysis_state (
+                    platform TEXT NOT NULL,
+                    scope TEXT NOT NULL,
+                    item_ids TEXT NOT NULL,
+                    analysis TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (platform, scope)
+                )
+                """
+            )
+    
+    def load(self, platform: str, scope: str) -> Optional[Dict[str, Any]]:
+        """
+        Load the stored state for a platform and scope.
+        
+        Args:
+            platform: Platform ID
+            scope: Keyword set / tone scope key
+        
+        Returns:
+            Dictionary with item_ids, analysis and updated_at, or None if nothing is stored
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT item_ids, analysis, updated_at FROM analysis_state WHERE platform = ? AND scope = ?",
+                (platform, scope)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        return {
+            "item_ids": json.loads(row[0]),
+            "analysis": json.loads(row[1]),
+            "updated_at": row[2]
+        }
+    
+    def save(self, platform: str, scope: str, item_ids: List[str], analysis: Dict[str, Any]) -> None:
+        """
+        Store the seen item ids and merged analysis for a platform and scope.
+        
+        Args:
+            platform: Platform ID
+            scope: Keyword set / tone scope key
+            item_ids: Ids of every item covered by the analysis, oldest first
+            analysis: Analysis dictionary with timestamped insights
+        """
+        item_ids = item_ids[-self.MAX_SEEN_IDS:]
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO analysis_state (platform, scope, item_ids, analysis, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (platform, scope) DO UPDATE SET
+                    item_ids = excluded.item_ids,
+                    analysis = excluded.analysis,
+                    updated_at = excluded.updated_at
+                """,
+                (platform, scope, json.dumps(item_ids), json.dumps(analysis), time.time())
+            )
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+    
+    @staticmethod
+    def scope_key(keywords: Optional[List[str]], tone: str, window: Optional[DateWindow] = None) -> str:
+        """
+        Build the scope key for a keyword set, tone and date window (keywords are order and case insensitive).
+        
+        Content scraped for one window must not be merged with insights about
+        another, so each window gets its own state; without a window (no date
+        range requested) the scope is the keywords and tone alone.
+        """
+        keyword_set = sorted({k.strip().lower() for k in keywords or []})
+        scope = f"{'|'.join(keyword_set)}#{tone.strip().lower()}"
+        if window is not None:
+            scope += f"#{int(window.start_ts)}-{int(window.end_ts)}"
+        return scope
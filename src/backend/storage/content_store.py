@@ -0,0 +1,250 @@
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from src.backend.storage.database import connect
+from src.backend.utils.date_range import DateWindow
+from src.backend.utils.items import item_id
+
+# Window bounds recorded for fetches made without a date range
+_UNBOUNDED = -1.0
+
+class ContentStore:
+    """
+    Persistent, full-text indexed store of scraped items.
+    
+    Items from every scraper are kept with their platform, id, URL, timestamp and
+    the keywords they were fetched for, and indexed with SQLite FTS5. A fetch log
+    records when each (platform, keyword or source) was last fetched and for which
+    date window, so repeat lookups can be answered from the index instead of the
+    network.
+    """
+    
+    # How long a fetch for a (platform, key, window) answers repeat lookups
+    MAX_AGE_SECONDS = float(os.getenv("CONTENT_STORE_MAX_AGE_SECONDS", "900"))
+    # Items not fetched again within this many days are removed
+    RETENTION_DAYS = int(os.getenv("CONTENT_STORE_RETENTION_DAYS", "30"))
+    # Maximum items returned by one lookup
+    LOOKUP_LIMIT = 25
+    # Minimum time between two retention sweeps
+    PRUNE_INTERVAL_SECONDS = 3600
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self._conn = connect(db_path)
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+        with self._lock, self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS content_items (
+                    platform TEXT NOT NULL,
+                    item_id TEXT NOT NULL,
+                    url TEXT,
+                    timestamp REAL,
+                    title TEXT NOT NULL DEFAULT '',
+                    content TEXT NOT NULL DEFAULT '',
+                    keywords TEXT NOT NULL DEFAULT '|',
+                    fetch_key TEXT NOT NULL,
+                    item TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (platform, item_id)
+                );
+                CREATE INDEX IF NOT EXISTS content_items_time ON content_items (platform, timestamp);
+                CREATE INDEX IF NOT EXISTS content_items_fetch_key ON content_items (platform, fetch_key);
+                
+                CREATE VIRTUAL TABLE IF NOT EXISTS content_fts USING fts5(
+                    title, content, keywords,
+                    content='content_items', content_rowid='rowid'
+                );
+                CREATE TRIGGER IF NOT EXISTS content_items_ai AFTER INSERT ON content_items BEGIN
+                    INSERT INTO content_fts (rowid, title, content, keywords)
+                    VALUES (new.rowid, new.title, new.content, new.keywords);
+                END;
+                CREATE TRIGGER IF NOT EXISTS content_items_ad AFTER DELETE ON content_items BEGIN
+                    INSERT INTO content_fts (content_fts, rowid, title, content, keywords)
+                    VALUES ('delete', old.rowid, old.title, old.content, old.keywords);
+                END;
+                CREATE TRIGGER IF NOT EXISTS content_items_au AFTER UPDATE ON content_items BEGIN
+                    INSERT INTO content_fts (content_fts, rowid, title, content, keywords)
+                    VALUES ('delete', old.rowid, old.title, old.content, old.keywords);
+                    INSERT INTO content_fts (rowid, title, content, keywords)
+                    VALUES (new.rowid, new.title, new.content, new.keywords);
+                END;
+                
+                CREATE TABLE IF NOT EXISTS fetch_log (
+                    platform TEXT NOT NULL,
+                    fetch_key TEXT NOT NULL,
+                    window_start REAL NOT NULL,
+                    window_end REAL NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (platform, fetch_key, window_start, window_end)
+                );
+                """
+            )
+    
+    @staticmethod
+    def _bounds(window: Optional[DateWindow]) -> Tuple[float, float]:
+        """Return the (start, end) recorded for a window."""
+        if window is None:
+            return _UNBOUNDED, _UNBOUNDED
+        return window.start_ts, window.end_ts
+    
+    def is_fresh(self, platform: str, fetch_key: str, window: Optional[DateWindow]) -> bool:
+        """
+        Whether a recent fetch for this platform and key covers the window.
+        
+        A fetch made for a date window covers any window inside it; a fetch made
+        without one only covers lookups without one.
+        
+        Args:
+            platform: Platform ID
+            fetch_key: Keyword or source the fetch was made for
+            window: Requested date window, or None
+        
+        Returns:
+            True if the index can answer the lookup without fetching
+        """
+        fresh_since = time.time() - self.MAX_AGE_SECONDS
+        start, end = self._bounds(window)
+        if window is None:
+            condition, params = "window_start = ?", (_UNBOUNDED,)
+        else:
+            condition, params = "window_start != ? AND window_start <= ? AND window_end >= ?", (_UNBOUNDED, start, end)
+        
+        with self._lock:
+            row = self._conn.execute(
+                f"""
+                SELECT 1 FROM fetch_log
+                WHERE platform = ? AND fetch_key = ? AND fetched_at >= ? AND {condition}
+                LIMIT 1
+                """,
+                (platform, fetch_key.lower(), fresh_since, *params)
+            ).fetchone()
+        return row is not None
+    
+    def save(
+        self,
+        platform: str,
+        fetch_key: str,
+        window: Optional[DateWindow],
+        items: List[Dict[str, Any]],
+        keyword: Optional[str] = None
+    ) -> None:
+        """
+        Index fetched items and log the fetch.
+        
+        Args:
+            platform: Platform ID
+            fetch_key: Keyword or source the items were fetched for
+            window: Date window of the fetch, or None
+            items: Fetched content items
+            keyword: Keyword the items were fetched for, if the fetch was a keyword search
+        """
+        now = time.time()
+        keyword_tag = f"{keyword.lower()}|" if keyword else ""
+        rows = [
+            (
+                platform,
+                item_id(item),
+                item.get("url"),
+                item.get("timestamp"),
+                str(item.get("title", "")),
+                str(item.get("content", "")),
+                f"|{keyword_tag}",
+                fetch_key.lower(),
+                json.dumps(item),
+                now
+            )
+            for item in items
+        ]
+        
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO content_items
+                    (platform, item_id, url, timestamp, title, content, keywords, fetch_key, item, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (platform, item_id) DO UPDATE SET
+                    timestamp = COALESCE(excluded.timestamp, timestamp),
+                    title = excluded.title,
+                    content = excluded.content,
+                    keywords = CASE
+                        WHEN instr(keywords, excluded.keywords) > 0 THEN keywords
+                        ELSE keywords || substr(excluded.keywords, 2)
+                    END,
+                    fetch_key = excluded.fetch_key,
+                    item = excluded.item,
+                    fetched_at = excluded.fetched_at
+                """,
+                rows
+            )
+            self._conn.execute(
+                """
+                INSERT INTO fetch_log (platform, fetch_key, window_start, window_end, fetched_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (platform, fetch_key, window_start, window_end) DO UPDATE SET
+                    fetched_at = excluded.fetched_at
+                """,
+                (platform, fetch_key.lower(), *self._bounds(window), now)
+            )
+        
+        if now - self._last_prune > self.PRUNE_INTERVAL_SECONDS:
+            self.prune(now)
+    
+    def lookup(
+        self,
+        platform: str,
+        window: Optional[DateWindow],
+        keyword: Optional[str] = None,
+        fetch_key: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Return indexed items for a platform, newest first.
+        
+        Items are selected by a full-text match on `keyword` (title, content and the
+        keywords they were fetched for) or by the `fetch_key` they were fetched
+        under. Undated items are always kept; dated items must fall in the window.
+        
+        Args:
+            platform: Platform ID
+            window: Date window, or None for any date
+            keyword: Keyword to match with the full-text index
+            fetch_key: Source the items were fetched from
+        
+        Returns:
+            Content items as they were scraped
+        """
+        sql = "SELECT i.item FROM content_items i"
+        params: List[Any] = []
+        if keyword is not None:
+            sql += " JOIN content_fts f ON f.rowid = i.rowid WHERE content_fts MATCH ? AND i.platform = ?"
+            # Quote as one phrase so keywords cannot inject FTS query syntax
+            params += ['"' + keyword.replace('"', '""') + '"', platform]
+        else:
+            sql += " WHERE i.platform = ? AND i.fetch_key = ?"
+            params += [platform, (fetch_key or "").lower()]
+        if window is not None:
+            sql += " AND (i.timestamp IS NULL OR (i.timestamp >= ? AND i.timestamp < ?))"
+            params += [window.start_ts, window.end_ts]
+        sql += " ORDER BY i.timestamp IS NULL, i.timestamp DESC, i.fetched_at DESC LIMIT ?"
+        params.append(self.LOOKUP_LIMIT)
+        
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+    
+    def prune(self, now: float = None) -> None:
+        """Remove items and fetch log entries older than the retention period."""
+        now = now or time.time()
+        cutoff = now - self.RETENTION_DAYS * 86400
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM content_items WHERE fetched_at < ?", (cutoff,))
+            self._conn.execute("DELETE FROM fetch_log WHERE fetched_at < ?", (cutoff,))
+        self._last_prune = now
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
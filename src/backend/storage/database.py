@@ -0,0 +1,34 @@
+
+import os
+import sqlite3
+from typing import Optional
+
+DEFAULT_DB_PATH = os.path.join(".insight_data", "insights.db")
+
+def get_db_path() -> str:
+    """Return the path of the local SQLite database used by the storage layer."""
+    return os.getenv("INSIGHT_DB_PATH", DEFAULT_DB_PATH)
+
+def connect(db_path: Optional[str] = None) -> sqlite3.Connection:
+    """
+    Open a connection to the local database, creating its directory if needed.
+    
+    Connections may be shared between threads, so callers must serialise access
+    (every store guards its connection with a lock).
+    
+    Args:
+        db_path: Optional database path, defaults to INSIGHT_DB_PATH
+        
+    Returns:
+        An open sqlite3 connection in WAL mode
+    """
+    db_path = db_path or get_db_path()
+    if db_path != ":memory:":
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    
+    conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
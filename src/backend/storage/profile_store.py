@@ -0,0 +1,74 @@
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from src.backend.storage.database import connect
+
+class ProfileStore:
+    """Keeps the most recent request profiles so they can be fetched by id from any worker."""
+    
+    # Number of profiles kept; older ones are removed as new ones are saved
+    MAX_PROFILES = int(os.getenv("PROFILE_KEEP", "50"))
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self._conn = connect(db_path)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS request_profiles (
+                    profile_id TEXT PRIMARY KEY,
+                    request_id TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    duration_ms REAL NOT NULL,
+                    profile TEXT NOT NULL
+                )
+                """
+            )
+    
+    def save(self, profile: Dict[str, Any]) -> None:
+        """
+        Store a profile and drop the oldest ones beyond MAX_PROFILES.
+        
+        Args:
+            profile: Profile dictionary from RequestProfile.result()
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO request_profiles VALUES (?, ?, ?, ?, ?)",
+                (profile["profile_id"], profile["request_id"], time.time(), profile["duration_ms"], json.dumps(profile))
+            )
+            self._conn.execute(
+                """
+                DELETE FROM request_profiles WHERE profile_id NOT IN (
+                    SELECT profile_id FROM request_profiles ORDER BY created_at DESC LIMIT ?
+                )
+                """,
+                (self.MAX_PROFILES,)
+            )
+    
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Return a stored profile, or None if it is unknown or was rotated out."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT profile FROM request_profiles WHERE profile_id = ?", (profile_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def recent(self) -> List[Dict[str, Any]]:
+        """List the stored profiles, newest first, without their samples."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT profile_id, request_id, created_at, duration_ms FROM request_profiles ORDER BY created_at DESC"
+            ).fetchall()
+        return [
+            {"profile_id": row[0], "request_id": row[1], "created_at": row[2], "duration_ms": row[3]}
+            for row in rows
+        ]
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
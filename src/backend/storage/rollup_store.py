@@ -0,0 +1,233 @@
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from src.backend.storage.database import connect
+from src.backend.utils.items import item_id
+
+DAY_SECONDS = 86400
+WEEK_SECONDS = 7 * DAY_SECONDS
+# Epoch day 0 was a Thursday; weeks start on Monday
+_WEEK_OFFSET = 4 * DAY_SECONDS
+# SQL expression for the exclusive end of a compacted bucket
+_BUCKET_END = (
+    f"CASE granularity WHEN 'week' THEN bucket_start + {WEEK_SECONDS} "
+    "ELSE CAST(strftime('%s', bucket_start, 'unixepoch', '+1 month') AS INTEGER) END"
+)
+
+class RollupStore:
+    """
+    Pre-aggregated per-(platform, keyword, bucket) counters for dashboard charts.
+    
+    Every item is counted once per keyword it matched, in its daily bucket, when
+    it is first recorded for that keyword.
+    Old daily buckets are compacted into weekly ones and old weekly buckets into
+    monthly ones, so the store stays bounded while any range can still be charted.
+    """
+    
+    DAILY_RETENTION_DAYS = int(os.getenv("ROLLUP_DAILY_RETENTION_DAYS", "90"))
+    WEEKLY_RETENTION_DAYS = int(os.getenv("ROLLUP_WEEKLY_RETENTION_DAYS", "365"))
+    # Minimum time between two compactions
+    COMPACTION_INTERVAL_SECONDS = 3600
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self._conn = connect(db_path)
+        self._lock = threading.Lock()
+        self._last_compaction = 0.0
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rollup (
+                    platform TEXT NOT NULL,
+                    keyword TEXT NOT NULL,
+                    granularity TEXT NOT NULL,
+                    bucket_start INTEGER NOT NULL,
+                    items INTEGER NOT NULL DEFAULT 0,
+                    positive INTEGER NOT NULL DEFAULT 0,
+                    neutral INTEGER NOT NULL DEFAULT 0,
+                    negative INTEGER NOT NULL DEFAULT 0,
+                    engagement REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (platform, keyword, granularity, bucket_start)
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS rollup_range ON rollup (platform, bucket_start)"
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rollup_seen (
+                    platform TEXT NOT NULL,
+                    item_id TEXT NOT NULL,
+                    keyword TEXT NOT NULL,
+                    seen_at REAL NOT NULL,
+                    PRIMARY KEY (platform, item_id, keyword)
+                )
+                """
+            )
+    
+    @staticmethod
+    def _item_keywords(item: Dict[str, Any]) -> List[str]:
+        """The keywords an item counts for: those it matched, or the one it was scraped for."""
+        keywords = item.get("matched_keywords") or [item.get("keyword", "")]
+        return list(dict.fromkeys(keyword.lower() for keyword in keywords))
+    
+    def record(self, platform: str, items: List[Dict[str, Any]], default_sentiment: str = "neutral") -> int:
+        """
+        Add items to the daily bucket of every keyword they have not been recorded for yet.
+        
+        Fallback placeholder items are not real content and are never counted.
+        
+        Args:
+            platform: Platform ID the items were scraped for
+            items: Scraped content items
+            default_sentiment: Sentiment for items without their own label
+        
+        Returns:
+            Number of items newly recorded for at least one keyword
+        """
+        now = time.time()
+        buckets: Dict[tuple, List[float]] = {}
+        recorded = 0
+        
+        with self._lock, self._conn:
+            for item in items:
+                if item.get("is_fallback"):
+                    continue
+                iid = item_id(item)
+                keywords = self._item_keywords(item)
+                day = int((item.get("timestamp") or now) // DAY_SECONDS) * DAY_SECONDS
+                sentiment = str(item.get("sentiment") or default_sentiment).lower()
+                counted = False
+                for keyword in keywords:
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO rollup_seen (platform, item_id, keyword, seen_at) VALUES (?, ?, ?, ?)",
+                        (platform, iid, keyword, now)
+                    )
+                    if cursor.rowcount == 0:
+                        continue
+                    counted = True
+                    counters = buckets.setdefault((keyword, day), [0, 0, 0, 0, 0.0])
+                    counters[0] += 1
+                    counters[{"positive": 1, "negative": 3}.get(sentiment, 2)] += 1
+                    counters[4] += item.get("score", 1) or 0
+                recorded += counted
+            
+            self._conn.executemany(
+                """
+                INSERT INTO rollup (platform, keyword, granularity, bucket_start, items, positive, neutral, negative, engagement)
+                VALUES (?, ?, 'day', ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (platform, keyword, granularity, bucket_start) DO UPDATE SET
+                    items = items + excluded.items,
+                    positive = positive + excluded.positive,
+                    neutral = neutral + excluded.neutral,
+                    negative = negative + excluded.negative,
+                    engagement = engagement + excluded.engagement
+                """,
+                [(platform, keyword, bucket_start, *counters) for (keyword, bucket_start), counters in buckets.items()]
+            )
+        
+        if now - self._last_compaction > self.COMPACTION_INTERVAL_SECONDS:
+            self.compact(now)
+        
+        return recorded
+    
+    def query(
+        self,
+        platform: str,
+        keywords: Optional[List[str]],
+        start_ts: float,
+        end_ts: float
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the buckets of a platform that fall inside a time range.
+        
+        Daily buckets are returned when they start inside the range. Compacted
+        weekly and monthly buckets are only returned when they lie entirely inside
+        it; a partial one cannot be split across days, so it is left out.
+        
+        Args:
+            platform: Platform ID
+            keywords: Optional keywords to restrict to (all keywords when None)
+            start_ts: Range start (epoch seconds)
+            end_ts: Range end, exclusive (epoch seconds)
+        
+        Returns:
+            List of bucket dictionaries, summed over the matching keywords (an item
+            that matched several of them counts once for each)
+        """
+        sql = f"""
+            SELECT granularity, bucket_start,
+                   SUM(items), SUM(positive), SUM(neutral), SUM(negative), SUM(engagement)
+            FROM rollup
+            WHERE platform = ? AND bucket_start >= ? AND bucket_start < ?
+              AND (granularity = 'day' OR {_BUCKET_END} <= ?)
+        """
+        params: List[Any] = [platform, start_ts, end_ts, end_ts]
+        if keywords:
+            sql += f" AND keyword IN ({','.join('?' * len(keywords))})"
+            params.extend(k.lower() for k in keywords)
+        sql += " GROUP BY granularity, bucket_start"
+        
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        
+        return [
+            {
+                "granularity": granularity,
+                "bucket_start": bucket_start,
+                "items": items,
+                "positive": positive,
+                "neutral": neutral,
+                "negative": negative,
+                "engagement": engagement
+            }
+            for granularity, bucket_start, items, positive, neutral, negative, engagement in rows
+        ]
+    
+    def compact(self, now: float = None) -> None:
+        """Fold old daily buckets into weekly ones and old weekly buckets into monthly ones."""
+        now = now or time.time()
+        daily_cutoff = now - self.DAILY_RETENTION_DAYS * DAY_SECONDS
+        weekly_cutoff = now - self.WEEKLY_RETENTION_DAYS * DAY_SECONDS
+        
+        week_start = f"((bucket_start - {_WEEK_OFFSET}) / {WEEK_SECONDS}) * {WEEK_SECONDS} + {_WEEK_OFFSET}"
+        month_start = "CAST(strftime('%s', bucket_start, 'unixepoch', 'start of month') AS INTEGER)"
+        
+        with self._lock, self._conn:
+            for source, target, bucket_expr, cutoff in (
+                ("day", "week", week_start, daily_cutoff),
+                ("week", "month", month_start, weekly_cutoff)
+            ):
+                self._conn.execute(
+                    f"""
+                    INSERT INTO rollup (platform, keyword, granularity, bucket_start, items, positive, neutral, negative, engagement)
+                    SELECT platform, keyword, '{target}', {bucket_expr},
+                           SUM(items), SUM(positive), SUM(neutral), SUM(negative), SUM(engagement)
+                    FROM rollup
+                    WHERE granularity = '{source}' AND bucket_start < ?
+                    GROUP BY platform, keyword, {bucket_expr}
+                    ON CONFLICT (platform, keyword, granularity, bucket_start) DO UPDATE SET
+                        items = items + excluded.items,
+                        positive = positive + excluded.positive,
+                        neutral = neutral + excluded.neutral,
+                        negative = negative + excluded.negative,
+                        engagement = engagement + excluded.engagement
+                    """,
+                    (cutoff,)
+                )
+                self._conn.execute(
+                    "DELETE FROM rollup WHERE granularity = ? AND bucket_start < ?",
+                    (source, cutoff)
+                )
+            
+            # Items older than the weekly retention are no longer re-scraped in practice
+            self._conn.execute("DELETE FROM rollup_seen WHERE seen_at < ?", (weekly_cutoff,))
+        
+        self._last_compaction = now
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,388 @@
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+import orjson
+from src.backend.storage.database import connect, get_db_path
+from src.backend.utils.metrics import CACHE_EVICTIONS, CACHE_REQUESTS
+
+class SharedCache:
+    """
+    Host-wide cache shared by every worker process, backed by SQLite in WAL mode.
+    
+    Several uvicorn workers open the same database file, so a value computed by
+    one worker is served to all of them and survives restarts. Values are stored
+    as JSON under a namespace ("scrape", "llm", "response", ...) and a key of any
+    JSON-serialisable shape, and expire after a per-call TTL.
+    
+    `get_or_compute` is atomic across workers: the first caller to miss takes a
+    lease on the key and computes the value, callers in the same process await
+    that computation, and callers in other processes poll until the value is
+    stored (or the lease expires because its holder died). When the database
+    grows beyond MAX_BYTES, the least recently used entries are evicted.
+    
+    Workers also coordinate background work through it: `try_lease` lets one
+    worker claim a task for a period, and `take_tokens` spends from host-wide
+    token buckets.
+    """
+    
+    # Size budget; beyond it the least recently used entries are evicted down to LOW_WATERMARK of it
+    MAX_BYTES = int(float(os.getenv("SHARED_CACHE_MAX_MB", "256")) * 1024 * 1024)
+    LOW_WATERMARK = 0.9
+    # How long a computing worker holds a key before others may take it over
+    LEASE_SECONDS = float(os.getenv("SHARED_CACHE_LEASE_SECONDS", "120"))
+    # How often a worker waiting on another worker's computation checks for the value
+    POLL_INTERVAL_SECONDS = 0.05
+    # Hits refresh an entry's last-access time at most this often, to keep reads read-only
+    TOUCH_INTERVAL_SECONDS = 30
+    # Minimum time between two sweeps of expired entries and abandoned leases
+    PRUNE_INTERVAL_SECONDS = 300
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self._conn = connect(db_path or self.default_path())
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._bytes = 0
+        self._last_prune = 0.0
+        with self._lock, self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                );
+                CREATE INDEX IF NOT EXISTS cache_entries_accessed ON cache_entries (accessed_at);
+                CREATE INDEX IF NOT EXISTS cache_entries_expires ON cache_entries (expires_at);
+                
+                CREATE TABLE IF NOT EXISTS cache_leases (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    owner TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                );
+                
+                CREATE TABLE IF NOT EXISTS rate_budgets (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                """
+            )
+            self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+    
+    @staticmethod
+    def default_path() -> str:
+        """SHARED_CACHE_PATH, or cache.db next to the main database."""
+        return os.getenv("SHARED_CACHE_PATH") or os.path.join(os.path.dirname(get_db_path()), "cache.db")
+    
+    @staticmethod
+    def _hash_key(key: Hashable) -> str:
+        return hashlib.sha256(orjson.dumps(key, default=str, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    
+    def _count(self, namespace: str, outcome: str) -> None:
+        counters = self._stats.setdefault(namespace, {"hits": 0, "misses": 0, "shared": 0, "waited": 0, "errors": 0})
+        counters[outcome] += 1
+        CACHE_REQUESTS.inc(namespace=namespace, outcome=outcome)
+    
+    def get(self, namespace: str, key: Hashable) -> Any:
+        """
+        Return the stored value for a key, or None if it is missing or expired (blocking).
+        
+        Args:
+            namespace: Cache namespace
+            key: JSON-serialisable key
+        
+        Returns:
+            The decoded JSON value, or None
+        """
+        cached = self._lookup(namespace, self._hash_key(key), time.time())
+        return orjson.loads(cached) if cached is not None else None
+    
+    def set(self, namespace: str, key: Hashable, value: Any, ttl: float) -> None:
+        """Store a JSON-serialisable value for `ttl` seconds (blocking)."""
+        self._store(namespace, self._hash_key(key), None, orjson.dumps(value), ttl)
+    
+    def _lookup(self, namespace: str, hashed: str, now: float) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, accessed_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, hashed)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                return None
+            if now - row[2] > self.TOUCH_INTERVAL_SECONDS:
+                with self._conn:
+                    self._conn.execute(
+                        "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                        (now, namespace, hashed)
+                    )
+            return row[0]
+    
+    def _claim(self, namespace: str, hashed: str, owner: str, now: float) -> bool:
+        """Take the lease on a key unless it is stored or leased by a live owner, in one statement."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                """
+                INSERT INTO cache_leases (namespace, key, owner, expires_at)
+                SELECT ?, ?, ?, ? WHERE NOT EXISTS (
+                    SELECT 1 FROM cache_entries WHERE namespace = ? AND key = ? AND expires_at > ?
+                )
+                ON CONFLICT (namespace, key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE cache_leases.expires_at <= ?
+                """,
+                (namespace, hashed, owner, now + self.LEASE_SECONDS, namespace, hashed, now, now)
+            )
+            return cursor.rowcount == 1
+    
+    def _release(self, namespace: str, hashed: str, owner: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM cache_leases WHERE namespace = ? AND key = ? AND owner = ?",
+                (namespace, hashed, owner)
+            )
+    
+    def try_lease(self, namespace: str, key: Hashable, seconds: float) -> Optional[str]:
+        """
+        Take a lease on a key for `seconds` unless another live lease holds it (blocking).
+        
+        Unlike the leases behind `get_or_compute`, these are not tied to a stored
+        value: they mark work that only one worker on the host should do per
+        period, and are left to expire unless released.
+        
+        Args:
+            namespace: Lease namespace
+            key: JSON-serialisable key
+            seconds: How long the lease is held
+        
+        Returns:
+            The lease owner token, or None if the key is leased already
+        """
+        owner = f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                """
+                INSERT INTO cache_leases (namespace, key, owner, expires_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (namespace, key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE cache_leases.expires_at <= ?
+                """,
+                (namespace, self._hash_key(key), owner, now + seconds, now)
+            )
+            return owner if cursor.rowcount == 1 else None
+    
+    def release_lease(self, namespace: str, key: Hashable, owner: str) -> None:
+        """Give up a lease taken with `try_lease` (blocking)."""
+        self._release(namespace, self._hash_key(key), owner)
+    
+    def take_tokens(self, costs: Dict[str, Tuple[float, float, float]]) -> bool:
+        """
+        Spend from host-wide token buckets, all or nothing (blocking).
+        
+        Each bucket holds up to `capacity` tokens, refills over `period` seconds
+        and starts full. A cost above a bucket's capacity is allowed from a full
+        bucket, which then goes negative until it refills.
+        
+        Args:
+            costs: Bucket name -> (amount, capacity, period)
+        
+        Returns:
+            Whether every amount was available; only then is anything spent
+        """
+        now = time.time()
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so no other worker spends in between
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                balances = []
+                for name, (amount, capacity, period) in costs.items():
+                    row = self._conn.execute(
+                        "SELECT tokens, updated_at FROM rate_budgets WHERE name = ?", (name,)
+                    ).fetchone()
+                    tokens = capacity
+                    if row is not None:
+                        refill = (now - row[1]) * capacity / period if period > 0 else 0.0
+                        tokens = min(capacity, row[0] + refill)
+                    if tokens < min(amount, capacity):
+                        self._conn.rollback()
+                        return False
+                    balances.append((name, tokens - amount, now))
+                self._conn.executemany("INSERT OR REPLACE INTO rate_budgets VALUES (?, ?, ?)", balances)
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return True
+    
+    def _store(self, namespace: str, hashed: str, owner: Optional[str], value: bytes, ttl: float) -> None:
+        """Store an encoded value, release the lease on it and keep the cache within MAX_BYTES."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, hashed, value, len(value), now + ttl, now)
+            )
+            if owner is not None:
+                self._conn.execute(
+                    "DELETE FROM cache_leases WHERE namespace = ? AND key = ? AND owner = ?",
+                    (namespace, hashed, owner)
+                )
+            self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+            if self._bytes > self.MAX_BYTES or now - self._last_prune > self.PRUNE_INTERVAL_SECONDS:
+                self._evict(now)
+    
+    def _evict(self, now: float) -> None:
+        """Drop expired entries and abandoned leases, then the least recently used entries (lock held)."""
+        self._last_prune = now
+        expired = self._conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,)).rowcount
+        self._conn.execute("DELETE FROM cache_leases WHERE expires_at <= ?", (now,))
+        if expired:
+            CACHE_EVICTIONS.inc(expired, reason="expired")
+        
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+        if self._bytes <= self.MAX_BYTES:
+            return
+        
+        excess = self._bytes - int(self.MAX_BYTES * self.LOW_WATERMARK)
+        victims, freed = [], 0
+        for rowid, size in self._conn.execute("SELECT rowid, size FROM cache_entries ORDER BY accessed_at"):
+            victims.append((rowid,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM cache_entries WHERE rowid = ?", victims)
+        self._bytes -= freed
+        CACHE_EVICTIONS.inc(len(victims), reason="size")
+    
+    async def get_or_compute(
+        self,
+        namespace: str,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: float,
+        encode: Callable[[Any], Any] = None,
+        decode: Callable[[Any], Any] = None,
+        cacheable: Callable[[Any], bool] = None
+    ) -> Any:
+        """
+        Return the cached value for a key, computing and storing it once on a miss.
+        
+        Args:
+            namespace: Cache namespace, used in stats and metrics
+            key: JSON-serialisable key
+            compute: Zero-argument coroutine factory producing the value
+            ttl: Seconds the computed value is served
+            encode: Optional conversion of the value to JSON-serialisable data
+            decode: Optional conversion of cached data back to a value
+            cacheable: Optional predicate; values it rejects are returned but not stored
+        
+        Returns:
+            The cached or freshly computed value (callers share it, so treat it as read-only)
+        """
+        hashed = self._hash_key(key)
+        task = self._inflight.get((namespace, hashed))
+        if task is not None:
+            self._count(namespace, "shared")
+        else:
+            task = asyncio.ensure_future(self._fill(namespace, hashed, compute, ttl, encode, decode, cacheable))
+            self._inflight[(namespace, hashed)] = task
+            task.add_done_callback(lambda t, k=(namespace, hashed): self._inflight.pop(k, None))
+        
+        # Shield so a cancelled caller does not cancel the computation for everyone else
+        return await asyncio.shield(task)
+    
+    async def _fill(
+        self,
+        namespace: str,
+        hashed: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: float,
+        encode: Optional[Callable[[Any], Any]],
+        decode: Optional[Callable[[Any], Any]],
+        cacheable: Optional[Callable[[Any], bool]]
+    ) -> Any:
+        owner = f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+        waited = False
+        while True:
+            cached = await asyncio.to_thread(self._lookup, namespace, hashed, time.time())
+            if cached is not None:
+                self._count(namespace, "waited" if waited else "hits")
+                data = orjson.loads(cached)
+                return decode(data) if decode else data
+            
+            if await asyncio.to_thread(self._claim, namespace, hashed, owner, time.time()):
+                break
+            # Another worker is computing this key
+            waited = True
+            await asyncio.sleep(self.POLL_INTERVAL_SECONDS)
+        
+        self._count(namespace, "misses")
+        try:
+            value = await compute()
+        except BaseException:
+            self._count(namespace, "errors")
+            await asyncio.to_thread(self._release, namespace, hashed, owner)
+            raise
+        
+        if cacheable is not None and not cacheable(value):
+            await asyncio.to_thread(self._release, namespace, hashed, owner)
+            return value
+        encoded = orjson.dumps(encode(value) if encode else value)
+        await asyncio.to_thread(self._store, namespace, hashed, owner, encoded, ttl)
+        return value
+    
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return this worker's counters per namespace with their hit rate.
+        
+        A request counts as a hit when it was answered without computing, i.e.
+        from the database ("hits"), by joining a computation in this worker
+        ("shared") or by waiting for another worker's ("waited").
+        """
+        stats = {}
+        for namespace, counters in self._stats.items():
+            calls = sum(counters[outcome] for outcome in ("hits", "misses", "shared", "waited"))
+            answered = counters["hits"] + counters["shared"] + counters["waited"]
+            stats[namespace] = dict(counters, calls=calls, hit_rate=round(answered / calls, 4) if calls else 0.0)
+        return stats
+    
+    def size_bytes(self) -> int:
+        """Bytes of cached values as of this worker's last write."""
+        return self._bytes
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+# Process-wide cache, opened on first use
+_cache: Optional[SharedCache] = None
+_cache_lock = threading.Lock()
+
+def get_shared_cache() -> Optional[SharedCache]:
+    """Return the shared cache, opening it if needed, or None when SHARED_CACHE=0."""
+    global _cache
+    if os.getenv("SHARED_CACHE", "1") == "0":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = SharedCache()
+        return _cache
+
+def close_shared_cache() -> None:
+    """Close the shared cache; the next get_shared_cache() opens it again."""
+    global _cache
+    with _cache_lock:
+        cache, _cache = _cache, None
+    if cache is not None:
+        cache.close()
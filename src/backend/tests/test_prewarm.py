@@ -0,0 +1,25 @@
+from src.backend.schemas.request import RunFlowRequest
+from src.backend.utils.prewarm import PrewarmScheduler
+
+async def _refresh(request: RunFlowRequest) -> None:
+    return None
+
+def _request() -> RunFlowRequest:
+    return RunFlowRequest(platforms=["reddit"], preset="standard", tone="professional", dateRange="2025-04-01 to 2025-04-07")
+
+def test_combination_stops_being_due_without_requests():
+    scheduler = PrewarmScheduler(_refresh)
+    scheduler.record(_request())
+    scheduler.record(_request())
+    key = PrewarmScheduler.combination_key(_request())
+    seen = scheduler._combinations[key].seen
+    
+    assert scheduler.due(seen) == [_request()]
+    assert scheduler.due(seen + 2 * scheduler.HALF_LIFE) == []
+    assert key in scheduler._combinations
+    assert scheduler.due(seen + 5 * scheduler.HALF_LIFE) == []
+    assert key not in scheduler._combinations
+    
+    # Once forgotten, a single request is not enough to bring it back
+    scheduler.record(_request())
+    assert scheduler.due() == []
@@ -0,0 +1,39 @@
+import asyncio
+import time
+from src.backend.agents.writer_agent import WriterAgent
+from src.backend.storage.rollup_store import DAY_SECONDS, RollupStore
+from src.backend.utils.date_range import parse_date_range
+
+def _item(name: str, timestamp: float, sentiment: str, score: int) -> dict:
+    return {"url": f"https://example.com/{name}", "timestamp": timestamp, "sentiment": sentiment, "score": score, "keyword": "ai"}
+
+def _charts(store: RollupStore, window) -> dict:
+    return asyncio.run(WriterAgent(rollups=store)._charts_from_rollups("reddit", [], "neutral", ["ai"], window))
+
+def test_rollups_older_than_the_window_do_not_change_the_charts():
+    now = time.time()
+    window = parse_date_range(None)
+    recent = _item("recent", now - 3600, "positive", 10)
+    old = _item("old", now - 20 * DAY_SECONDS, "negative", 500)
+    
+    baseline = RollupStore(":memory:")
+    baseline.record("reddit", [recent])
+    with_old = RollupStore(":memory:")
+    with_old.record("reddit", [recent, old])
+    
+    assert _charts(with_old, window) == _charts(baseline, window)
+
+def test_compacted_buckets_reaching_into_the_window_are_left_out():
+    now = time.time()
+    window = parse_date_range(None)
+    store = RollupStore(":memory:")
+    store.record("reddit", [_item("old", window.start_ts - DAY_SECONDS, "negative", 500)])
+    # Fold every daily bucket before the window into weekly ones
+    store.DAILY_RETENTION_DAYS = 0
+    store.compact(window.start_ts)
+    del store.DAILY_RETENTION_DAYS
+    store.record("reddit", [_item("recent", now - 3600, "positive", 10)])
+    
+    charts = _charts(store, window)
+    assert sum(point["negative"] for point in charts["sentimentTrend"]) == 0
+    assert sum(point["value"] for point in charts["engagement"]) == 10
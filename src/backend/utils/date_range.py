@@ -0,0 +1,73 @@
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from dateutil import parser as date_parser
+
+@dataclass(frozen=True)
+class DateWindow:
+    """Half-open UTC time window [start, end) parsed from a request's dateRange."""
+    start: datetime
+    end: datetime
+    
+    @property
+    def start_ts(self) -> float:
+        """Window start as an epoch timestamp."""
+        return self.start.timestamp()
+    
+    @property
+    def end_ts(self) -> float:
+        """Window end (exclusive) as an epoch timestamp."""
+        return self.end.timestamp()
+    
+    def contains(self, timestamp: float) -> bool:
+        """Whether an epoch timestamp falls inside the window."""
+        return self.start_ts <= timestamp < self.end_ts
+
+def _parse_day(value: str) -> datetime:
+    """Parse one side of a date range as a UTC midnight."""
+    parsed = date_parser.parse(value.strip())
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return datetime(parsed.year, parsed.month, parsed.day, tzinfo=timezone.utc)
+
+def parse_date_range(date_range: Optional[str], default_days: int = 7, now: datetime = None) -> DateWindow:
+    """
+    Parse a "YYYY-MM-DD to YYYY-MM-DD" range into a DateWindow.
+    
+    Both days are inclusive, so the window ends at midnight after the last day.
+    A missing or unparseable range falls back to the last `default_days` days
+    up to and including today.
+    
+    Args:
+        date_range: Range string from the request
+        default_days: Number of days covered by the fallback window
+        now: Optional current time (for tests and benchmarks)
+        
+    Returns:
+        Parsed DateWindow
+    """
+    now = now or datetime.now(timezone.utc)
+    
+    if date_range:
+        parts = date_range.split(" to ")
+        try:
+            start = _parse_day(parts[0])
+            end = _parse_day(parts[-1]) + timedelta(days=1)
+            if end > start:
+                return DateWindow(start, end)
+        except (ValueError, OverflowError):
+            pass
+    
+    end = datetime(now.year, now.month, now.day, tzinfo=timezone.utc) + timedelta(days=1)
+    return DateWindow(end - timedelta(days=default_days), end)
+
+def parse_timestamp(value: str) -> Optional[float]:
+    """Parse a free-form date string into a UTC epoch timestamp, or None if it is not a date."""
+    try:
+        parsed = date_parser.parse(value.replace("·", " "), fuzzy=True)
+    except (ValueError, OverflowError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
@@ -0,0 +1,55 @@
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Raised when a stage runs out of its latency budget; carries any partial results."""
+    
+    def __init__(self, message: str = "Deadline exceeded", partial: Optional[List[Any]] = None):
+        super().__init__(message)
+        self.partial = partial or []
+
+class Deadline:
+    """
+    Latency budget for a single request.
+    
+    The same object is passed through every pipeline stage. Stages take a share of
+    the remaining time with `child`, cap their waits with `remaining`, and record
+    how they degraded with `note`, so the response can flag it.
+    """
+    
+    def __init__(self, budget_seconds: float, notes: Optional[Dict[str, List[str]]] = None, expires_at: float = None):
+        self.expires_at = expires_at if expires_at is not None else time.monotonic() + budget_seconds
+        self.notes = notes if notes is not None else {}
+    
+    @classmethod
+    def from_ms(cls, budget_ms: Optional[int]) -> Optional["Deadline"]:
+        """Build a deadline from a millisecond budget, or None when no budget is given."""
+        if budget_ms is None:
+            return None
+        return cls(budget_ms / 1000.0)
+    
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+    
+    @property
+    def expired(self) -> bool:
+        """Whether no time is left."""
+        return self.remaining() <= 0
+    
+    def child(self, fraction: float) -> "Deadline":
+        """
+        Return a deadline for a stage that may use only part of the remaining time.
+        
+        The child shares this deadline's degradation notes.
+        """
+        expires_at = time.monotonic() + self.remaining() * fraction
+        return Deadline(0, notes=self.notes, expires_at=min(expires_at, self.expires_at))
+    
+    def note(self, scope: str, reason: str) -> None:
+        """Record that `scope` (usually a platform ID) was degraded, and why."""
+        reasons = self.notes.setdefault(scope, [])
+        if reason not in reasons:
+            reasons.append(reason)
@@ -1,34 +1,126 @@
 
+import asyncio
 import os
 import logging
 from typing import Optional, Dict, Any, List
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+from src.backend.storage.shared_cache import get_shared_cache
+from src.backend.utils.metrics import LLM_TOKENS
+from src.backend.utils.tracing import platform_var, span
+from src.backend.utils.deadline import DeadlineExceeded
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL = "llama3-8b-8192"
+FALLBACK_MODEL = "llama3-70b-8192"
+
+SYSTEM_PROMPT = "You are a helpful AI assistant that provides accurate, concise, and well-structured responses."
+
+# How long an answer is reused for an identical prompt and settings, by every worker on the host
+LLM_CACHE_SECONDS = float(os.getenv("LLM_CACHE_SECONDS", "3600"))
+
+# LangChain classes, imported once on first use (or at startup via warm_up)
+_langchain = None
+
+# Reusable chat clients keyed by (model, temperature, max_tokens); each client
+# keeps its own pooled HTTP connections to the Groq API
+_chat_models: Dict[tuple, Any] = {}
+
+def _load_langchain():
+    """Import the LangChain Groq classes once and cache them."""
+    global _langchain
+    if _langchain is None:
+        from langchain_groq import ChatGroq
+        from langchain_core.messages import HumanMessage, SystemMessage
+        _langchain = (ChatGroq, HumanMessage, SystemMessage)
+    return _langchain
+
+def get_chat_model(model: str = DEFAULT_MODEL, temperature: float = 0.7, max_tokens: int = 1000):
+    """
+    Return a shared chat client for the given model settings, creating it on first use.
+    
+    Args:
+        model: The LLM model to use
+        temperature: Sampling temperature
+        max_tokens: Maximum number of tokens in the response
+        
+    Returns:
+        A ChatGroq instance
+        
+    Raises:
+        ValueError: If GROQ_API_KEY is not set
+    """
+    key = (model, temperature, max_tokens)
+    chat_model = _chat_models.get(key)
+    if chat_model is None:
+        groq_api_key = os.getenv("GROQ_API_KEY")
+        if not groq_api_key:
+            raise ValueError("GROQ_API_KEY is required for LLM calls")
+        
+        ChatGroq, _, _ = _load_langchain()
+        chat_model = ChatGroq(
+            api_key=groq_api_key,
+            model_name=model,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        _chat_models[key] = chat_model
+    return chat_model
+
+def warm_up(settings: List[tuple] = None) -> None:
+    """
+    Import LangChain and create the chat clients used on the hot path.
+    
+    Args:
+        settings: Optional list of (model, temperature, max_tokens) tuples to pre-create
+    """
+    _load_langchain()
+    if not os.getenv("GROQ_API_KEY"):
+        logger.warning("GROQ_API_KEY not set, skipping LLM client warm-up")
+        return
+    for model, temperature, max_tokens in settings or [(DEFAULT_MODEL, 0.7, 1000)]:
+        get_chat_model(model, temperature, max_tokens)
+
+def close_chat_models() -> None:
+    """Drop the shared chat clients so their connections can be released."""
+    _chat_models.clear()
+
+def _record_token_usage(response: Any, model: str) -> None:
+    """Count prompt and completion tokens reported by the LLM response, if any."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    platform = platform_var.get()
+    for kind in ("input_tokens", "output_tokens"):
+        if usage.get(kind):
+            LLM_TOKENS.inc(usage[kind], platform=platform, model=model, kind=kind.split("_")[0])
+
 async def call_llm(
     prompt: str, 
     temperature: float = 0.7, 
     max_tokens: int = 1000,
-    model: str = "llama3-8b-8192"
+    model: str = DEFAULT_MODEL,
+    timeout: Optional[float] = None,
+    allow_fallback: bool = True
 ) -> str:
     """
     Call the LLM with the given prompt.
     
+    Answers are kept in the shared cache for LLM_CACHE_SECONDS, so an identical
+    call (same prompt, model, temperature and max_tokens) from any worker is
+    answered without calling the API again.
+    
     Args:
         prompt: The prompt to send to the LLM
         temperature: Controls randomness. Higher values mean more random completions.
         max_tokens: Maximum number of tokens in the response
         model: The LLM model to use
+        timeout: Optional number of seconds after which the call is abandoned
+        allow_fallback: Whether to retry with the fallback model when the call fails
         
     Returns:
         The LLM's response text
         
     Raises:
         ValueError: If GROQ_API_KEY is not set
+        DeadlineExceeded: If the call does not finish within `timeout`
         Exception: For any other error
     """
     groq_api_key = os.getenv("GROQ_API_KEY")
@@ -37,24 +129,49 @@ async def call_llm(
         logger.error("GROQ_API_KEY not found in environment variables.")
         raise ValueError("GROQ_API_KEY is required for LLM calls")
     
+    cache = get_shared_cache()
+    if cache is None or LLM_CACHE_SECONDS <= 0:
+        return await _call_llm_uncached(prompt, temperature, max_tokens, model, timeout, allow_fallback)
+    
     try:
-        # Import here to avoid errors if the package is not installed
-        from langchain_groq import ChatGroq
-        from langchain_core.messages import HumanMessage, SystemMessage
-        
-        # Initialize the model
-        chat_model = ChatGroq(
-            api_key=groq_api_key,
-            model_name=model
+        return await asyncio.wait_for(
+            cache.get_or_compute(
+                "llm",
+                (model, temperature, max_tokens, prompt),
+                lambda: _call_llm_uncached(prompt, temperature, max_tokens, model, timeout, allow_fallback),
+                LLM_CACHE_SECONDS
+            ),
+            timeout
         )
+    except asyncio.TimeoutError:
+        # Waiting on an identical call made by another worker took too long
+        raise DeadlineExceeded(f"LLM call to {model} exceeded its {timeout}s budget")
+
+async def _call_llm_uncached(
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    model: str,
+    timeout: Optional[float],
+    allow_fallback: bool
+) -> str:
+    """Call the LLM API, retrying with the fallback model on failure (see call_llm)."""
+    try:
+        _, HumanMessage, SystemMessage = _load_langchain()
+        chat_model = get_chat_model(model, temperature, max_tokens)
         
         messages = [
-            SystemMessage(content="You are a helpful AI assistant that provides accurate, concise, and well-structured responses."),
+            SystemMessage(content=SYSTEM_PROMPT),
             HumanMessage(content=prompt)
         ]
         
-        # Call the model
-        response = chat_model.invoke(messages)
+        # Call the model without blocking the event loop
+        with span("llm"):
+            try:
+                response = await asyncio.wait_for(chat_model.ainvoke(messages), timeout)
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded(f"LLM call to {model} exceeded its {timeout}s budget")
+        _record_token_usage(response, model)
         
         # Extract the response content
         if hasattr(response, 'content'):
@@ -63,18 +180,21 @@ async def call_llm(
             logger.warning("Unexpected response format")
             return str(response)
             
+    except DeadlineExceeded:
+        logger.error("LLM call to %s timed out", model)
+        raise
     except ImportError:
         logger.error("Failed to import langchain_groq. Make sure it's installed.")
         raise ValueError("Required package 'langchain_groq' is not installed")
     except Exception as e:
-        logger.error(f"Error calling LLM: {str(e)}")
+        logger.error("Error calling LLM: %s", e)
         
         # Try fallback model if specified model fails
-        if model != "llama3-70b-8192":
+        if allow_fallback and model != FALLBACK_MODEL:
             logger.info("Trying fallback model")
             try:
-                return await call_llm(prompt, temperature, max_tokens, "llama3-70b-8192")
+                return await _call_llm_uncached(prompt, temperature, max_tokens, FALLBACK_MODEL, None, False)
             except Exception as fallback_error:
-                logger.error(f"Fallback model also failed: {str(fallback_error)}")
+                logger.error("Fallback model also failed: %s", fallback_error)
                 raise fallback_error
         raise
@@ -0,0 +1,145 @@
+
+import codecs
+import os
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from src.backend.utils.metrics import FETCH_OUTCOMES, FETCHED_BYTES
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+def create_http_session(pool_size: int = None) -> requests.Session:
+    """
+    Create a requests session with pooled keep-alive connections.
+    
+    The session is shared by all scraper fetches (including those running in
+    worker threads), so connections to the same host are reused across requests.
+    
+    Args:
+        pool_size: Maximum connections kept per host, defaults to HTTP_POOL_SIZE
+        
+    Returns:
+        Configured requests.Session
+    """
+    pool_size = pool_size or int(os.getenv("HTTP_POOL_SIZE", "16"))
+    
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+# Response bodies read beyond this many (decompressed) bytes are cut off
+MAX_RESPONSE_BYTES = int(os.getenv("SCRAPER_MAX_BYTES", str(1024 * 1024)))
+CHUNK_BYTES = int(os.getenv("SCRAPER_CHUNK_BYTES", "16384"))
+
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+JSON_TYPES = ("application/json", "text/json")
+
+@dataclass(frozen=True)
+class FetchedPage:
+    """A response body read with `fetch_capped`."""
+    
+    status_code: int
+    # Decoded body, empty when a consumer took the text instead
+    text: str
+    # Bytes read, at most the byte cap
+    size: int
+    # The body was longer than the byte cap
+    truncated: bool = False
+    # The consumer needed no more of the body
+    stopped_early: bool = False
+
+def _media_type(content_type: str) -> str:
+    return content_type.split(";", 1)[0].strip().lower()
+
+def _decoder_for(response: requests.Response) -> codecs.IncrementalDecoder:
+    """Incremental decoder for the charset the response declares, UTF-8 otherwise."""
+    charset = None
+    for parameter in response.headers.get("Content-Type", "").split(";")[1:]:
+        name, _, value = parameter.partition("=")
+        if name.strip().lower() == "charset" and value.strip():
+            charset = value.strip().strip('"\'')
+    try:
+        return codecs.getincrementaldecoder(charset or "utf-8")(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+def fetch_capped(
+    session: requests.Session,
+    url: str,
+    platform: str,
+    timeout: Optional[float] = None,
+    allowed_types: Tuple[str, ...] = HTML_TYPES,
+    max_bytes: Optional[int] = None,
+    consumer: Optional[Callable[[str], bool]] = None
+) -> Optional[FetchedPage]:
+    """
+    GET a page as a stream, reading at most `max_bytes` of its body.
+    
+    The Content-Type header is checked before the body is read, and responses
+    of other types (images, PDFs, video) are closed unread. The body is decoded
+    incrementally as it arrives; with a `consumer` each decoded chunk goes to it
+    instead of being kept, and the download stops as soon as the consumer
+    returns True. Either way memory and bandwidth per request stay bounded by
+    the byte cap, however large the page is. Bytes read are counted in
+    insight_fetched_bytes_total and the way the download ended in
+    insight_fetch_outcomes_total.
+    
+    Args:
+        session: Session to fetch with
+        url: Page URL
+        platform: Platform label used in metrics
+        timeout: Connect/read timeout in seconds
+        allowed_types: Accepted media types; a response without Content-Type is accepted
+        max_bytes: Body byte cap, defaults to SCRAPER_MAX_BYTES
+        consumer: Optional callable fed each decoded chunk, returning True to stop reading
+        
+    Returns:
+        The page, or None if its content type is not allowed
+        
+    Raises:
+        requests.RequestException: If the request fails
+    """
+    max_bytes = max_bytes or MAX_RESPONSE_BYTES
+    with session.get(url, timeout=timeout, stream=True) as response:
+        media_type = _media_type(response.headers.get("Content-Type", ""))
+        if media_type and media_type not in allowed_types:
+            FETCH_OUTCOMES.inc(platform=platform, outcome="skipped_content_type")
+            return None
+        if response.status_code != 200:
+            return FetchedPage(response.status_code, "", 0)
+        
+        decoder = _decoder_for(response)
+        parts = []
+        size = 0
+        truncated = stopped_early = False
+        for chunk in response.iter_content(CHUNK_BYTES):
+            if size + len(chunk) > max_bytes:
+                chunk = chunk[:max_bytes - size]
+                truncated = True
+            size += len(chunk)
+            text = decoder.decode(chunk, final=truncated)
+            if consumer is None:
+                parts.append(text)
+            elif consumer(text):
+                stopped_early = True
+                break
+            if truncated:
+                break
+        else:
+            tail = decoder.decode(b"", final=True)
+            if consumer is None:
+                parts.append(tail)
+            elif tail:
+                consumer(tail)
+    
+    FETCHED_BYTES.inc(size, platform=platform)
+    outcome = "stopped_early" if stopped_early else "truncated" if truncated else "complete"
+    FETCH_OUTCOMES.inc(platform=platform, outcome=outcome)
+    return FetchedPage(response.status_code, "".join(parts), size, truncated, stopped_early)
@@ -0,0 +1,28 @@
+
+import hashlib
+from typing import Any, Dict
+
+def item_id(item: Dict[str, Any]) -> str:
+    """
+    Return a stable identifier for a scraped content item.
+    
+    Items with a URL are identified by platform and URL; everything else by
+    platform, author, title and content.
+    
+    Args:
+        item: Content item produced by the ScraperAgent
+        
+    Returns:
+        Hex digest identifying the item
+    """
+    platform = item.get("platform", "")
+    if item.get("url"):
+        identity = f"{platform}\x1f{item['url']}"
+    else:
+        identity = "\x1f".join([
+            platform,
+            str(item.get("author", "")),
+            str(item.get("title", "")),
+            str(item.get("content", ""))
+        ])
+    return hashlib.sha1(identity.encode("utf-8")).hexdigest()
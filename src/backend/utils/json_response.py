@@ -0,0 +1,45 @@
+
+import hashlib
+from typing import Any, Optional
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+    
+    Pydantic models are dumped to plain Python data and encoded directly. A route
+    that returns this response with an already validated model skips FastAPI's
+    second validation and encoding pass against its response_model.
+    """
+    
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            content = content.model_dump()
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+def content_etag(body: bytes) -> str:
+    """Return a strong ETag derived from a response body."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+def conditional_response(response: Response, if_none_match: Optional[str]) -> Response:
+    """
+    Tag a rendered response with its ETag, or replace it with 304 Not Modified.
+    
+    Args:
+        response: Fully rendered response
+        if_none_match: The request's If-None-Match header, if any
+        
+    Returns:
+        The tagged response, or an empty 304 response if the client already has this body
+    """
+    etag = content_etag(response.body)
+    if if_none_match:
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in candidates or "*" in candidates:
+            return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return response
@@ -1,29 +1,238 @@
 
+import atexit
+import json
 import logging
-from datetime import datetime
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, Tuple
 from src.backend.schemas.request import RunFlowRequest
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler()
-    ]
-)
+from src.backend.utils.metrics import LOG_RECORDS_DROPPED
+from src.backend.utils.tracing import request_id_var
 
 logger = logging.getLogger("insight-api")
 
-def log_request(request: RunFlowRequest):
-    """Log incoming request details."""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+# Attributes every LogRecord has; anything else on a record came from `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+def truncate(value: str, limit: int) -> str:
+    """Cut a string to `limit` characters, noting how much was dropped."""
+    if len(value) <= limit:
+        return value
+    return f"{value[:limit]}... [{len(value) - limit} more chars]"
+
+def _parse_levels(spec: str) -> Dict[str, float]:
+    """Parse "logger.prefix=value,other=value" into a dictionary."""
+    parsed = {}
+    for entry in spec.split(","):
+        name, _, value = entry.partition("=")
+        if name.strip() and value.strip():
+            parsed[name.strip()] = float(value)
+    return parsed
+
+class JsonFormatter(logging.Formatter):
+    """
+    Render records as one JSON object per line.
+    
+    Besides time, level, logger and message, the object carries the request id
+    and any fields passed with `extra=`. The message and every field are cut
+    to `max_field_chars` so one huge payload (e.g. a raw LLM response) cannot
+    flood the log.
+    """
+    
+    def __init__(self, max_field_chars: int = 2000):
+        super().__init__()
+        self.max_field_chars = max_field_chars
     
-    log_message = f"""
-    Request received at {timestamp}:
-    - Platforms: {', '.join(request.platforms)}
-    - Preset: {request.preset}
-    - Tone: {request.tone}
-    - Date Range: {request.dateRange}
+    def _bounded(self, value: Any) -> Any:
+        if value is None or isinstance(value, (bool, int, float)):
+            return value
+        text = value if isinstance(value, str) else json.dumps(value, default=str)
+        if len(text) > self.max_field_chars:
+            return truncate(text, self.max_field_chars)
+        return value
+    
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": truncate(record.getMessage(), self.max_field_chars)
+        }
+        request_id = getattr(record, "request_id", "")
+        if request_id:
+            payload["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                payload[key] = self._bounded(value)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = truncate(record.exc_text, self.max_field_chars * 4)
+        return json.dumps(payload, default=str)
+
+class TextFormatter(logging.Formatter):
+    """The classic one-line text format, with the message cut to `max_field_chars`."""
+    
+    def __init__(self, max_field_chars: int = 2000):
+        super().__init__(TEXT_FORMAT)
+        self.max_field_chars = max_field_chars
+    
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        record.message = truncate(record.message, self.max_field_chars)
+        return super().formatMessage(record)
+
+class HotPathFilter(logging.Filter):
     """
+    Sample and rate-limit INFO and DEBUG records of busy loggers.
+    
+    Limits are configured per logger-name prefix (the longest matching prefix
+    wins). Sampling keeps a random fraction of a logger's records; the rate
+    limit is a token bucket per logger and message template, so one message
+    repeated for every platform and keyword cannot crowd out the others.
+    Warnings and errors always pass. Suppressed records are counted in
+    insight_log_records_dropped_total.
+    """
+    
+    # Upper bound on tracked message templates (messages built with f-strings are all distinct)
+    MAX_BUCKETS = 10000
+    
+    def __init__(self, rate_limits: Dict[str, float] = None, sample_rates: Dict[str, float] = None):
+        super().__init__()
+        self.rate_limits = rate_limits or {}
+        self.sample_rates = sample_rates or {}
+        self._policies: Dict[str, Tuple[Optional[float], Optional[float]]] = {}
+        self._buckets: Dict[Tuple[str, Any], list] = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _lookup(settings: Dict[str, float], name: str) -> Optional[float]:
+        best = None
+        for prefix, value in settings.items():
+            if (name == prefix or name.startswith(prefix + ".")) and (best is None or len(prefix) > len(best[0])):
+                best = (prefix, value)
+        return best[1] if best else None
     
-    logger.info(log_message)
+    def _policy(self, name: str) -> Tuple[Optional[float], Optional[float]]:
+        policy = self._policies.get(name)
+        if policy is None:
+            policy = (self._lookup(self.rate_limits, name), self._lookup(self.sample_rates, name))
+            self._policies[name] = policy
+        return policy
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate, sample = self._policy(record.name)
+        
+        if sample is not None and random.random() >= sample:
+            LOG_RECORDS_DROPPED.inc(logger=record.name, reason="sampled")
+            return False
+        
+        if rate is not None:
+            now = time.monotonic()
+            key = (record.name, record.msg)
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    if len(self._buckets) >= self.MAX_BUCKETS:
+                        self._buckets.clear()
+                    # A full bucket allows a one-second burst
+                    bucket = self._buckets[key] = [rate, now]
+                bucket[0] = min(rate, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+                allowed = bucket[0] >= 1
+                if allowed:
+                    bucket[0] -= 1
+            if not allowed:
+                LOG_RECORDS_DROPPED.inc(logger=record.name, reason="rate_limited")
+                return False
+        
+        return True
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Queue records for the listener thread without formatting them.
+    
+    The standard QueueHandler formats the message in the calling thread; here
+    the message and its arguments are passed through untouched, so formatting
+    and I/O both happen off the event loop. Only the request id (a context
+    variable) and exception text (which pins frames) are captured up front.
+    When the queue is full the record is dropped and counted instead of
+    blocking the caller.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc(logger=record.name, reason="queue_full")
+
+_listener: Optional[QueueListener] = None
+
+def configure_logging() -> None:
+    """
+    Route all logging through a bounded queue to a listener thread.
+    
+    Configured from the environment: LOG_LEVEL, LOG_FORMAT ("json" or "text"),
+    LOG_QUEUE_SIZE, LOG_MAX_FIELD_CHARS, LOG_RATE_LIMITS and LOG_SAMPLE_RATES
+    (see the README). Calling it again has no effect.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    
+    max_field_chars = int(os.getenv("LOG_MAX_FIELD_CHARS", "2000"))
+    stream = logging.StreamHandler()
+    if os.getenv("LOG_FORMAT", "json").lower() == "text":
+        stream.setFormatter(TextFormatter(max_field_chars))
+    else:
+        stream.setFormatter(JsonFormatter(max_field_chars))
+    
+    log_queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+    handler = BoundedQueueHandler(log_queue)
+    handler.addFilter(HotPathFilter(
+        _parse_levels(os.getenv("LOG_RATE_LIMITS", "src.backend.agents=20,src.backend.utils.groq_handler=20")),
+        _parse_levels(os.getenv("LOG_SAMPLE_RATES", ""))
+    ))
+    
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def log_request(request: RunFlowRequest):
+    """Log incoming request details as structured fields."""
+    logger.info(
+        "Request received",
+        extra={
+            "platforms": request.platforms,
+            "preset": request.preset,
+            "tone": request.tone,
+            "date_range": request.dateRange
+        }
+    )
@@ -0,0 +1,255 @@
+
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Latency buckets in seconds, from fast local stages up to slow LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Platform IDs that name the same platform; metrics use the canonical one
+PLATFORM_ALIASES = {"x": "twitter"}
+
+def platform_label(platform: str) -> str:
+    """Return the platform label used in metrics, so aliases of one platform share series."""
+    return PLATFORM_ALIASES.get(platform, platform)
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    """Render a Prometheus label set."""
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class Counter:
+    """Monotonic counter with labels."""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increase the counter for the given label values."""
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def value(self, **labels: str) -> float:
+        """Return the current value for the given label values."""
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        return self._values.get(key, 0.0)
+    
+    def totals(self) -> Dict[Tuple[str, ...], float]:
+        """Return the value per label-value tuple, e.g. to diff before and after a benchmark."""
+        with self._lock:
+            return dict(self._values)
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+class Histogram:
+    """Cumulative histogram with labels."""
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation for the given label values."""
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+    
+    def totals(self) -> Dict[Tuple[str, ...], Tuple[float, int]]:
+        """Return (sum, count) per label-value tuple, e.g. to diff before and after a benchmark."""
+        with self._lock:
+            return {key: (series[1], series[2]) for key, series in self._series.items()}
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    labels = _format_labels(self.labelnames, key, f'le="{le}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {total}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text exposition format."""
+    
+    def __init__(self):
+        self._metrics: List = []
+        # Callables producing gauge samples at render time
+        self._collectors: List[Callable] = []
+    
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+    
+    def register_collector(self, collector: Callable) -> None:
+        """
+        Register a callable that produces gauge samples at scrape time.
+        
+        The collector returns an iterable of (name, documentation, samples) where
+        samples maps a tuple of (label, value) pairs to a number.
+        """
+        self._collectors.append(collector)
+    
+    def render(self) -> str:
+        """Render every metric and collector in the Prometheus text format."""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} gauge")
+                for label_pairs, value in samples.items():
+                    names = tuple(label for label, _ in label_pairs)
+                    values = tuple(v for _, v in label_pairs)
+                    lines.append(f"{name}{_format_labels(names, values)} {value}")
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+STAGE_DURATION = REGISTRY.histogram(
+    "insight_stage_duration_seconds",
+    "Time spent per pipeline stage.",
+    ["stage", "platform"]
+)
+STAGE_CALLS = REGISTRY.counter(
+    "insight_stage_calls_total",
+    "Pipeline stage executions by outcome.",
+    ["stage", "platform", "outcome"]
+)
+SCRAPED_ITEMS = REGISTRY.counter(
+    "insight_scraped_items_total",
+    "Content items returned by scrapers, split by whether they are fallback placeholders.",
+    ["platform", "fallback"]
+)
+FALLBACK_RESULTS = REGISTRY.counter(
+    "insight_fallback_results_total",
+    "Scrapes or analyses that returned only fallback content.",
+    ["stage", "platform"]
+)
+FETCHED_BYTES = REGISTRY.counter(
+    "insight_fetched_bytes_total",
+    "Response body bytes downloaded by scrapers.",
+    ["platform"]
+)
+DATE_FILTERED_ITEMS = REGISTRY.counter(
+    "insight_date_filtered_items_total",
+    "Content items dropped for falling outside the requested date range, by the stage that dropped them.",
+    ["platform", "stage"]
+)
+CONTENT_STORE_LOOKUPS = REGISTRY.counter(
+    "insight_content_store_lookups_total",
+    "Scraper fetches answered from the local content index (hit), fetched (miss), or served from stale index data after an empty fetch (stale).",
+    ["platform", "outcome"]
+)
+LLM_TOKENS = REGISTRY.counter(
+    "insight_llm_tokens_total",
+    "Tokens used by LLM calls.",
+    ["platform", "model", "kind"]
+)
+LOG_RECORDS_DROPPED = REGISTRY.counter(
+    "insight_log_records_dropped_total",
+    "Log records not written: sampled out or rate-limited on a busy logger, or dropped because the log queue was full.",
+    ["logger", "reason"]
+)
+WORKER_JOBS = REGISTRY.counter(
+    "insight_worker_jobs_total",
+    "Jobs run by the parsing worker pool, by kind, executor (process/thread/inline) and outcome.",
+    ["kind", "executor", "outcome"]
+)
+WORKER_OFFLOADED_SECONDS = REGISTRY.counter(
+    "insight_worker_offloaded_seconds_total",
+    "CPU seconds used by worker pool jobs, i.e. event-loop (or GIL) time reclaimed, by job kind and executor.",
+    ["kind", "executor"]
+)
+WORKER_QUEUE_WAIT = REGISTRY.histogram(
+    "insight_worker_queue_wait_seconds",
+    "Time jobs waited for a free slot in the bounded worker pool queue.",
+    ["kind"]
+)
+WORKER_BATCH_SIZE = REGISTRY.histogram(
+    "insight_worker_batch_size",
+    "Small jobs sent to the worker pool together in one submission.",
+    ["kind"],
+    buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "insight_cache_requests_total",
+    "Shared cache lookups by namespace and outcome (hits, shared, waited, misses, errors).",
+    ["namespace", "outcome"]
+)
+CACHE_EVICTIONS = REGISTRY.counter(
+    "insight_cache_evictions_total",
+    "Shared cache entries removed because they expired or the size budget was exceeded.",
+    ["reason"]
+)
+PREWARM_RUNS = REGISTRY.counter(
+    "insight_prewarm_runs_total",
+    "Background refreshes of popular /run-flow combinations, by outcome (ok, error, over_budget, refreshed_elsewhere when another worker holds the combination).",
+    ["outcome"]
+)
+PACKED_ANALYSES = REGISTRY.counter(
+    "insight_packed_analyses_total",
+    "Platforms analyzed in a shared multi-platform LLM call (packed) or, when it failed, with their own call (separate).",
+    ["outcome"]
+)
+FETCH_OUTCOMES = REGISTRY.counter(
+    "insight_fetch_outcomes_total",
+    "Scraper downloads by how they ended: complete, truncated at the byte cap, stopped early by the parser, or skipped for their content type.",
+    ["platform", "outcome"]
+)
+ANALYSIS_COVERAGE = REGISTRY.counter(
+    "insight_analysis_coverage_total",
+    "Platforms planned for analysis by their items: real, partial (placeholders dropped), fallback (placeholders only, no LLM call) or empty.",
+    ["coverage"]
+)
@@ -0,0 +1,242 @@
+
+import json
+import re
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+from bs4 import BeautifulSoup
+from src.backend.utils.date_range import parse_timestamp
+
+# Pure, module-level parsing functions. They take and return plain data only, so
+# the worker pool can run them in another process (see utils/worker_pool.py).
+
+# Common article URL patterns: a /YYYY/MM/DD/ date, or an article/news/posts path
+ARTICLE_LINK_PATTERN = re.compile(r'/\d{4}/\d{2}/\d{2}/|/article/|/news/|/posts/')
+
+def is_article_link(href: str) -> bool:
+    """Whether a link is likely an article, judging by its URL."""
+    if not href or href.startswith('#') or href.startswith('javascript:'):
+        return False
+    return ARTICLE_LINK_PATTERN.search(href) is not None
+
+def parse_nitter_page(html: str, keyword: str, limit: int = 5) -> List[Dict[str, Any]]:
+    """
+    Extract tweets from a Nitter search results page.
+    
+    Args:
+        html: Page HTML
+        keyword: Keyword the search was for
+        limit: Maximum tweets returned
+    
+    Returns:
+        Twitter content items
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    items = []
+    for tweet in soup.select('.timeline-item')[:limit]:
+        content_element = tweet.select_one('.tweet-content')
+        username_element = tweet.select_one('.username')
+        date_element = tweet.select_one('.tweet-date')
+        
+        if content_element and username_element:
+            # The link inside .tweet-date carries the full timestamp as its title
+            date_link = date_element.select_one('a') if date_element else None
+            items.append({
+                "platform": "twitter",
+                "author": username_element.get_text().strip(),
+                "content": content_element.get_text().strip(),
+                "date": date_element.get_text().strip() if date_element else "Unknown date",
+                "timestamp": parse_timestamp(date_link.get('title', '')) if date_link else None,
+                "keyword": keyword
+            })
+    return items
+
+def parse_article_links(html: str) -> List[str]:
+    """Return the hrefs on a news index page that look like articles, in page order."""
+    soup = BeautifulSoup(html, 'html.parser')
+    return [a['href'] for a in soup.find_all('a', href=True) if is_article_link(a['href'])]
+
+class ArticleExtractor(HTMLParser):
+    """
+    Incremental extractor for the title, leading paragraphs and publish time of an article.
+    
+    Fed the page a chunk at a time (`feed_chunk`), it reports when it has the
+    first <h1> and the first `paragraphs` <p> elements, so a streaming fetch
+    can stop downloading there. The publish time is read from the
+    article:published_time meta tag or the first <time datetime>; both sit in
+    the head or byline, ahead of the body text, so one not seen by then is
+    taken as missing.
+    """
+    
+    def __init__(self, paragraphs: int = 5):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs = paragraphs
+        self.title: Optional[str] = None
+        self._title_parts: Optional[List[str]] = None
+        self._paragraph_texts: List[str] = []
+        self._paragraph_parts: Optional[List[str]] = None
+        self._meta_time: Optional[str] = None
+        self._element_time: Optional[str] = None
+    
+    @property
+    def done(self) -> bool:
+        """Whether everything `result` returns has been seen."""
+        return self.title is not None and len(self._paragraph_texts) >= self.paragraphs
+    
+    def feed_chunk(self, text: str) -> bool:
+        """
+        Parse the next piece of the page.
+        
+        Returns:
+            True once the rest of the page is not needed
+        """
+        self.feed(text)
+        return self.done
+    
+    def _end_paragraph(self) -> None:
+        if self._paragraph_parts is not None:
+            self._paragraph_texts.append("".join(self._paragraph_parts).strip())
+            self._paragraph_parts = None
+    
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag == "meta":
+            values = dict(attrs)
+            if self._meta_time is None and values.get("property") == "article:published_time" and values.get("content"):
+                self._meta_time = values["content"]
+        elif tag == "time":
+            values = dict(attrs)
+            if self._element_time is None and values.get("datetime"):
+                self._element_time = values["datetime"]
+        elif tag == "h1":
+            if self.title is None and self._title_parts is None:
+                self._title_parts = []
+        elif tag == "p":
+            # An unclosed <p> ends where the next one starts
+            self._end_paragraph()
+            if len(self._paragraph_texts) < self.paragraphs:
+                self._paragraph_parts = []
+    
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "h1" and self._title_parts is not None:
+            self.title = "".join(self._title_parts).strip()
+            self._title_parts = None
+        elif tag == "p":
+            self._end_paragraph()
+    
+    def handle_data(self, data: str) -> None:
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+        if self._paragraph_parts is not None:
+            self._paragraph_parts.append(data)
+    
+    def result(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dictionary with "title", "content" and "timestamp" (None when undated)
+        """
+        if self._title_parts is not None and self.title is None:
+            self.title = "".join(self._title_parts).strip()
+        paragraphs = list(self._paragraph_texts)
+        if self._paragraph_parts is not None and len(paragraphs) < self.paragraphs:
+            paragraphs.append("".join(self._paragraph_parts).strip())
+        published = self._meta_time or self._element_time
+        return {
+            "title": self.title if self.title is not None else "Untitled Article",
+            "content": " ".join(paragraphs[:self.paragraphs]),
+            "timestamp": parse_timestamp(published) if published else None
+        }
+
+def parse_article_page(html: str, paragraphs: int = 5) -> Dict[str, Any]:
+    """
+    Extract the title, leading paragraphs and publish time of an article page.
+    
+    Returns:
+        Dictionary with "title", "content" and "timestamp" (None when undated)
+    """
+    extractor = ArticleExtractor(paragraphs)
+    extractor.feed_chunk(html)
+    return extractor.result()
+
+def format_items_for_prompt(content_items: List[Dict[str, Any]], max_content_chars: Optional[int] = None) -> str:
+    """
+    Combine content items into the structured text given to the LLM.
+    
+    Args:
+        content_items: Content items of one platform
+        max_content_chars: Optional cut-off for each item's content
+    
+    Returns:
+        Formatted text with one block per item
+    """
+    parts = ["CONTENT FOR ANALYSIS:\n\n"]
+    for i, item in enumerate(content_items, 1):
+        parts.append(f"ITEM {i}:\n")
+        if "title" in item:
+            parts.append(f"Title: {item['title']}\n")
+        if "author" in item:
+            parts.append(f"Author: {item['author']}\n")
+        content = item.get("content", "")
+        if max_content_chars is not None:
+            content = content[:max_content_chars]
+        parts.append(f"Content: {content}\n")
+        if "url" in item:
+            parts.append(f"URL: {item['url']}\n")
+        if "score" in item:
+            parts.append(f"Score/Engagement: {item['score']}\n")
+        if "date" in item:
+            parts.append(f"Date: {item['date']}\n")
+        parts.append("\n---\n\n")
+    return "".join(parts)
+
+def _json_object(response: str) -> Dict[str, Any]:
+    """Decode the JSON object spanning from the first "{" to the last "}" of an LLM answer."""
+    json_start = response.find('{')
+    json_end = response.rfind('}') + 1
+    if json_start < 0 or json_end <= json_start:
+        raise ValueError("Could not extract JSON from LLM response")
+    
+    data = json.loads(response[json_start:json_end])
+    if not isinstance(data, dict):
+        raise ValueError("LLM response JSON is not an object")
+    return data
+
+def _with_defaults(analysis_data: Dict[str, Any]) -> Dict[str, Any]:
+    for field, default in (("insights", []), ("sentiment", "neutral"), ("key_themes", []), ("engagement_indicators", [])):
+        analysis_data.setdefault(field, default)
+    return analysis_data
+
+def parse_llm_json(response: str) -> Dict[str, Any]:
+    """
+    Extract the JSON object from an LLM answer and fill in missing fields.
+    
+    The object is taken from the first "{" to the last "}", so prose or code
+    fences around it are ignored.
+    
+    Raises:
+        ValueError: If the answer contains no parseable JSON object
+    """
+    return _with_defaults(_json_object(response))
+
+def split_packed_response(response: str, platforms: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Split a multi-platform LLM answer, keyed by platform ID, into per-platform analyses.
+    
+    Platforms whose entry is missing or malformed are left out, so the caller
+    can analyze them separately.
+    
+    Args:
+        response: LLM answer holding one JSON object keyed by platform ID
+        platforms: Platform IDs that were asked for
+        
+    Returns:
+        Analysis dictionary (with missing fields filled in) per platform found
+        
+    Raises:
+        ValueError: If the answer contains no parseable JSON object
+    """
+    keyed = {str(key).strip().lower(): value for key, value in _json_object(response).items()}
+    results = {}
+    for platform in platforms:
+        entry = keyed.get(platform.lower())
+        if isinstance(entry, dict) and isinstance(entry.get("insights", []), list):
+            results[platform] = _with_defaults(entry)
+    return results
@@ -0,0 +1,281 @@
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+from src.backend.schemas.request import RunFlowRequest
+from src.backend.storage.shared_cache import SharedCache, get_shared_cache
+from src.backend.utils.metrics import PREWARM_RUNS
+
+class RateBudget:
+    """Token bucket holding up to `capacity` units that refill over `period` seconds."""
+    
+    def __init__(self, capacity: float, period: float):
+        self.capacity = capacity
+        self.rate = capacity / period if period > 0 else 0.0
+        self.tokens = capacity
+        self.updated = time.monotonic()
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def can_spend(self, amount: float) -> bool:
+        """Whether `amount` units (or a full bucket, for costs above capacity) are available now."""
+        self._refill()
+        return self.tokens >= min(amount, self.capacity)
+    
+    def spend(self, amount: float) -> None:
+        """Take `amount` units (the balance may briefly go negative for large costs)."""
+        self._refill()
+        self.tokens -= amount
+
+class _Combination:
+    """A request seen by /run-flow, with its decayed popularity and refresh state."""
+    
+    __slots__ = ("request", "score", "seen", "last_refresh", "next_refresh")
+    
+    def __init__(self, request: RunFlowRequest, now: float):
+        self.request = request
+        self.score = 0.0
+        self.seen = now
+        self.last_refresh = 0.0
+        self.next_refresh = 0.0
+
+class PrewarmScheduler:
+    """
+    Keeps the most requested /run-flow combinations warm in the background.
+    
+    Every /run-flow request is recorded under its parameters (platforms,
+    keywords, tone, preset, date range and resolution; not the deadline) with a
+    popularity score that halves every HALF_LIFE seconds. Every INTERVAL
+    seconds the TOP_N combinations requested at least MIN_REQUESTS times within
+    about one HALF_LIFE (a score of at least MIN_SCORE) are refreshed once
+    their last refresh is older than REFRESH_SECONDS, which keeps the content
+    index, analysis state, LLM cache and response cache warm for the next
+    interactive request. Refreshed responses are cached for
+    `entry_ttl` seconds, long enough to last until the following refresh.
+    Combinations that stop being requested decay below MIN_SCORE and stop
+    being refreshed, and are forgotten once their score falls below FORGET_SCORE.
+    
+    Refreshes run one at a time and at low priority: they wait while more than
+    MAX_ACTIVE_REQUESTS interactive requests are in flight, and they stop for
+    the tick when the LLM or scrape budget is spent. Each refresh is charged
+    one LLM call per platform and one fetch per platform and keyword, the most
+    it can cost.
+    
+    Every worker process runs a scheduler over the requests it served. With
+    the shared cache enabled they coordinate through it: a combination is
+    leased for REFRESH_SECONDS by the worker that refreshes it, so the others
+    skip it, and the budgets are host-wide token buckets rather than one per
+    worker.
+    """
+    
+    INTERVAL = float(os.getenv("PREWARM_INTERVAL_SECONDS", "60"))
+    REFRESH_SECONDS = float(os.getenv("PREWARM_REFRESH_SECONDS", "600"))
+    TOP_N = int(os.getenv("PREWARM_TOP_N", "20"))
+    MIN_REQUESTS = int(os.getenv("PREWARM_MIN_REQUESTS", "2"))
+    HALF_LIFE = float(os.getenv("PREWARM_HALF_LIFE_SECONDS", "21600"))
+    # MIN_REQUESTS requests spread over at most one half-life score at least this
+    MIN_SCORE = MIN_REQUESTS - 0.5
+    LLM_CALLS_PER_HOUR = float(os.getenv("PREWARM_LLM_CALLS_PER_HOUR", "120"))
+    FETCHES_PER_MINUTE = float(os.getenv("PREWARM_FETCHES_PER_MINUTE", "30"))
+    MAX_ACTIVE_REQUESTS = int(os.getenv("PREWARM_MAX_ACTIVE_REQUESTS", "0"))
+    # Upper bound on tracked combinations; the least popular are forgotten first
+    MAX_TRACKED = 500
+    # Decayed score below which a combination is forgotten (two half-lives after a single request)
+    FORGET_SCORE = 0.25
+    # How often a waiting refresh re-checks for interactive requests
+    BUSY_POLL_SECONDS = 0.5
+    
+    def __init__(self, refresh: Callable[[RunFlowRequest], Awaitable[Any]]):
+        """
+        Args:
+            refresh: Coroutine function that recomputes and caches the response for a request
+        """
+        self.logger = logging.getLogger(__name__)
+        self.refresh = refresh
+        self.active_requests = 0
+        self._combinations: Dict[str, _Combination] = {}
+        self._llm_budget = RateBudget(self.LLM_CALLS_PER_HOUR, 3600)
+        self._fetch_budget = RateBudget(self.FETCHES_PER_MINUTE, 60)
+        self._task: Optional[asyncio.Task] = None
+    
+    @staticmethod
+    def combination_key(request: RunFlowRequest) -> str:
+        """Identify a request by everything that shapes its response, in a canonical order."""
+        keywords = sorted({k.strip().lower() for k in request.keywords or [] if k.strip()})
+        return "|".join([
+            ",".join(sorted(request.platforms)),
+            ",".join(keywords),
+            request.tone,
+            request.preset,
+            request.dateRange,
+            request.resolution
+        ])
+    
+    def _decay(self, combination: _Combination, now: float) -> None:
+        combination.score *= 0.5 ** ((now - combination.seen) / self.HALF_LIFE)
+        combination.seen = now
+    
+    def record(self, request: RunFlowRequest) -> None:
+        """Count one interactive request for its combination."""
+        now = time.time()
+        key = self.combination_key(request)
+        combination = self._combinations.get(key)
+        if combination is None:
+            if len(self._combinations) >= self.MAX_TRACKED:
+                self._forget_least_popular(now)
+            combination = self._combinations[key] = _Combination(request.model_copy(update={"deadlineMs": None}), now)
+        self._decay(combination, now)
+        combination.score += 1
+    
+    def _forget_least_popular(self, now: float) -> None:
+        for combination in self._combinations.values():
+            self._decay(combination, now)
+        ranked = sorted(self._combinations.items(), key=lambda entry: entry[1].score)
+        for key, _ in ranked[:max(1, len(ranked) // 10)]:
+            del self._combinations[key]
+    
+    @property
+    def entry_ttl(self) -> float:
+        """Seconds a refreshed response is cached: until the refresh after next is due, plus one tick."""
+        return self.REFRESH_SECONDS + self.INTERVAL
+    
+    @contextmanager
+    def interactive(self, request: RunFlowRequest) -> Iterator[None]:
+        """
+        Record a request and count it as in flight while the block runs.
+        
+        An interactive request does not postpone the next refresh: it may have
+        been answered from the cache, and what it computed itself is only
+        cached for RESPONSE_CACHE_SECONDS.
+        """
+        self.record(request)
+        self.active_requests += 1
+        try:
+            yield
+        finally:
+            self.active_requests -= 1
+    
+    def due(self, now: Optional[float] = None) -> List[RunFlowRequest]:
+        """
+        Return the popular combinations due for a refresh, most popular first.
+        
+        Combinations whose score has decayed below FORGET_SCORE are dropped.
+        
+        Args:
+            now: Current epoch time, defaults to time.time()
+        
+        Returns:
+            Requests to refresh
+        """
+        now = now if now is not None else time.time()
+        for key, combination in list(self._combinations.items()):
+            self._decay(combination, now)
+            if combination.score < self.FORGET_SCORE:
+                del self._combinations[key]
+        popular = sorted(
+            (c for c in self._combinations.values() if c.score >= self.MIN_SCORE),
+            key=lambda c: c.score,
+            reverse=True
+        )[:self.TOP_N]
+        return [c.request for c in popular if c.next_refresh <= now]
+    
+    @staticmethod
+    def _costs(request: RunFlowRequest) -> Dict[str, float]:
+        platforms = len(request.platforms)
+        return {"llm": platforms, "fetches": platforms * max(1, len(request.keywords or []))}
+    
+    async def _spend(self, costs: Dict[str, float], cache: Optional[SharedCache]) -> bool:
+        """Charge a refresh to the host-wide budgets (or this worker's, without a shared cache)."""
+        if cache is not None:
+            return await asyncio.to_thread(cache.take_tokens, {
+                "prewarm_llm": (costs["llm"], self.LLM_CALLS_PER_HOUR, 3600),
+                "prewarm_fetches": (costs["fetches"], self.FETCHES_PER_MINUTE, 60)
+            })
+        if not (self._llm_budget.can_spend(costs["llm"]) and self._fetch_budget.can_spend(costs["fetches"])):
+            return False
+        self._llm_budget.spend(costs["llm"])
+        self._fetch_budget.spend(costs["fetches"])
+        return True
+    
+    async def _wait_until_idle(self) -> None:
+        while self.active_requests > self.MAX_ACTIVE_REQUESTS:
+            await asyncio.sleep(self.BUSY_POLL_SECONDS)
+    
+    async def run_once(self) -> int:
+        """
+        Refresh the combinations that are due, within the rate budgets, skipping those another worker holds.
+        
+        Returns:
+            Number of combinations refreshed
+        """
+        refreshed = 0
+        for request in self.due():
+            costs = self._costs(request)
+            await self._wait_until_idle()
+            key = self.combination_key(request)
+            combination = self._combinations.get(key)
+            cache = get_shared_cache()
+            lease = None
+            if cache is not None:
+                lease = await asyncio.to_thread(cache.try_lease, "prewarm", key, self.REFRESH_SECONDS)
+                if lease is None:
+                    # Another worker refreshed it within REFRESH_SECONDS (or is refreshing it now)
+                    PREWARM_RUNS.inc(outcome="refreshed_elsewhere")
+                    if combination is not None:
+                        combination.next_refresh = time.time() + self.REFRESH_SECONDS
+                    continue
+            
+            if not await self._spend(costs, cache):
+                if lease is not None:
+                    await asyncio.to_thread(cache.release_lease, "prewarm", key, lease)
+                PREWARM_RUNS.inc(outcome="over_budget")
+                self.logger.info("Prewarm budget spent, deferring remaining refreshes to the next tick")
+                break
+            
+            started = time.time()
+            try:
+                await self.refresh(request)
+            except Exception as e:
+                PREWARM_RUNS.inc(outcome="error")
+                self.logger.warning("Prewarming %s failed: %s", key, e)
+                if combination is not None:
+                    combination.next_refresh = started + self.REFRESH_SECONDS
+                continue
+            
+            PREWARM_RUNS.inc(outcome="ok")
+            refreshed += 1
+            if combination is not None:
+                combination.last_refresh = started
+                combination.next_refresh = started + self.REFRESH_SECONDS
+        return refreshed
+    
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.INTERVAL)
+            try:
+                refreshed = await self.run_once()
+                if refreshed:
+                    self.logger.info("Prewarmed %s popular combinations", refreshed)
+            except Exception as e:
+                self.logger.error("Prewarm tick failed: %s", e)
+    
+    def start(self) -> None:
+        """Start refreshing in the background on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop(), name="prewarm-scheduler")
+    
+    async def stop(self) -> None:
+        """Stop the background task, abandoning a refresh in progress."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,222 @@
+
+import asyncio
+import contextvars
+import hmac
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+# Profile of the request being served, or None; read by tracing.span on every span
+active_profile: contextvars.ContextVar[Optional["RequestProfile"]] = contextvars.ContextVar("active_profile", default=None)
+
+# Frames that mean a thread is waiting rather than working: (file name, function)
+_IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker")
+}
+
+def profiling_authorized(token: Optional[str]) -> bool:
+    """
+    Whether a token grants access to request profiling.
+    
+    Profiling is disabled entirely unless PROFILE_ADMIN_TOKEN is set.
+    """
+    admin_token = os.getenv("PROFILE_ADMIN_TOKEN", "")
+    if not admin_token or not token:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), admin_token.encode("utf-8"))
+
+def _frame_key(frame) -> str:
+    """Describe a frame as "module/file.py:function"."""
+    code = frame.f_code
+    path = code.co_filename.replace("\\", "/")
+    if "/src/backend/" in path:
+        path = "src/backend/" + path.split("/src/backend/", 1)[1]
+    else:
+        path = path.rsplit("/", 1)[-1]
+    return f"{path}:{code.co_name}"
+
+def _is_idle(frame) -> bool:
+    """Whether the innermost frame shows the thread waiting for work or I/O."""
+    code = frame.f_code
+    return (code.co_filename.replace("\\", "/").rsplit("/", 1)[-1], code.co_name) in _IDLE_FRAMES
+
+def _stack(frame, max_depth: int) -> List[str]:
+    """Return the frame keys of a stack, outermost first."""
+    keys = []
+    while frame is not None and len(keys) < max_depth:
+        keys.append(_frame_key(frame))
+        frame = frame.f_back
+    keys.reverse()
+    return keys
+
+class RequestProfile:
+    """
+    Sampling profile of one request.
+    
+    A daemon thread samples every thread's stack with sys._current_frames() at a
+    fixed interval and aggregates the samples per function. Pipeline spans report
+    their wall time through `record_span` while the profile is active. A
+    heartbeat task on the event loop lets the sampler notice when the loop is
+    blocked; each block longer than the threshold is recorded with the stack
+    that was running on the loop thread.
+    
+    Other requests served concurrently share the event loop and worker threads,
+    so their work can appear in the function samples; the span breakdown only
+    covers this request.
+    """
+    
+    # Seconds between two stack samples
+    SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5")) / 1000
+    # Event-loop stalls longer than this many seconds are recorded as blocks
+    BLOCK_THRESHOLD = float(os.getenv("PROFILE_BLOCK_THRESHOLD_MS", "50")) / 1000
+    # Frames kept per stack
+    MAX_DEPTH = 64
+    # Entries kept in each ranked list of the result
+    TOP_N = 25
+    
+    def __init__(self, request_id: str = ""):
+        self.profile_id = uuid.uuid4().hex
+        self.request_id = request_id
+        self._spans: Dict[Tuple[str, str], List[float]] = {}
+        # Spans also finish in worker threads
+        self._spans_lock = threading.Lock()
+        self._self_counts: Counter = Counter()
+        self._total_counts: Counter = Counter()
+        self._stacks: Counter = Counter()
+        self._samples: Counter = Counter()
+        self._blocks: List[Dict[str, Any]] = []
+        self._stop = threading.Event()
+        self._loop_thread = 0
+        self._last_beat = 0.0
+        self._started = 0.0
+        self._duration = 0.0
+    
+    def record_span(self, stage: str, platform: str, duration: float) -> None:
+        """Add a finished span's wall time to the stage breakdown."""
+        with self._spans_lock:
+            entry = self._spans.setdefault((stage, platform), [0, 0.0])
+            entry[0] += 1
+            entry[1] += duration
+    
+    def _sample(self) -> None:
+        """Take one sample of every thread's stack, and note event-loop blocks."""
+        now = time.perf_counter()
+        frames = sys._current_frames()
+        own = threading.get_ident()
+        
+        for thread_id, frame in frames.items():
+            if thread_id == own:
+                continue
+            on_loop = thread_id == self._loop_thread
+            if _is_idle(frame):
+                if on_loop:
+                    self._samples["loop_idle"] += 1
+                continue
+            
+            self._samples["loop" if on_loop else "worker"] += 1
+            stack = _stack(frame, self.MAX_DEPTH)
+            self._self_counts[stack[-1]] += 1
+            self._total_counts.update(set(stack))
+            self._stacks[";".join(stack)] += 1
+        
+        # The heartbeat has not run for a while: the loop thread is stuck in one callback
+        stalled = now - self._last_beat
+        if self._last_beat and stalled > self.BLOCK_THRESHOLD:
+            loop_frame = frames.get(self._loop_thread)
+            if self._blocks and self._blocks[-1]["beat"] == self._last_beat:
+                self._blocks[-1]["duration_ms"] = round(stalled * 1000, 3)
+            elif loop_frame is not None:
+                self._blocks.append({
+                    "beat": self._last_beat,
+                    "at_ms": round((self._last_beat - self._started) * 1000, 3),
+                    "duration_ms": round(stalled * 1000, 3),
+                    "stack": _stack(loop_frame, self.MAX_DEPTH)
+                })
+    
+    def _run_sampler(self) -> None:
+        while not self._stop.wait(self.SAMPLE_INTERVAL):
+            self._sample()
+    
+    async def _heartbeat(self) -> None:
+        """Mark the event loop as responsive at a fraction of the block threshold."""
+        interval = self.BLOCK_THRESHOLD / 4
+        while True:
+            self._last_beat = time.perf_counter()
+            await asyncio.sleep(interval)
+    
+    @asynccontextmanager
+    async def running(self) -> AsyncIterator["RequestProfile"]:
+        """Profile the enclosed block; spans inside it report to this profile."""
+        self._loop_thread = threading.get_ident()
+        self._started = self._last_beat = time.perf_counter()
+        token = active_profile.set(self)
+        heartbeat = asyncio.create_task(self._heartbeat())
+        sampler = threading.Thread(target=self._run_sampler, name="request-profiler", daemon=True)
+        sampler.start()
+        try:
+            yield self
+        finally:
+            self._duration = time.perf_counter() - self._started
+            self._stop.set()
+            heartbeat.cancel()
+            active_profile.reset(token)
+            await asyncio.to_thread(sampler.join)
+    
+    def result(self) -> Dict[str, Any]:
+        """
+        Summarise the profile.
+        
+        Returns:
+            Dictionary with the span breakdown per stage and platform, the hottest
+            functions by own and cumulative samples, the hottest stacks (collapsed
+            "outer;inner" form, usable by flame graph tools) and event-loop blocks
+        """
+        busy = self._samples["loop"] + self._samples["worker"]
+        
+        def ranked(counts: Counter) -> List[Dict[str, Any]]:
+            return [
+                {
+                    "function": key,
+                    "samples": count,
+                    "percent": round(100 * count / busy, 2) if busy else 0.0
+                }
+                for key, count in counts.most_common(self.TOP_N)
+            ]
+        
+        stages = [
+            {
+                "stage": stage,
+                "platform": platform,
+                "calls": calls,
+                "total_ms": round(seconds * 1000, 3),
+                "percent": round(100 * seconds / self._duration, 2) if self._duration else 0.0
+            }
+            for (stage, platform), (calls, seconds) in sorted(self._spans.items(), key=lambda entry: -entry[1][1])
+        ]
+        
+        return {
+            "profile_id": self.profile_id,
+            "request_id": self.request_id,
+            "duration_ms": round(self._duration * 1000, 3),
+            "sample_interval_ms": self.SAMPLE_INTERVAL * 1000,
+            "samples": dict(self._samples),
+            "stages": stages,
+            "functions_self": ranked(self._self_counts),
+            "functions_total": ranked(self._total_counts),
+            "stacks": [
+                {"stack": stack, "samples": count}
+                for stack, count in self._stacks.most_common(self.TOP_N)
+            ],
+            "loop_blocks": [
+                {key: value for key, value in block.items() if key != "beat"}
+                for block in self._blocks
+            ]
+        }
@@ -0,0 +1,74 @@
+
+from typing import Any, Dict, Iterable, List, Union
+
+# A projection tree maps keys to either True (keep everything below) or a nested tree
+ProjectionTree = Dict[str, Union[bool, "ProjectionTree"]]
+
+def parse_fields(fields: str, allowed_roots: Iterable[str] = None) -> ProjectionTree:
+    """
+    Parse a comma-separated list of dotted paths into a projection tree.
+    
+    "summary,platforms.reddit.charts" keeps the summary and Reddit's charts only.
+    A "*" segment matches every key at that level, e.g. "platforms.*.charts".
+    
+    Args:
+        fields: Comma-separated dotted paths
+        allowed_roots: Optional top-level keys the paths must start with
+    
+    Returns:
+        Projection tree
+    
+    Raises:
+        ValueError: If a path is empty or starts with an unknown key
+    """
+    allowed = set(allowed_roots) if allowed_roots is not None else None
+    tree: ProjectionTree = {}
+    
+    for path in fields.split(","):
+        segments = [segment.strip() for segment in path.strip().split(".")]
+        if not all(segments):
+            raise ValueError(f"Invalid field path: '{path.strip()}'")
+        if allowed is not None and segments[0] not in allowed:
+            raise ValueError(f"Unknown field '{segments[0]}'; expected one of: {', '.join(sorted(allowed))}")
+        
+        node = tree
+        for segment in segments[:-1]:
+            if node.get(segment) is True:
+                # A shorter path already keeps the whole subtree
+                break
+            node = node.setdefault(segment, {})
+        else:
+            node[segments[-1]] = True
+    
+    return tree
+
+def project(data: Any, tree: Union[bool, ProjectionTree]) -> Any:
+    """
+    Keep only the parts of nested dictionaries selected by a projection tree.
+    
+    Explicit keys take precedence over a "*" at the same level; lists and scalars
+    are kept whole.
+    """
+    if tree is True or not isinstance(data, dict):
+        return data
+    
+    result = {}
+    for key, value in data.items():
+        subtree = tree.get(key, tree.get("*"))
+        if subtree is not None:
+            result[key] = project(value, subtree)
+    return result
+
+def columnar_series(points: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Turn a list of data points into parallel arrays, e.g. {"date": [...], "value": [...]}."""
+    if not points:
+        return {}
+    return {name: [point.get(name) for point in points] for name in points[0]}
+
+def columnar_charts(content: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a response dictionary whose chart series are encoded as parallel arrays."""
+    platforms = {}
+    for platform, data in content.get("platforms", {}).items():
+        charts = {name: columnar_series(points) for name, points in data.get("charts", {}).items()}
+        platforms[platform] = dict(data, charts=charts)
+    return dict(content, platforms=platforms)
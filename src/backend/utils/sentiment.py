@@ -0,0 +1,137 @@
+
+import re
+from collections import Counter
+from itertools import chain
+from typing import Any, Dict, List, Sequence
+import numpy as np
+
+# Word polarities on a -3..3 scale; a small bundled lexicon tuned for social media posts
+LEXICON = {
+    # Positive
+    "amazing": 3.0, "awesome": 3.0, "excellent": 3.0, "fantastic": 3.0, "incredible": 2.5,
+    "love": 3.0, "loved": 3.0, "loves": 3.0, "outstanding": 3.0, "perfect": 3.0,
+    "wonderful": 3.0, "brilliant": 2.5, "best": 2.5, "great": 2.5, "impressive": 2.5,
+    "excited": 2.0, "exciting": 2.0, "happy": 2.0, "glad": 2.0, "enjoy": 2.0,
+    "enjoyed": 2.0, "good": 1.5, "nice": 1.5, "cool": 1.5, "like": 1.0,
+    "liked": 1.5, "better": 1.5, "win": 2.0, "wins": 2.0, "won": 2.0,
+    "success": 2.0, "successful": 2.0, "growth": 1.5, "grow": 1.0, "growing": 1.0,
+    "gain": 1.5, "gains": 1.5, "improve": 1.5, "improved": 1.5, "improvement": 1.5,
+    "innovative": 2.0, "innovation": 1.5, "breakthrough": 2.5, "promising": 2.0, "opportunity": 1.5,
+    "opportunities": 1.5, "benefit": 1.5, "benefits": 1.5, "useful": 1.5, "helpful": 1.5,
+    "easy": 1.0, "efficient": 1.5, "effective": 1.5, "powerful": 1.5, "reliable": 1.5,
+    "secure": 1.0, "safe": 1.0, "strong": 1.5, "positive": 1.5, "optimistic": 2.0,
+    "recommend": 1.5, "recommended": 1.5, "thanks": 1.5, "thank": 1.5, "congrats": 2.5,
+    "congratulations": 2.5, "celebrate": 2.0, "proud": 2.0, "support": 1.0, "fun": 2.0,
+    "beautiful": 2.5, "favorite": 2.0, "favourite": 2.0, "solid": 1.0, "boost": 1.5,
+    "thrilled": 3.0, "delighted": 3.0, "upgrade": 1.0, "wow": 2.0, "record": 0.5,
+    # Negative
+    "awful": -3.0, "terrible": -3.0, "horrible": -3.0, "worst": -3.0, "hate": -3.0,
+    "hated": -3.0, "hates": -3.0, "disaster": -3.0, "disgusting": -3.0, "scam": -3.0,
+    "bad": -2.0, "worse": -2.0, "poor": -2.0, "sad": -2.0, "angry": -2.5,
+    "annoying": -2.0, "annoyed": -2.0, "disappointed": -2.5, "disappointing": -2.5, "fail": -2.0,
+    "failed": -2.0, "fails": -2.0, "failure": -2.5, "broken": -2.0, "bug": -1.5,
+    "bugs": -1.5, "buggy": -2.0, "crash": -2.0, "crashed": -2.0, "crashes": -2.0,
+    "problem": -1.5, "problems": -1.5, "issue": -1.0, "issues": -1.0, "concern": -1.5,
+    "concerns": -1.5, "concerned": -1.5, "worried": -2.0, "worry": -2.0, "risk": -1.5,
+    "risks": -1.5, "risky": -1.5, "threat": -2.0, "threats": -2.0, "danger": -2.5,
+    "dangerous": -2.5, "loss": -2.0, "losses": -2.0, "lose": -2.0, "lost": -1.5,
+    "decline": -1.5, "declining": -1.5, "drop": -1.0, "dropped": -1.0, "layoffs": -2.5,
+    "lawsuit": -2.0, "breach": -2.5, "hack": -1.5, "hacked": -2.5, "vulnerability": -2.0,
+    "slow": -1.0, "expensive": -1.0, "useless": -2.5, "waste": -2.0, "wrong": -1.5,
+    "hard": -0.5, "difficult": -1.0, "confusing": -1.5, "frustrating": -2.5, "frustrated": -2.5,
+    "negative": -1.5, "pessimistic": -2.0, "scary": -2.0, "fear": -2.0, "fears": -2.0,
+    "controversy": -1.5, "controversial": -1.5, "criticism": -1.5, "criticized": -1.5, "ban": -1.5,
+    "banned": -2.0, "fake": -2.0, "misleading": -2.0, "overhyped": -2.0, "hype": -0.5,
+    "outage": -2.5, "down": -0.5, "cost": -0.5, "unfortunately": -1.5, "sucks": -2.5
+}
+
+# Tokens that flip the polarity of the next few words ("not good")
+NEGATIONS = frozenset({
+    "not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "without",
+    "isn't", "aren't", "wasn't", "weren't", "don't", "doesn't", "didn't", "can't",
+    "cannot", "couldn't", "won't", "wouldn't", "shouldn't", "hardly", "barely"
+})
+
+# How many following tokens a negation applies to, and how strongly it flips them
+NEGATION_SCOPE = 2
+NEGATION_FACTOR = -0.75
+
+# Normalisation constant mapping raw sums into (-1, 1), and the neutral band around zero
+NORMALIZATION_ALPHA = 15.0
+NEUTRAL_THRESHOLD = 0.05
+
+_TOKEN_RE = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+def score_texts(texts: Sequence[str]) -> np.ndarray:
+    """
+    Score a batch of texts in one vectorised pass.
+    
+    All texts are tokenised into one flat token array; lexicon weights are looked
+    up once per distinct token, negations are applied with shifted masks, and the
+    per-text sums are taken with a single bincount.
+    
+    Args:
+        texts: Texts to score
+    
+    Returns:
+        Array of compound scores in (-1, 1), one per text
+    """
+    n_texts = len(texts)
+    token_lists = [_TOKEN_RE.findall((text or "").lower()) for text in texts]
+    lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=n_texts)
+    if lengths.sum() == 0:
+        return np.zeros(n_texts)
+    
+    tokens = np.array(list(chain.from_iterable(token_lists)))
+    vocabulary, inverse = np.unique(tokens, return_inverse=True)
+    weights = np.fromiter((LEXICON.get(word, 0.0) for word in vocabulary), dtype=np.float64, count=len(vocabulary))[inverse]
+    negators = np.fromiter((word in NEGATIONS for word in vocabulary), dtype=bool, count=len(vocabulary))[inverse]
+    
+    # A token is negated if one of the preceding NEGATION_SCOPE tokens in the same text is a negation
+    text_index = np.repeat(np.arange(n_texts), lengths)
+    negated = np.zeros(len(tokens), dtype=bool)
+    for shift in range(1, NEGATION_SCOPE + 1):
+        negated[shift:] |= negators[:-shift] & (text_index[shift:] == text_index[:-shift])
+    weights = np.where(negated, weights * NEGATION_FACTOR, weights)
+    
+    sums = np.bincount(text_index, weights=weights, minlength=n_texts)
+    return sums / np.sqrt(sums * sums + NORMALIZATION_ALPHA)
+
+def label_scores(scores: np.ndarray) -> List[str]:
+    """Map compound scores to positive/neutral/negative labels."""
+    labels = np.select(
+        [scores >= NEUTRAL_THRESHOLD, scores <= -NEUTRAL_THRESHOLD],
+        ["positive", "negative"],
+        default="neutral"
+    )
+    return labels.tolist()
+
+def score_items(items: Sequence[Dict[str, Any]]) -> None:
+    """
+    Label scraped items in place with "sentiment" and "sentiment_score".
+    
+    Title and content are scored together. Fallback placeholder items are left
+    unlabelled because their text is generated, not scraped.
+    
+    Args:
+        items: Content items produced by the ScraperAgent
+    """
+    real_items = [item for item in items if not item.get("is_fallback")]
+    if not real_items:
+        return
+    
+    texts = [f"{item.get('title', '')} {item.get('content', '')}" for item in real_items]
+    scores = score_texts(texts)
+    for item, score, label in zip(real_items, scores.tolist(), label_scores(scores)):
+        item["sentiment_score"] = round(score, 4)
+        item["sentiment"] = label
+
+def dominant_sentiment(items: Sequence[Dict[str, Any]], default: str = "neutral") -> str:
+    """Return the most common item sentiment label, or `default` if no item is labelled."""
+    counts = sentiment_counts(items)
+    return max(counts, key=counts.get) if sum(counts.values()) else default
+
+def sentiment_counts(items: Sequence[Dict[str, Any]]) -> Dict[str, int]:
+    """Count labelled items per sentiment class."""
+    counts = Counter(item["sentiment"] for item in items if item.get("sentiment"))
+    return {label: counts.get(label, 0) for label in ("positive", "neutral", "negative")}
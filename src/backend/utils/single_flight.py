@@ -0,0 +1,96 @@
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent calls that share the same key.
+    
+    The first caller for a key starts the work; every caller that arrives while
+    it is still running awaits the same task instead of starting its own. Results
+    are kept for `ttl` seconds so callers arriving shortly afterwards reuse them,
+    except failures and results the caller's `cacheable` predicate rejects.
+    """
+    
+    # Upper bound on remembered results before expired entries are pruned
+    MAX_FRESH_ENTRIES = 1024
+    
+    def __init__(self, ttl: float = 0.0):
+        self.ttl = ttl
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._fresh: Dict[Hashable, Tuple[float, Any]] = {}
+        self._stats = {"calls": 0, "fetches": 0, "shared_inflight": 0, "fresh_hits": 0, "errors": 0}
+    
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        cacheable: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Run `fn` for `key`, or join an identical call that is already running.
+        
+        Args:
+            key: Hashable identity of the work
+            fn: Zero-argument coroutine factory that performs the work
+            cacheable: Optional predicate; results it rejects are shared with the
+                callers already waiting but not kept for later ones
+        
+        Returns:
+            The (possibly shared) result of `fn`
+        """
+        self._stats["calls"] += 1
+        
+        fresh = self._fresh.get(key)
+        if fresh is not None:
+            expires_at, result = fresh
+            if expires_at > time.monotonic():
+                self._stats["fresh_hits"] += 1
+                return result
+            del self._fresh[key]
+        
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats["shared_inflight"] += 1
+        else:
+            self._stats["fetches"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._on_done(k, t, cacheable))
+        
+        # Shield so a cancelled caller does not cancel the fetch for everyone else
+        return await asyncio.shield(task)
+    
+    def _on_done(self, key: Hashable, task: asyncio.Task, cacheable: Optional[Callable[[Any], bool]] = None) -> None:
+        """Release the in-flight slot and remember successful, cacheable results."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self._stats["errors"] += 1
+            return
+        
+        if self.ttl > 0 and (cacheable is None or cacheable(task.result())):
+            if len(self._fresh) >= self.MAX_FRESH_ENTRIES:
+                self._prune()
+            self._fresh[key] = (time.monotonic() + self.ttl, task.result())
+    
+    def _prune(self) -> None:
+        """Drop expired results, or the oldest half if none have expired."""
+        now = time.monotonic()
+        expired = [k for k, (expires_at, _) in self._fresh.items() if expires_at <= now]
+        if not expired:
+            expired = list(self._fresh)[: len(self._fresh) // 2]
+        for k in expired:
+            del self._fresh[k]
+    
+    def stats(self) -> Dict[str, int]:
+        """Return call counters, including how many duplicate fetches were avoided."""
+        stats = dict(self._stats)
+        stats["duplicate_fetches_avoided"] = stats["shared_inflight"] + stats["fresh_hits"]
+        stats["inflight"] = len(self._inflight)
+        return stats
@@ -0,0 +1,105 @@
+
+import re
+from itertools import chain
+from typing import Any, Dict, List, Sequence
+import numpy as np
+
+# Common English and social-media filler words that never make a useful theme
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further get
+got had has have having he her here hers herself him himself his how i if in into is it its itself
+just like make made many may me might more most much must my myself new no nor not now of off on
+once one only or other our ours ourselves out over own really said same say says see she should
+so some such than that the their theirs them themselves then there these they this those through
+to too under until up us use used using very via was way we well were what when where which while
+who whom why will with would you your yours yourself yourselves today week year years time
+http https www com amp rt via re ll ve don doesn didn isn aren wasn weren won can't i'm it's
+""".split())
+
+# Two-word phrases are more descriptive than single words, so they get a head start
+PHRASE_BOOST = 1.5
+
+_TOKEN_RE = re.compile(r"[a-z][a-z0-9+#]+")
+
+def _item_tokens(item: Dict[str, Any], excluded: frozenset) -> List[str]:
+    """Tokenise an item's title and content, dropping stopwords and excluded terms."""
+    text = f"{item.get('title', '')} {item.get('content', '')}".lower()
+    return [token for token in _TOKEN_RE.findall(text) if token not in STOPWORDS and token not in excluded]
+
+def extract_themes(
+    items: Sequence[Dict[str, Any]],
+    keywords: Sequence[str] = None,
+    top_k: int = 5
+) -> List[str]:
+    """
+    Extract the top TF-IDF terms and phrases across a platform's items.
+    
+    Each item is one document. Unigrams and adjacent-word bigrams are counted
+    into a sparse (document, term) coordinate list, weighted by smoothed IDF,
+    L2-normalised per document and summed per term, all with numpy bincounts.
+    Terms that occur in only one document are ignored when there are several
+    documents, phrases get a small boost, and a word is not repeated once a
+    theme containing it is chosen.
+    
+    Fallback placeholder items and the search keywords themselves are left out.
+    
+    Args:
+        items: Content items for one platform
+        keywords: Search keywords to exclude from the themes
+        top_k: Maximum number of themes to return
+    
+    Returns:
+        Themes ordered from strongest to weakest
+    """
+    excluded = frozenset(
+        chain.from_iterable(_TOKEN_RE.findall(k.lower()) for k in keywords or [])
+    )
+    documents = []
+    for item in items:
+        if item.get("is_fallback"):
+            continue
+        tokens = _item_tokens(item, excluded)
+        bigrams = [f"{a} {b}" for a, b in zip(tokens, tokens[1:]) if a != b]
+        if tokens:
+            documents.append(tokens + bigrams)
+    if not documents:
+        return []
+    
+    n_docs = len(documents)
+    lengths = np.fromiter((len(terms) for terms in documents), dtype=np.int64, count=n_docs)
+    # Hashing terms to ids is much faster than sorting a string array
+    all_terms = list(chain.from_iterable(documents))
+    vocabulary = list(dict.fromkeys(all_terms))
+    n_terms = len(vocabulary)
+    term_ids = dict(zip(vocabulary, range(n_terms)))
+    term_index = np.fromiter(map(term_ids.__getitem__, all_terms), dtype=np.int64, count=len(all_terms))
+    doc_index = np.repeat(np.arange(n_docs), lengths)
+    
+    # Sparse term counts: one entry per distinct (document, term) pair
+    pairs, tf = np.unique(doc_index * n_terms + term_index, return_counts=True)
+    pair_doc, pair_term = np.divmod(pairs, n_terms)
+    
+    df = np.bincount(pair_term, minlength=n_terms)
+    idf = np.log((1 + n_docs) / (1 + df)) + 1.0
+    weights = np.log1p(tf) * idf[pair_term]
+    norms = np.sqrt(np.bincount(pair_doc, weights=weights * weights, minlength=n_docs))
+    weights = weights / norms[pair_doc]
+    
+    scores = np.bincount(pair_term, weights=weights, minlength=n_terms)
+    scores[np.fromiter((" " in term for term in vocabulary), dtype=bool, count=n_terms)] *= PHRASE_BOOST
+    if n_docs > 1:
+        scores[df < 2] = 0.0
+    
+    themes: List[str] = []
+    covered = set()
+    for index in np.argsort(-scores, kind="stable"):
+        if scores[index] <= 0 or len(themes) >= top_k:
+            break
+        term = vocabulary[index]
+        words = term.split()
+        if any(word in covered for word in words):
+            continue
+        themes.append(term)
+        covered.update(words)
+    return themes
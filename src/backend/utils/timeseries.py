@@ -0,0 +1,153 @@
+
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Sequence, Tuple
+import numpy as np
+from src.backend.utils.date_range import DateWindow
+
+# Bucket widths in seconds for the supported chart resolutions
+RESOLUTION_SECONDS = {
+    "hour": 3600,
+    "day": 86400,
+    "week": 7 * 86400
+}
+
+# Series longer than this are coarsened to the next resolution to keep payloads small
+MAX_BUCKETS = 2000
+
+SENTIMENT_CLASSES = ("positive", "neutral", "negative")
+_SENTIMENT_CODES = {name: code for code, name in enumerate(SENTIMENT_CLASSES)}
+
+def bucket_width(window: DateWindow, resolution: str = "day") -> int:
+    """Return the bucket width for a resolution, coarsened if the window would need too many buckets."""
+    resolutions = list(RESOLUTION_SECONDS)
+    index = resolutions.index(resolution) if resolution in RESOLUTION_SECONDS else resolutions.index("day")
+    span = window.end_ts - window.start_ts
+    while index < len(resolutions) - 1 and span / RESOLUTION_SECONDS[resolutions[index]] > MAX_BUCKETS:
+        index += 1
+    return RESOLUTION_SECONDS[resolutions[index]]
+
+def item_timestamps(items: Sequence[Dict[str, Any]], default: float = None) -> np.ndarray:
+    """
+    Collect item timestamps as a float array.
+    
+    Items without a numeric "timestamp" are treated as published at `default`
+    (the fetch time, i.e. now, unless given).
+    """
+    default = time.time() if default is None else default
+    return np.fromiter(
+        (item.get("timestamp") or default for item in items),
+        dtype=np.float64,
+        count=len(items)
+    )
+
+def _bucket_index(timestamps: np.ndarray, window: DateWindow, width: int) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Return bucket indices of in-window timestamps, the in-window mask and the bucket count."""
+    n_buckets = max(1, int(np.ceil((window.end_ts - window.start_ts) / width)))
+    mask = (timestamps >= window.start_ts) & (timestamps < window.end_ts)
+    index = ((timestamps[mask] - window.start_ts) // width).astype(np.int64)
+    return index, mask, n_buckets
+
+def _labels(window: DateWindow, width: int, n_buckets: int) -> List[str]:
+    """Format bucket start times as chart labels, newest first."""
+    fmt = "%Y-%m-%dT%H:00" if width < 86400 else "%Y-%m-%d"
+    starts = window.start_ts + np.arange(n_buckets - 1, -1, -1) * width
+    return [datetime.fromtimestamp(ts, timezone.utc).strftime(fmt) for ts in starts]
+
+def sentiment_codes(sentiments: Sequence[str]) -> np.ndarray:
+    """Map sentiment labels to class codes (unknown labels count as neutral)."""
+    neutral = _SENTIMENT_CODES["neutral"]
+    return np.fromiter(
+        (_SENTIMENT_CODES.get(str(s).lower(), neutral) for s in sentiments),
+        dtype=np.int64,
+        count=len(sentiments)
+    )
+
+def sentiment_series(
+    timestamps: np.ndarray,
+    sentiments: Sequence[str],
+    window: DateWindow,
+    resolution: str = "day"
+) -> List[Dict[str, Any]]:
+    """
+    Count items per sentiment class and bucket, newest bucket first.
+    
+    Args:
+        timestamps: Item timestamps (epoch seconds)
+        sentiments: Item sentiment labels (positive/neutral/negative; others count as neutral)
+        window: Time window to cover
+        resolution: "hour", "day" or "week"
+        
+    Returns:
+        List of {"date", "positive", "neutral", "negative"} points
+    """
+    counts = np.zeros((len(timestamps), 3))
+    counts[np.arange(len(timestamps)), sentiment_codes(sentiments)] = 1
+    return weighted_sentiment_series(timestamps, counts, window, resolution)
+
+def weighted_sentiment_series(
+    timestamps: np.ndarray,
+    counts: np.ndarray,
+    window: DateWindow,
+    resolution: str = "day"
+) -> List[Dict[str, Any]]:
+    """
+    Sum per-class sentiment counts per bucket, newest bucket first.
+    
+    Args:
+        timestamps: Timestamps of the rows (items or pre-aggregated buckets)
+        counts: Array of shape (n, 3) with positive/neutral/negative counts per row
+        window: Time window to cover
+        resolution: "hour", "day" or "week"
+        
+    Returns:
+        List of {"date", "positive", "neutral", "negative"} points
+    """
+    width = bucket_width(window, resolution)
+    index, mask, n_buckets = _bucket_index(timestamps, window, width)
+    
+    counts = counts[mask]
+    totals = np.stack(
+        [np.bincount(index, weights=counts[:, c], minlength=n_buckets) for c in range(3)],
+        axis=1
+    )[::-1]
+    
+    return [
+        {"date": label, "positive": int(row[0]), "neutral": int(row[1]), "negative": int(row[2])}
+        for label, row in zip(_labels(window, width, n_buckets), totals.tolist())
+    ]
+
+def engagement_series(
+    timestamps: np.ndarray,
+    weights: np.ndarray,
+    window: DateWindow,
+    resolution: str = "day"
+) -> List[Dict[str, Any]]:
+    """
+    Sum engagement per bucket, newest bucket first.
+    
+    Args:
+        timestamps: Item timestamps (epoch seconds)
+        weights: Engagement per item (e.g. Reddit score)
+        window: Time window to cover
+        resolution: "hour", "day" or "week"
+        
+    Returns:
+        List of {"date", "value"} points
+    """
+    width = bucket_width(window, resolution)
+    index, mask, n_buckets = _bucket_index(timestamps, window, width)
+    totals = np.bincount(index, weights=weights[mask], minlength=n_buckets)[::-1]
+    
+    return [
+        {"date": label, "value": int(round(value))}
+        for label, value in zip(_labels(window, width, n_buckets), totals.tolist())
+    ]
+
+def item_engagement(items: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """Engagement weight per item: its score where the platform reports one, otherwise 1."""
+    return np.fromiter(
+        (item.get("score", 1) or 0 for item in items),
+        dtype=np.float64,
+        count=len(items)
+    )
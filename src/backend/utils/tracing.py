@@ -0,0 +1,75 @@
+
+import contextvars
+import logging
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from src.backend.utils.metrics import STAGE_CALLS, STAGE_DURATION, platform_label
+from src.backend.utils.profiler import active_profile
+
+trace_logger = logging.getLogger("insight-trace")
+
+# Identifier of the request being served, propagated into tasks and worker threads
+request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="")
+# Platform of the enclosing span, inherited by nested spans (e.g. LLM calls per platform)
+platform_var: contextvars.ContextVar[str] = contextvars.ContextVar("platform", default="")
+# Name of the enclosing span, recorded as the parent of nested spans
+parent_span_var: contextvars.ContextVar[str] = contextvars.ContextVar("parent_span", default="")
+
+def new_request_id() -> str:
+    """Return a fresh request identifier."""
+    return uuid.uuid4().hex
+
+def trace_spans_enabled() -> bool:
+    """Whether finished spans should be emitted to the trace log."""
+    return os.getenv("TRACE_SPANS", "0") == "1"
+
+@contextmanager
+def span(stage: str, platform: Optional[str] = None) -> Iterator[None]:
+    """
+    Time a pipeline stage and record its latency and outcome.
+    
+    Nested spans inherit the platform of the enclosing span unless one is given.
+    When TRACE_SPANS=1, every finished span is also logged with the request id,
+    and when the request is being profiled the span is added to its profile.
+    
+    Args:
+        stage: Stage name (e.g. "scrape", "llm", "format")
+        platform: Optional platform ID the stage runs for (aliases such as "x" are
+            recorded under their canonical label)
+    """
+    platform = platform_var.get() if platform is None else platform_label(platform)
+    platform_token = platform_var.set(platform)
+    parent = parent_span_var.get()
+    parent_token = parent_span_var.set(stage)
+    
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        parent_span_var.reset(parent_token)
+        platform_var.reset(platform_token)
+        
+        STAGE_DURATION.observe(duration, stage=stage, platform=platform)
+        STAGE_CALLS.inc(stage=stage, platform=platform, outcome=outcome)
+        
+        profile = active_profile.get()
+        if profile is not None:
+            profile.record_span(stage, platform, duration)
+        
+        if trace_spans_enabled():
+            # Structured fields; the JSON log formatter renders them off the event loop
+            trace_logger.info("span", extra={
+                "span": stage,
+                "parent": parent,
+                "platform": platform,
+                "duration_ms": round(duration * 1000, 3),
+                "outcome": outcome
+            })
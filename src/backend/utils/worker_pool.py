@@ -0,0 +1,263 @@
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from src.backend.utils.metrics import WORKER_BATCH_SIZE, WORKER_JOBS, WORKER_OFFLOADED_SECONDS, WORKER_QUEUE_WAIT
+
+def _timed(fn: Callable[..., Any], args: Tuple[Any, ...]) -> Tuple[Any, float]:
+    """Run fn(*args) and return its result with the CPU seconds it used (runs in the worker)."""
+    started = time.thread_time()
+    result = fn(*args)
+    return result, time.thread_time() - started
+
+def _run_batch(fn: Callable[..., Any], batch: List[Tuple[Any, ...]]) -> List[Tuple[bool, Any, float]]:
+    """Run fn once per argument tuple; each entry is (ok, result or exception, CPU seconds)."""
+    results = []
+    for args in batch:
+        started = time.thread_time()
+        try:
+            results.append((True, fn(*args), time.thread_time() - started))
+        except Exception as e:
+            results.append((False, e, time.thread_time() - started))
+    return results
+
+def _noop() -> None:
+    """Used to start worker processes ahead of the first job."""
+
+class WorkerPool:
+    """
+    Runs CPU-heavy parsing and text processing away from the event loop.
+    
+    In "process" mode jobs go to a pool of worker processes, so HTML parsing
+    and JSON decoding run in parallel instead of taking turns under the GIL;
+    jobs must then be module-level functions with picklable arguments (see
+    utils/parsing.py). "thread" mode uses a thread pool, which frees the event
+    loop but not the GIL, and "inline" runs every job in the caller.
+    
+    At most QUEUE_SIZE submissions are in flight; further callers wait for a
+    slot, so a burst cannot queue unbounded work. Small jobs submitted through
+    `run_batched` within BATCH_WINDOW of each other are sent as one submission
+    of up to BATCH_SIZE calls, so the IPC round trip is paid once per batch.
+    
+    Every job that runs in a worker records the CPU seconds it used there in
+    insight_worker_offloaded_seconds_total: time the event loop (or, for jobs
+    from scraper threads, the GIL shared with it) no longer spends.
+    """
+    
+    MODE = os.getenv("WORKER_POOL", "process")
+    PROCESSES = int(os.getenv("WORKER_PROCESSES", str(min(4, os.cpu_count() or 1))))
+    THREADS = int(os.getenv("WORKER_THREADS", "4"))
+    # Submissions in flight (a batch counts once) before callers wait
+    QUEUE_SIZE = int(os.getenv("WORKER_QUEUE_SIZE", "64"))
+    BATCH_SIZE = int(os.getenv("WORKER_BATCH_SIZE", "16"))
+    BATCH_WINDOW = float(os.getenv("WORKER_BATCH_WINDOW_MS", "2")) / 1000
+    
+    def __init__(self, mode: Optional[str] = None, workers: Optional[int] = None):
+        self.mode = mode or self.MODE
+        if self.mode not in ("process", "thread", "inline"):
+            raise ValueError(f"Unknown worker pool mode '{self.mode}'; expected process, thread or inline")
+        self.workers = workers or (self.PROCESSES if self.mode == "process" else self.THREADS)
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.QUEUE_SIZE)
+        self._batches: Dict[Tuple[Any, str, Callable], List[Tuple[Tuple[Any, ...], asyncio.Future]]] = {}
+        # The event loop only keeps weak references to tasks, so running batches are held here
+        self._batch_tasks: Set[asyncio.Task] = set()
+    
+    def _get_executor(self) -> Executor:
+        with self._executor_lock:
+            if self._executor is None:
+                if self.mode == "process":
+                    # Spawned workers do not inherit the parent's threads and locks
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="insight-worker")
+            return self._executor
+    
+    def warm_up(self) -> None:
+        """Start the workers now, so the first request does not wait for them (blocking)."""
+        if self.mode == "inline":
+            return
+        executor = self._get_executor()
+        for future in [executor.submit(_noop) for _ in range(self.workers)]:
+            future.result()
+    
+    def _run_inline(self, kind: str, fn: Callable[..., Any], args: Tuple[Any, ...]) -> Any:
+        try:
+            result, cpu = _timed(fn, args)
+        except Exception:
+            self._record(kind, 0.0, False, executor="inline")
+            raise
+        self._record(kind, cpu, True, executor="inline")
+        return result
+    
+    def _record(self, kind: str, cpu_seconds: float, ok: bool, executor: Optional[str] = None) -> None:
+        executor = executor or self.mode
+        WORKER_JOBS.inc(kind=kind, executor=executor, outcome="ok" if ok else "error")
+        if executor != "inline":
+            WORKER_OFFLOADED_SECONDS.inc(cpu_seconds, kind=kind, executor=executor)
+    
+    def _submit(self, kind: str, fn: Callable[..., Any], *args: Any) -> Future:
+        """Submit to the executor once a slot is held; the slot is freed when the job ends."""
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+    
+    async def _acquire_slot(self, kind: str) -> None:
+        started = time.perf_counter()
+        if not self._slots.acquire(blocking=False):
+            acquiring = asyncio.ensure_future(asyncio.to_thread(self._slots.acquire))
+            try:
+                await asyncio.shield(acquiring)
+            except asyncio.CancelledError:
+                # The thread still takes the slot; give it back as soon as it does
+                acquiring.add_done_callback(
+                    lambda done: self._slots.release() if not done.cancelled() and done.exception() is None else None
+                )
+                raise
+        WORKER_QUEUE_WAIT.observe(time.perf_counter() - started, kind=kind)
+    
+    def run_blocking(self, kind: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a job from a worker thread and wait for its result.
+        
+        Callers are already off the event loop, so outside process mode the job
+        simply runs in the calling thread.
+        
+        Args:
+            kind: Job kind used in metrics (e.g. "html")
+            fn: Module-level function
+            *args: Picklable arguments
+        
+        Returns:
+            fn(*args)
+        """
+        if self.mode != "process":
+            return self._run_inline(kind, fn, args)
+        
+        started = time.perf_counter()
+        self._slots.acquire()
+        WORKER_QUEUE_WAIT.observe(time.perf_counter() - started, kind=kind)
+        try:
+            result, cpu = self._submit(kind, _timed, fn, args).result()
+        except Exception:
+            self._record(kind, 0.0, False)
+            raise
+        self._record(kind, cpu, True)
+        return result
+    
+    async def run(self, kind: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run one job off the event loop and await its result.
+        
+        Args:
+            kind: Job kind used in metrics (e.g. "prompt")
+            fn: Module-level function
+            *args: Picklable arguments
+        
+        Returns:
+            fn(*args)
+        """
+        if self.mode == "inline":
+            return self._run_inline(kind, fn, args)
+        
+        await self._acquire_slot(kind)
+        try:
+            result, cpu = await asyncio.wrap_future(self._submit(kind, _timed, fn, args))
+        except Exception:
+            self._record(kind, 0.0, False)
+            raise
+        self._record(kind, cpu, True)
+        return result
+    
+    async def run_batched(self, kind: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Like `run`, for small jobs: calls of the same function are grouped into batches.
+        
+        A batch is sent when it holds BATCH_SIZE calls or BATCH_WINDOW after its
+        first call, whichever comes first.
+        """
+        if self.mode == "inline":
+            return await self.run(kind, fn, *args)
+        
+        loop = asyncio.get_running_loop()
+        key = (loop, kind, fn)
+        future = loop.create_future()
+        batch = self._batches.setdefault(key, [])
+        batch.append((args, future))
+        if len(batch) >= self.BATCH_SIZE:
+            self._flush(key)
+        elif len(batch) == 1:
+            loop.call_later(self.BATCH_WINDOW, self._flush, key)
+        return await future
+    
+    def _flush(self, key: Tuple[Any, str, Callable]) -> None:
+        batch = self._batches.pop(key, None)
+        if batch:
+            _, kind, fn = key
+            task = asyncio.ensure_future(self._run_batch(kind, fn, batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+    
+    async def _run_batch(
+        self,
+        kind: str,
+        fn: Callable[..., Any],
+        batch: List[Tuple[Tuple[Any, ...], asyncio.Future]]
+    ) -> None:
+        WORKER_BATCH_SIZE.observe(len(batch), kind=kind)
+        try:
+            await self._acquire_slot(kind)
+            outcomes = await asyncio.wrap_future(self._submit(kind, _run_batch, fn, [args for args, _ in batch]))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            self._record(kind, 0.0, False)
+            return
+        
+        for (_, future), (ok, value, cpu) in zip(batch, outcomes):
+            self._record(kind, cpu, ok)
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+    
+    def close(self) -> None:
+        """Shut the workers down."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+# Process-wide pool, created on first use
+_pool: Optional[WorkerPool] = None
+_pool_lock = threading.Lock()
+
+def get_worker_pool() -> WorkerPool:
+    """Return the shared worker pool, creating it if needed."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool()
+        return _pool
+
+def close_worker_pool() -> None:
+    """Shut the shared worker pool down; the next get_worker_pool() starts a new one."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()